@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Append-only archive of raw HTML responses and extracted text
+- Records are compressed one by one (zstd, or zlib when zstandard is not installed) so any
+  record can be read without decompressing its neighbours
+- A dictionary trained on archived FDA pages shares the site chrome (navigation, footer, scripts)
+  between records, which is most of every page
+- Records are appended to segment files that roll over at ARCHIVE_SEGMENT_BYTES
+- index.jsonl maps each URL to (segment, offset, length); the latest entry for a URL wins
+- Several processes may append to one archive (job queue workers, daemon + scheduler): appends hold an
+  flock on index.jsonl, and each process picks up the others' index lines before a lookup
+
+Usage: python3 archive.py --stats
+       python3 archive.py --train        # train a dictionary from archived pages (used for new records)
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from config import ARCHIVE_DIR, ARCHIVE_SEGMENT_BYTES, ARCHIVE_DICT_BYTES
+from metrics import metrics
+
+try:
+    import zstandard
+except ImportError:  # zlib with a preset dictionary is the fallback
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): appends are serialized within the process only
+    fcntl = None
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+ZSTD_LEVEL = 10
+TRAIN_SAMPLES = 500
+
+ArchivedPage = namedtuple('ArchivedPage', ['url', 'title', 'html', 'text', 'fetched_at'])
+IndexEntry = namedtuple('IndexEntry', ['url', 'segment', 'offset', 'length', 'codec', 'dict', 'raw', 'text_sha1', 'fetched_at'])
+
+
+def text_hash(text):
+    """Hash used to tell whether the extracted text of a page changed"""
+    return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+
+
+def read_index(path=ARCHIVE_DIR):
+    """{url: latest IndexEntry} of an archive, read-only (nothing is created if the archive does not exist)"""
+    index = {}
+    index_path = os.path.join(path, 'index.jsonl')
+    if os.path.exists(index_path):
+        with open(index_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = IndexEntry(**json.loads(line))
+                    index[entry.url] = entry
+    return index
+
+
+class Archive:
+    def __init__(self, path=ARCHIVE_DIR, segment_bytes=ARCHIVE_SEGMENT_BYTES):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.codec = 'zstd' if zstandard else 'zlib'
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        # Dictionaries and segment readers are shared by reading threads; not held while appending
+        self._cache_lock = threading.Lock()
+        self._index = {}
+        self._dicts = {}
+        self._readers = {}
+        self._load_index()
+        self._dict_id = self._latest_dict_id()
+        self._segment = self._latest_segment()
+
+    # ---- files -----------------------------------------------------------
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, f'segment-{segment:06d}.dat')
+
+    def _dict_path(self, dict_id, codec):
+        return os.path.join(self.path, f'dict-{dict_id:04d}.{codec}')
+
+    def _latest_segment(self):
+        segments = [int(name[8:14]) for name in os.listdir(self.path) if name.startswith('segment-')]
+        return max(segments, default=1)
+
+    def _latest_dict_id(self):
+        ids = [int(name[5:9]) for name in os.listdir(self.path)
+               if name.startswith('dict-') and name.endswith('.' + self.codec)]
+        return max(ids, default=0)
+
+    def _load_index(self):
+        self._index_path = os.path.join(self.path, 'index.jsonl')
+        self._index_file = open(self._index_path, 'a', encoding='utf-8')
+        self._index_pos = 0
+        self._refresh()
+
+    def _refresh(self):
+        """Read the index lines appended since the last read, by this or another process (callers hold the lock)"""
+        size = os.path.getsize(self._index_path)
+        if size <= self._index_pos:
+            return
+        with open(self._index_path, 'rb') as f:
+            f.seek(self._index_pos)
+            data = f.read(size - self._index_pos)
+        # A line another process is still writing is read next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                entry = IndexEntry(**json.loads(line))
+                self._index[entry.url] = entry
+        self._index_pos += end
+
+    @contextmanager
+    def _exclusive(self):
+        """Held while appending: self._lock for the threads of this process, an flock for other processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._index_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._index_file.fileno(), fcntl.LOCK_UN)
+
+    def _dictionary(self, dict_id, codec):
+        key = (dict_id, codec)
+        with self._cache_lock:
+            if key not in self._dicts:
+                with open(self._dict_path(dict_id, codec), 'rb') as f:
+                    self._dicts[key] = f.read()
+            return self._dicts[key]
+
+    # ---- compression -----------------------------------------------------
+
+    def _compress(self, payload, dict_id):
+        dictionary = self._dictionary(dict_id, self.codec) if dict_id else None
+        if self.codec == 'zstd':
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(payload)
+        compressor = zlib.compressobj(9, zdict=dictionary) if dictionary else zlib.compressobj(9)
+        return compressor.compress(payload) + compressor.flush()
+
+    def _decompress(self, data, entry):
+        dictionary = self._dictionary(entry.dict, entry.codec) if entry.dict else None
+        if entry.codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Archive record is zstd-compressed; install zstandard to read it")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data, max_output_size=entry.raw)
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+
+    # ---- writing ---------------------------------------------------------
+
+    def append(self, url, html, text, title=None, fetched_at=None):
+        """Archive one fetched page; returns its IndexEntry"""
+        fetched_at = fetched_at or datetime.now().isoformat(timespec='seconds')
+        payload = json.dumps({'url': url, 'title': title, 'html': html, 'text': text,
+                              'fetched_at': fetched_at}, ensure_ascii=False).encode('utf-8')
+        # The record is compressed with, and indexed under, the same dictionary even if
+        # train_dictionary() switches to a new one meanwhile
+        with self._lock:
+            dict_id = self._dict_id
+        with metrics.time('archive.compress'):
+            data = self._compress(payload, dict_id)
+
+        with self._exclusive():
+            self._refresh()
+            # Another process may have rolled over to a new segment
+            while os.path.exists(self._segment_path(self._segment + 1)):
+                self._segment += 1
+            path = self._segment_path(self._segment)
+            if os.path.exists(path) and os.path.getsize(path) + len(data) > self.segment_bytes:
+                self._segment += 1
+                path = self._segment_path(self._segment)
+            with open(path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            entry = IndexEntry(url, self._segment, offset, len(data), self.codec, dict_id,
+                               len(payload), text_hash(text), fetched_at)
+            # The record is on disk before the index points at it
+            self._index_file.write(json.dumps(entry._asdict()) + '\n')
+            self._index_file.flush()
+            self._index[url] = entry
+            self._index_pos = self._index_file.tell()
+
+        metrics.incr('archive.records')
+        metrics.incr('archive.bytes_raw', len(payload))
+        metrics.incr('archive.bytes_stored', len(data))
+        return entry
+
+    # ---- reading ---------------------------------------------------------
+
+    def _lookup(self, url):
+        with self._lock:
+            self._refresh()
+            return self._index.get(url)
+
+    def __contains__(self, url):
+        return self._lookup(url) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def entry(self, url):
+        return self._lookup(url)
+
+    def entries(self):
+        """Latest entry per URL, in on-disk order (sequential reads)"""
+        with self._lock:
+            self._refresh()
+            return sorted(self._index.values(), key=lambda e: (e.segment, e.offset))
+
+    def _read(self, entry):
+        with self._cache_lock:
+            reader = self._readers.get(entry.segment)
+            if reader is None:
+                reader = self._readers[entry.segment] = open(self._segment_path(entry.segment), 'rb')
+        # pread has no file position, so threads can share a reader
+        data = os.pread(reader.fileno(), entry.length, entry.offset)
+        return ArchivedPage(**json.loads(self._decompress(data, entry)))
+
+    def get(self, url):
+        """Latest archived page for `url`, or None"""
+        entry = self._lookup(url)
+        return self._read(entry) if entry else None
+
+    def read_entry(self, entry):
+        return self._read(entry)
+
+    def __iter__(self):
+        for entry in self.entries():
+            yield self._read(entry)
+
+    # ---- dictionary ------------------------------------------------------
+
+    def train_dictionary(self, samples=TRAIN_SAMPLES, size=ARCHIVE_DICT_BYTES):
+        """Train a dictionary from the most recent archived pages; new records are compressed with it"""
+        entries = sorted(self.entries(), key=lambda e: e.fetched_at, reverse=True)[:samples]
+        payloads = [json.dumps(self._read(e)._asdict(), ensure_ascii=False).encode('utf-8') for e in entries]
+        if len(payloads) < 10:
+            raise ValueError(f"Need at least 10 archived pages to train a dictionary, have {len(payloads)}")
+
+        if self.codec == 'zstd':
+            dictionary = zstandard.train_dictionary(size, payloads).as_bytes()
+        else:
+            # zlib has no trainer: keep the 64-byte blocks of one page that most other pages also contain
+            # (the site chrome), in page order; zlib only uses the last 32 KB of a preset dictionary
+            reference, others = payloads[0], payloads[1:50]
+            blocks = [reference[i:i + 64] for i in range(0, len(reference), 64)]
+            common = [block for block in blocks if sum(block in other for other in others) > len(others) // 2]
+            dictionary = b''.join(common)[-min(size, 32 * 1024):]
+
+        with self._exclusive():
+            dict_id = max(self._dict_id, self._latest_dict_id()) + 1
+            with open(self._dict_path(dict_id, self.codec), 'wb') as f:
+                f.write(dictionary)
+            self._dict_id = dict_id
+        logging.info(f"📚 Trained {self.codec} dictionary #{dict_id} ({len(dictionary):,} bytes) from {len(payloads)} pages")
+        return dict_id
+
+    # ---- maintenance -----------------------------------------------------
+
+    def stats(self):
+        entries = self.entries()
+        raw = sum(e.raw for e in entries)
+        stored = sum(e.length for e in entries)
+        return {
+            'pages': len(entries),
+            'segments': len({e.segment for e in entries}),
+            'codec': self.codec,
+            'dictionary': self._dict_id,
+            'bytes_raw': raw,
+            'bytes_stored': stored,
+            'ratio': round(raw / stored, 2) if stored else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._index_file.close()
+        with self._cache_lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compressed archive of fetched FDA Philippines pages')
+    parser.add_argument('--path', default=ARCHIVE_DIR)
+    parser.add_argument('--train', action='store_true', help='train a compression dictionary from archived pages')
+    parser.add_argument('--stats', action='store_true', help='show archive size and compression ratio')
+    args = parser.parse_args()
+
+    archive = Archive(args.path)
+    try:
+        if args.train:
+            archive.train_dictionary()
+        if args.stats or not args.train:
+            stats = archive.stats()
+            logging.info(f"🗄️ Archive {args.path}")
+            logging.info(f"   📄 {stats['pages']} pages in {stats['segments']} segments ({stats['codec']}, dictionary #{stats['dictionary']})")
+            logging.info(f"   📏 {stats['bytes_raw']:,} bytes raw -> {stats['bytes_stored']:,} bytes stored (x{stats['ratio']})")
+    finally:
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
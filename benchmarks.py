@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the FDA Philippines pipeline
+- Runs against a scratch copy of source.medical_guidelines (never the real table)
+- copy: rows/sec of per-row upsert_guideline vs. the COPY bulk loader
+- indexes: hot-query latency on a synthetic table before and after schema.migrate
+- classifier: titles/sec of the legacy any() scans vs. IssuanceClassifier (no DB needed)
+- search: ILIKE scans vs. Database.search on a synthetic table with varied text
+- startup: cold-start import time of cli.py commands, from python -X importtime (no DB needed)
+- documents: per-document dicts vs. document.Document, time and retained memory (no DB needed)
+- summarize: extractive summaries vs. the [:500] slice, per document (no DB needed)
+
+Usage: python3 benchmarks.py copy [--rows N] [--text-size CHARS]
+       python3 benchmarks.py indexes [--rows N]
+       python3 benchmarks.py classifier [--titles N]
+       python3 benchmarks.py search [--rows N]
+       python3 benchmarks.py startup [--commands status,plan] [--runs N]
+       python3 benchmarks.py documents [--documents N] [--text-size CHARS]
+       python3 benchmarks.py summarize [--documents N] [--text-size CHARS] [--batch N]
+"""
+import argparse
+import hashlib
+import random
+import statistics
+import string
+import subprocess
+import sys
+import time
+from datetime import date
+from config import TABLE_NAME
+from document import Document
+
+BENCH_TABLE = f"{TABLE_NAME}_bench"
+
+
+def synthetic_documents(count, text_size=8000, seed=42):
+    """Generate documents shaped like Fetcher.yield_all_pdfs output"""
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(2000)]
+    for i in range(count):
+        year = rng.choice(['2023', '2024', '2025'])
+        text = ' '.join(rng.choices(words, k=text_size // 7))
+        yield Document(
+            title=f"FDA Advisory No.{year}-{i:04d} || Synthetic advisory {i}",
+            link_guidance=f"https://www.fda.gov.ph/synthetic-advisory-{i}/",
+            all_text=text,
+            issue_date=date(int(year), 1, 1),
+        )
+
+
+def create_bench_table(conn):
+    """(Re)create an empty, unmigrated scratch table with the same columns as the real one"""
+    drop_bench_table(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE TABLE {BENCH_TABLE} (LIKE {TABLE_NAME} INCLUDING DEFAULTS)")
+    conn.commit()
+
+
+def drop_bench_table(conn):
+    from schema import applied_versions
+
+    # Make sure schema_migrations exists, then forget what was applied to the scratch table
+    applied_versions(conn, BENCH_TABLE)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        for suffix in ('staging', 'agency_stats', 'year_stats', 'daily_stats', 'minhash', 'lsh', 'jobs'):
+            cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}_{suffix}")
+        for function in ('stats_trigger()', 'stats_truncate()', 'search_trigger()', 'search_vector(TEXT, TEXT, TEXT)',
+                         'stats_apply(TEXT, TEXT, TIMESTAMP, BOOLEAN, INTEGER, INTEGER)'):
+            cur.execute(f"DROP FUNCTION IF EXISTS {BENCH_TABLE}_{function}")
+        cur.execute(f"DELETE FROM {BENCH_TABLE.rpartition('.')[0] or 'public'}.schema_migrations WHERE table_name = %s",
+                    (BENCH_TABLE,))
+    conn.commit()
+
+
+# Server-side body text: ~300 words drawn with a skewed distribution from a 5000-word
+# vocabulary; the regulatory terms sit in the rare tail so searches have realistic selectivity
+VARIED_TEXT_SQL = """
+    array_to_string(ARRAY(
+        SELECT vocabulary.words[1 + floor(power(random(), 3) * array_length(vocabulary.words, 1))::int]
+        FROM generate_series(1, 300 + g * 0)
+    ), ' ')
+"""
+VOCABULARY_SQL = """
+    (SELECT array_agg(substr(md5(i::text), 1, 2 + i % 7))
+            || ARRAY['unregistered', 'supplement', 'vaccine', 'cosmetic', 'advisory', 'recall', 'warning', 'medical', 'device']
+            AS words
+     FROM generate_series(1, 5000) i) vocabulary
+"""
+
+
+def fill_bench_table(conn, rows, varied_text=False):
+    """Fill the scratch table server-side with `rows` synthetic documents spread over 11 years"""
+    text_sql = VARIED_TEXT_SQL if varied_text else "repeat('synthetic regulatory text ', 100)"
+    vocabulary_sql = f", {VOCABULARY_SQL}" if varied_text else ""
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {BENCH_TABLE} (id, title, summary, issue_date, link_guidance, country, agency,
+                                       all_text, json_data, created_at, updated_at)
+            SELECT g,
+                   'FDA Advisory No.' || (2015 + g % 11) || '-' || g || ' || Synthetic advisory',
+                   'Synthetic summary ' || g,
+                   make_date(2015 + g % 11, 1 + g % 12, 1 + g % 28),
+                   'https://www.fda.gov.ph/synthetic-advisory-' || g || '/',
+                   'Philippines',
+                   CASE WHEN g % 10 = 0 THEN 'DOH Philippines' ELSE 'FDA Philippines' END,
+                   {text_sql},
+                   json_build_object('year', (2015 + g % 11)::text, 'content_length', 2600),
+                   now() - (g % 3650) * interval '1 day',
+                   now()
+            FROM generate_series(1, %s) g{vocabulary_sql}
+        """, (rows,))
+        cur.execute(f"ANALYZE {BENCH_TABLE}")
+    conn.commit()
+
+
+def time_query(conn, sql, params_list, repeat=20):
+    """Median latency in milliseconds of running `sql` once per params tuple"""
+    timings = []
+    with conn.cursor() as cur:
+        for i in range(repeat):
+            start = time.perf_counter()
+            cur.execute(sql, params_list[i % len(params_list)])
+            cur.fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+    conn.rollback()
+    return statistics.median(timings)
+
+
+def hot_queries(rows, year_expression):
+    """The lookups system_status, upsert_guideline and the extractors run against the table"""
+    links = [(f"https://www.fda.gov.ph/synthetic-advisory-{random.randint(1, rows)}/",) for _ in range(20)]
+    return [
+        ('link_guidance lookup', f"SELECT id FROM {BENCH_TABLE} WHERE link_guidance = %s", links),
+        ('agency + created today', f"SELECT COUNT(*) FROM {BENCH_TABLE} WHERE agency = %s AND created_at >= CURRENT_DATE",
+         [('FDA Philippines',)]),
+        ('latest per agency', f"SELECT title, link_guidance FROM {BENCH_TABLE} WHERE agency = %s ORDER BY created_at DESC LIMIT 5",
+         [('FDA Philippines',)]),
+        ('documents for year', f"SELECT COUNT(*) FROM {BENCH_TABLE} WHERE {year_expression} = %s",
+         [('2024',), ('2019',)]),
+    ]
+
+
+def bench_indexes(rows):
+    from db import Database
+    from schema import migrate
+
+    db = Database(table_name=BENCH_TABLE, auto_migrate=False)
+    try:
+        create_bench_table(db.conn)
+        fill_bench_table(db.conn, rows)
+        before = [(label, time_query(db.conn, sql, params))
+                  for label, sql, params in hot_queries(rows, "json_data::json->>'year'")]
+
+        migrate(db.conn, BENCH_TABLE)
+        with db.conn.cursor() as cur:
+            cur.execute(f"ANALYZE {BENCH_TABLE}")
+        db.conn.commit()
+        after = [(label, time_query(db.conn, sql, params))
+                 for label, sql, params in hot_queries(rows, "json_data->>'year'")]
+
+        print(f'📊 HOT QUERY LATENCY ({rows} synthetic rows, median ms)')
+        print('=' * 60)
+        print(f'   {"query":<26}{"before":>10}{"after":>10}{"speedup":>10}')
+        for (label, before_ms), (_, after_ms) in zip(before, after):
+            print(f'   {label:<26}{before_ms:>10.2f}{after_ms:>10.2f}{before_ms / after_ms:>9.1f}x')
+    finally:
+        drop_bench_table(db.conn)
+        db.close()
+
+
+SEARCH_QUERIES = [
+    ('vaccine', None),
+    ('unregistered supplement', None),
+    ('recall warning', 'FDA Philippines'),
+    ('cosmetic -device', None),
+]
+
+
+def bench_search(rows):
+    from db import Database
+    from schema import migrate
+    import logging
+
+    logging.getLogger().setLevel(logging.WARNING)
+    db = Database(table_name=BENCH_TABLE, auto_migrate=False)
+    try:
+        create_bench_table(db.conn)
+        print(f'⏳ Generating {rows} synthetic documents...')
+        fill_bench_table(db.conn, rows, varied_text=True)
+
+        # Before: what finding a guideline looks like today
+        before = []
+        for query, agency in SEARCH_QUERIES:
+            terms = [term for term in query.split() if not term.startswith('-')]
+            conditions = ' AND '.join(['all_text ILIKE %s'] * len(terms))
+            params = [f'%{term}%' for term in terms]
+            if agency:
+                conditions += ' AND agency = %s'
+                params.append(agency)
+            sql = f"SELECT id, title FROM {BENCH_TABLE} WHERE {conditions} LIMIT 20"
+            before.append(time_query(db.conn, sql, [tuple(params)], repeat=5))
+
+        print('⏳ Building search vectors and GIN index...')
+        migrate(db.conn, BENCH_TABLE)
+        with db.conn.cursor() as cur:
+            cur.execute(f"ANALYZE {BENCH_TABLE}")
+        db.conn.commit()
+
+        after = []
+        for query, agency in SEARCH_QUERIES:
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                results = db.search(query, agency=agency, limit=20)
+                timings.append((time.perf_counter() - start) * 1000)
+            after.append((statistics.median(timings), len(results)))
+
+        print(f'📊 SEARCH LATENCY ({rows} synthetic documents, median ms, top 20)')
+        print('=' * 60)
+        print(f'   {"query":<28}{"ILIKE":>10}{"search()":>10}{"hits":>6}')
+        for (query, agency), before_ms, (after_ms, hits) in zip(SEARCH_QUERIES, before, after):
+            label = f"{query} [{agency}]" if agency else query
+            print(f'   {label[:27]:<28}{before_ms:>10.1f}{after_ms:>10.1f}{hits:>6}')
+    finally:
+        drop_bench_table(db.conn)
+        db.close()
+
+
+def bench_copy(rows, text_size):
+    from db import Database
+    from bulk_loader import BulkLoader
+    from schema import migrate
+    import logging
+
+    # Per-row log lines would dominate the upsert timing
+    logging.getLogger().setLevel(logging.WARNING)
+
+    db = Database(table_name=BENCH_TABLE, auto_migrate=False)
+    try:
+        create_bench_table(db.conn)
+        # Both paths run against the fully migrated schema (indexes, stats triggers, metadata columns)
+        migrate(db.conn, BENCH_TABLE)
+        documents = list(synthetic_documents(rows, text_size))
+
+        start = time.perf_counter()
+        for doc in documents:
+            db.upsert_guideline(**doc)
+        upsert_elapsed = time.perf_counter() - start
+
+        create_bench_table(db.conn)
+        start = time.perf_counter()
+        BulkLoader(db.conn, table_name=BENCH_TABLE).load(iter(documents))
+        copy_elapsed = time.perf_counter() - start
+
+        print(f'📊 BULK LOAD BENCHMARK ({rows} documents, ~{text_size} chars each)')
+        print('=' * 60)
+        print(f'   upsert_guideline : {upsert_elapsed:8.2f}s  {rows / upsert_elapsed:10.0f} rows/sec')
+        print(f'   COPY bulk loader : {copy_elapsed:8.2f}s  {rows / copy_elapsed:10.0f} rows/sec')
+        print(f'   🚀 Speedup: {upsert_elapsed / copy_elapsed:.1f}x')
+    finally:
+        drop_bench_table(db.conn)
+        db.close()
+
+
+def synthetic_titles(count, seed=42):
+    """WordPress-style titles: ~half regulatory issuances, the rest news and events"""
+    rng = random.Random(seed)
+    templates = [
+        'FDA Advisory No.{year}-{n:04d} || Public Health Warning Against Unregistered Product {n}',
+        'FDA Circular No.{year}-{n:03d} || Guidelines on Product Registration {n}',
+        'Administrative Order No.{year}-{n:04d} || Rules and Regulations {n}',
+        'ANNOUNCEMENT || Schedule of Seminar {n}',
+        'ITB No. {year}-{n:02d} || Procurement of Laboratory Equipment',
+        'FDA Memorandum No.{year}-{n:03d} || Implementation Updates',
+        'Photo Release: FDA Director General visits region {n}',
+        'Happy Independence Day {year}!',
+        'Job Vacancy: Food-Drug Regulation Officer {n}',
+        'FDA conducts orientation on food safety {n} || News',
+    ]
+    return [rng.choice(templates).format(year=rng.choice(['2023', '2024', '2025']), n=i) for i in range(count)]
+
+
+def _legacy_is_regulatory(title):
+    """The pre-classifier check from Fetcher._fetch_from_latest_issuances_page"""
+    return (
+        '||' in title and (
+            any(doc_type in title for doc_type in [
+                'FDA Circular No.', 'Administrative Order No.', 'FDA Order No.',
+                'FDA Memorandum', 'DEPARTMENT CIRCULAR NO.', 'FDA Advisory No.',
+                'ITB No.', 'ANNOUNCEMENT'
+            ]) or
+            any(pattern in title.lower() for pattern in [
+                'circular no.', 'order no.', 'advisory no.', 'memorandum no.',
+                'administrative order', 'fda circular', 'fda advisory',
+                'fda memorandum', 'itb no.', 'announcement'
+            ])
+        )
+    )
+
+
+def _best_of(func, runs=5):
+    """(result, fastest elapsed seconds) of `runs` calls; in-process timings of a few ms are noisy"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def bench_classifier(count):
+    from classifier import IssuanceClassifier
+
+    titles = synthetic_titles(count)
+    pages = [titles[i:i + 100] for i in range(0, len(titles), 100)]
+
+    def per_title():
+        classifier = IssuanceClassifier()  # fresh per run, so its type label cache starts cold
+        return [classifier.classify(title) for title in titles]
+
+    def per_page():
+        classifier = IssuanceClassifier()
+        return [result for page in pages for result in classifier.classify_titles(page)]
+
+    legacy, legacy_elapsed = _best_of(lambda: [_legacy_is_regulatory(title) for title in titles])
+    single, single_elapsed = _best_of(per_title)
+    batched, batch_elapsed = _best_of(per_page)
+
+    mismatches = sum(1 for old, new in zip(legacy, batched) if old != new.is_regulatory)
+    batch_mismatches = sum(1 for one, page in zip(single, batched) if one != page)
+    with_number = sum(1 for result in batched if result.number)
+
+    print(f'📊 CLASSIFIER BENCHMARK ({count} titles, pages of 100, best of 5)')
+    print('=' * 60)
+    print(f'   legacy any() scans          : {legacy_elapsed * 1000:8.1f} ms  {count / legacy_elapsed:10.0f} titles/sec')
+    print(f'   classifier, per title       : {single_elapsed * 1000:8.1f} ms  {count / single_elapsed:10.0f} titles/sec')
+    print(f'   classifier, per API page    : {batch_elapsed * 1000:8.1f} ms  {count / batch_elapsed:10.0f} titles/sec')
+    print(f'   🔢 Type + number extracted  : {with_number} titles')
+    print(f'   {"✅" if not mismatches else "⚠️"} Disagreements with legacy check: {mismatches}')
+    print(f'   {"✅" if not batch_mismatches else "⚠️"} Per title vs per page differences: {batch_mismatches}')
+
+
+def _legacy_build_document(post, meta):
+    """The dict built per document before document.Document (sources.build_document)"""
+    content = post.get('content', '')
+    return {
+        'title': post.get('title', 'Unknown Title'),
+        'summary': content[:500] + '...' if len(content) > 500 else content,
+        'issue_date': meta.issue_date,
+        'products': ', '.join(meta.product_categories) if meta.product_categories else None,
+        'link_guidance': post.get('url', ''),
+        'link_file': None,
+        'country': 'Philippines',
+        'agency': 'FDA Philippines',
+        'all_text': content,
+        'json_data': {
+            'source_url': post.get('url'),
+            'extraction_date': post.get('extraction_date'),
+            'content_length': len(content),
+            'is_text_only': True,
+            'year': meta.issue_date.strftime('%Y') if meta.issue_date else None
+        },
+        'issuance_type': meta.issuance_type,
+        'issuance_number': meta.issuance_number,
+        'effective_date': meta.effective_date,
+        'product_categories': meta.product_categories
+    }
+
+
+def _consume_document(doc):
+    """What DocumentWriter.store and the job queue read from each document"""
+    return (doc['title'], doc['summary'], doc['products'], doc['json_data'], doc['all_text'],
+            hashlib.md5(doc['all_text'].encode('utf-8')).hexdigest())
+
+
+def bench_documents(count, text_size):
+    """Per-document dicts vs. document.Document: build + consume time and retained memory"""
+    import tracemalloc
+    from metadata import IssuanceMetadata
+
+    meta = IssuanceMetadata('FDA Advisory', '2025-0001', date(2025, 1, 1), None, ['Drugs', 'Food'])
+    posts = [{'title': doc.title, 'url': doc.link_guidance, 'content': doc.all_text, 'date': '2025-01-01'}
+             for doc in synthetic_documents(count, text_size)]
+    builders = (
+        ('dict per document', lambda post: _legacy_build_document(post, meta), _consume_document),
+        ('document.Document', lambda post: Document.from_post(post, meta),
+         lambda doc: (doc.title, doc.summary, doc.products, doc.json_data, doc.all_text, doc.text_hash)),
+    )
+    print(f'📊 DOCUMENT MODEL BENCHMARK ({count} documents of {text_size} chars)')
+    print('=' * 60)
+    for label, build, consume in builders:
+        tracemalloc.start()
+        start = time.perf_counter()
+        documents = [build(post) for post in posts]
+        for doc in documents:
+            consume(doc)
+        elapsed = time.perf_counter() - start
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'   {label:<18}: {elapsed * 1000:8.1f} ms  {retained / count:8.0f} bytes/document retained')
+        del documents
+
+
+def _latest_post_fetch_seconds():
+    """Median post download time of the latest crawl report (crawlstats.py), or None"""
+    import glob
+    import json
+    import os
+    from config import CRAWL_REPORT_DIR
+
+    for path in sorted(glob.glob(os.path.join(CRAWL_REPORT_DIR, 'crawl-*.json')), key=os.path.getmtime, reverse=True):
+        try:
+            with open(path, encoding='utf-8') as f:
+                post = json.load(f)['classes'].get('post')
+        except (OSError, ValueError, KeyError):
+            continue
+        if post and post['total_s']['p50']:
+            return post['total_s']['p50']
+    return None
+
+
+def bench_summarize(count, text_size, batch_size):
+    """Extractive summaries vs. the [:500] slice, per document, on pages with shared site chrome"""
+    from summarizer import Summarizer
+
+    rng = random.Random(7)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(3000)]
+
+    def sentence():
+        return ' '.join(rng.choices(words, k=rng.randint(8, 25))).capitalize() + '.'
+    chrome = ' '.join(sentence() for _ in range(12))
+    posts = []
+    for i in range(count):
+        body = []
+        while sum(len(s) + 1 for s in body) < text_size:
+            body.append(sentence())
+        posts.append({'title': f"FDA Advisory No.2025-{i:04d} || Synthetic advisory {i}",
+                      'url': f"https://www.fda.gov.ph/synthetic-advisory-{i}/",
+                      'content': f"{chrome} FDA Advisory No.2025-{i:04d} TO : ALL CONCERNED SUBJECT : "
+                                 f"Synthetic advisory {i}. {' '.join(body)} {chrome}"})
+
+    start = time.perf_counter()
+    sliced = [post['content'][:500] + '...' for post in posts]
+    slice_elapsed = time.perf_counter() - start
+
+    summarizer = Summarizer()
+    start = time.perf_counter()
+    summaries = []
+    for i in range(0, count, batch_size):
+        summaries += summarizer.summarize_batch(posts[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    chrome_head = chrome[:200]
+    print(f'📊 SUMMARIZER BENCHMARK ({count} documents of ~{text_size} chars, batches of {batch_size})')
+    print('=' * 60)
+    print(f'   [:500] slice               : {slice_elapsed / count * 1000:8.3f} ms/document, '
+          f'{sum(chrome_head in s for s in sliced)} start with site chrome')
+    print(f'   extractive summary         : {elapsed / count * 1000:8.3f} ms/document, '
+          f'{sum(chrome_head in s for s in summaries)} contain site chrome, '
+          f'{sum(s.startswith("TO: ") for s in summaries)} keep the memo header')
+    fetch = _latest_post_fetch_seconds()
+    if fetch:
+        print(f'   post fetch (latest crawl)  : {fetch * 1000:8.1f} ms median, '
+              f'summarizing costs {100 * elapsed / count / fetch:.1f}% of it')
+
+
+def import_times(code):
+    """{module: (self_us, cumulative_us, depth)} from one `python -X importtime -c code` run"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(own), int(cumulative), depth)
+    return times
+
+
+def bench_startup(commands, runs):
+    baseline = set(import_times('pass'))  # the interpreter's own start-up (site, encodings, ...)
+    print(f'📊 STARTUP BENCHMARK (python -X importtime, median of {runs} runs)')
+    print('=' * 60)
+    for command in commands:
+        code = f"import cli; cli.load({command!r})"
+        totals = []
+        for _ in range(runs):
+            times = {name: t for name, t in import_times(code).items() if name not in baseline}
+            totals.append(sum(own for own, _, _ in times.values()))
+        top_depth = min(depth for _, _, depth in times.values())
+        heaviest = sorted(((cumulative, name) for name, (_, cumulative, depth) in times.items()
+                           if depth <= top_depth + 1 and name != 'cli'), reverse=True)[:4]
+        loaded = [heavy for heavy in ('fitz', 'bs4', 'requests', 'psycopg2') if heavy in times]
+        print(f'   {command:<12}: {statistics.median(totals) / 1000:7.1f} ms  '
+              f'({", ".join(f"{name} {cumulative / 1000:.0f}" for cumulative, name in heaviest)})'
+              f'  loads: {", ".join(loaded) or "-"}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FDA Philippines pipeline benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    copy_parser = subparsers.add_parser('copy', help='per-row upsert vs. COPY bulk loader')
+    copy_parser.add_argument('--rows', type=int, default=2000)
+    copy_parser.add_argument('--text-size', type=int, default=8000)
+
+    indexes_parser = subparsers.add_parser('indexes', help='hot-query latency before/after schema migrations')
+    indexes_parser.add_argument('--rows', type=int, default=100000)
+
+    classifier_parser = subparsers.add_parser('classifier', help='legacy regulatory check vs. IssuanceClassifier')
+    classifier_parser.add_argument('--titles', type=int, default=17383)
+
+    search_parser = subparsers.add_parser('search', help='ILIKE scans vs. full-text search()')
+    search_parser.add_argument('--rows', type=int, default=100000)
+
+    startup_parser = subparsers.add_parser('startup', help='cold-start import time of cli.py commands')
+    startup_parser.add_argument('--commands', default='status,plan,check-urls')
+    startup_parser.add_argument('--runs', type=int, default=5)
+
+    documents_parser = subparsers.add_parser('documents', help='per-document dicts vs. document.Document')
+    documents_parser.add_argument('--documents', type=int, default=17383)
+    documents_parser.add_argument('--text-size', type=int, default=8000)
+
+    summarize_parser = subparsers.add_parser('summarize', help='extractive summaries vs. the [:500] slice')
+    summarize_parser.add_argument('--documents', type=int, default=2000)
+    summarize_parser.add_argument('--text-size', type=int, default=8000)
+    summarize_parser.add_argument('--batch', type=int, default=100)
+
+    args = parser.parse_args()
+    if args.benchmark == 'copy':
+        bench_copy(args.rows, args.text_size)
+    elif args.benchmark == 'indexes':
+        bench_indexes(args.rows)
+    elif args.benchmark == 'classifier':
+        bench_classifier(args.titles)
+    elif args.benchmark == 'search':
+        bench_search(args.rows)
+    elif args.benchmark == 'startup':
+        bench_startup([command.strip() for command in args.commands.split(',')], args.runs)
+    elif args.benchmark == 'documents':
+        bench_documents(args.documents, args.text_size)
+    elif args.benchmark == 'summarize':
+        bench_summarize(args.documents, args.text_size, args.batch)
+
+
+if __name__ == '__main__':
+    main()
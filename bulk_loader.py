@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+COPY-based bulk loader for large initial loads / backfills
+- Streams documents as CSV through COPY into an UNLOGGED staging table
+- Merges staging into source.medical_guidelines with one INSERT ... SELECT ... ON CONFLICT
+- Rows are encoded one at a time, so large all_text / json_data never share one giant buffer
+"""
+import json
+import logging
+import time
+from config import TABLE_NAME
+from metrics import metrics
+from schema import migrate
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+# Same column order as Database.upsert_guideline
+COLUMNS = ('title', 'summary', 'issue_date', 'products', 'link_guidance',
+           'link_file', 'country', 'agency', 'all_text', 'json_data',
+           'issuance_type', 'issuance_number', 'effective_date', 'product_categories')
+
+
+def _csv_field(value):
+    """Encode one value for COPY ... (FORMAT csv): unquoted empty is NULL, everything else is quoted"""
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, (list, tuple)):
+        # PostgreSQL array literal, e.g. {"Drugs","Food"}
+        value = '{' + ','.join('"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"' for item in value) + '}'
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _csv_rows(documents):
+    """Yield one encoded CSV line per document"""
+    for doc in documents:
+        if not doc.get('link_guidance'):
+            continue
+        yield (','.join(_csv_field(doc.get(column)) for column in COLUMNS) + '\n').encode('utf-8')
+
+
+class _CopyStream:
+    """File-like object that COPY reads from; pulls encoded rows lazily from a generator"""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._buffer = b''
+        self.row_count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._rows)
+                self.row_count += 1
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+class BulkLoader:
+    """Load many documents at once via COPY + a single merge statement"""
+
+    def __init__(self, conn, table_name=TABLE_NAME):
+        self.conn = conn
+        self.table_name = table_name
+        self.staging_table = f"{table_name}_staging"
+
+    def prepare(self):
+        """Make sure the unique index the merge relies on (and the metadata columns) exist"""
+        migrate(self.conn, self.table_name)
+
+    def _create_staging(self, cur):
+        # Recreated on every load so its columns always match COLUMNS
+        cur.execute(f"DROP TABLE IF EXISTS {self.staging_table}")
+        cur.execute(f"""
+            CREATE UNLOGGED TABLE {self.staging_table} (
+                seq BIGSERIAL,
+                title TEXT,
+                summary TEXT,
+                issue_date DATE,
+                products TEXT,
+                link_guidance TEXT,
+                link_file TEXT,
+                country TEXT,
+                agency TEXT,
+                all_text TEXT,
+                json_data TEXT,
+                issuance_type TEXT,
+                issuance_number TEXT,
+                effective_date DATE,
+                product_categories TEXT[]
+            )
+        """)
+
+    def load(self, documents, chunk_size=64 * 1024):
+        """
+        Stream `documents` (dicts shaped like Fetcher.yield_all_pdfs output) into the table.
+        Returns the number of rows inserted or updated.
+        """
+        self.prepare()
+        start = time.perf_counter()
+        stream = _CopyStream(_csv_rows(documents))
+        columns = ', '.join(COLUMNS)
+        update_columns = ', '.join(f"{column} = EXCLUDED.{column}" for column in COLUMNS if column != 'link_guidance')
+
+        try:
+            with self.conn.cursor() as cur:
+                # One bulk load at a time may use the staging table
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self.staging_table,))
+                self._create_staging(cur)
+                cur.copy_expert(f"COPY {self.staging_table} ({columns}) FROM STDIN WITH (FORMAT csv)", stream, size=chunk_size)
+                copied = time.perf_counter()
+                logging.info(f"📥 COPY staged {stream.row_count} documents in {copied - start:.2f}s")
+
+                # Same id allocation lock as Database._get_next_id
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self.table_name,))
+                cur.execute(f"""
+                    INSERT INTO {self.table_name} (id, {columns}, created_at, updated_at)
+                    SELECT base.max_id + row_number() OVER (ORDER BY s.seq),
+                           {', '.join('s.json_data::jsonb' if column == 'json_data' else 's.' + column for column in COLUMNS)},
+                           clock_timestamp(), clock_timestamp()
+                    FROM (
+                        SELECT DISTINCT ON (link_guidance) *
+                        FROM {self.staging_table}
+                        ORDER BY link_guidance, seq DESC
+                    ) s
+                    CROSS JOIN (SELECT COALESCE(MAX(id), 0) AS max_id FROM {self.table_name}) base
+                    ON CONFLICT (link_guidance) DO UPDATE SET
+                        {update_columns},
+                        updated_at = EXCLUDED.updated_at
+                """)
+                merged = cur.rowcount
+                cur.execute(f"TRUNCATE {self.staging_table}")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        elapsed = time.perf_counter() - start
+        metrics.observe('db.statement.bulk_load', elapsed)
+        metrics.incr('db.bulk_load.rows', merged)
+        rate = merged / elapsed if elapsed else 0
+        logging.info(f"💾 Bulk loaded {merged} documents in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+        return merged
+
+
+def main():
+    """Backfill everything the fetcher currently yields in one COPY"""
+    from fetcher import Fetcher
+    from db import Database
+
+    db = Database()
+    try:
+        BulkLoader(db.conn).load(Fetcher().yield_all_pdfs())
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,37 @@
 #!/usr/bin/env python3
 """
-Quick URL check - stop early to see what URLs fetcher provides
+Quick URL check - the first documents the next run would fetch
+Listing only (see plan.py): no post pages are downloaded and nothing is stored
 """
-from fetcher import Fetcher
+from plan import build_plan
 
-def check_fetcher_urls():
-    fetcher = Fetcher()
-    count = 0
-    
-    print('🔍 CHECKING URLs FROM FETCHER (FIRST 5 ONLY):')
-    print('=' * 60)
-    
+
+def check_fetcher_urls(limit=5):
+    from http_client import HttpClient
+    from sources import FDA_PHILIPPINES
+
+    client = HttpClient()
     try:
-        for pdf_info in fetcher.yield_all_pdfs():
-            count += 1
-            print(f'{count}. Title: {pdf_info["title"][:50]}...')
-            print(f'   URL: "{pdf_info["link_guidance"]}"')
-            print(f'   Source URL: "{pdf_info.get("json_data", {}).get("source_url", "")}"')
-            print()
-            
-            if count >= 5:  # Stop after 5
-                print(f'🛑 Stopping after {count} documents to avoid full processing')
-                break
-                
-    except KeyboardInterrupt:
-        print(f'\n⏹️  Stopped by user after {count} documents')
-    except Exception as e:
-        print(f'\n❌ Error: {e}')
-    
-    print(f'\n✅ Checked {count} documents')
+        plan = build_plan([FDA_PHILIPPINES], client)
+    finally:
+        client.close()
+
+    print(f'🔍 CHECKING URLs FROM THE LISTING (FIRST {limit} ONLY):')
+    print('=' * 60)
+
+    source = plan['sources'][0]
+    # Changed documents are re-fetched by the job queue only; the run skips processed URLs
+    docs = source['new']
+    for count, doc in enumerate(docs[:limit], 1):
+        print(f'{count}. Title: {(doc["title"] or "")[:50]}...')
+        print(f'   URL: "{doc["url"]}"')
+        print(f'   Date: {doc["date"]}  Type: {doc["doc_type"]} {doc["doc_number"] or ""}')
+        print()
+
+    print(f'\n✅ {len(docs)} documents would be fetched ({source["counts"]["changed"]} changed for the job queue, '
+          f'{source["counts"]["skipped"]} skipped); '
+          f'full plan: python3 cli.py plan')
+
 
 if __name__ == '__main__':
     check_fetcher_urls()
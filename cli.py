@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Single command-line entry point for the pipeline
+- One subcommand per tool; the remaining arguments go to that tool's own parser
+- Only the chosen subcommand's module is imported, so `status` never loads requests / bs4 and
+  no command loads PyMuPDF until a PDF is extracted
+- Cold start per command: python3 benchmarks.py startup
+
+Usage: python3 cli.py status
+       python3 cli.py plan [--json]
+       python3 cli.py run [--profile]
+       python3 cli.py schedule --sources fda_ph
+       python3 cli.py <command> --help
+"""
+import sys
+
+# command -> (module, function, description, takes its own arguments)
+COMMANDS = {
+    'status': ('system_status', 'print_system_status', 'database and file status', False),
+    'plan': ('plan', 'main', 'dry run: new / changed / skipped documents from the listing only', True),
+    'check-urls': ('check_urls', 'check_fetcher_urls', 'print the first documents the next run would fetch', False),
+    'run': ('main_updated', 'main', 'fetch the FDA Philippines listing and store new documents', False),
+    'schedule': ('scheduler', 'main', 'ingest several sources concurrently', True),
+    'daemon': ('daemon', 'main', 'run the pipeline on a schedule with a health endpoint', True),
+    'queue': ('jobqueue', 'main', 'durable job queue: enqueue / work / status', True),
+    'migrate': ('schema', 'main', 'apply or list schema migrations', True),
+    'dedup': ('dedup', 'main', 'near-duplicate index maintenance', True),
+    'archive': ('archive', 'main', 'page archive statistics and dictionary training', True),
+    'cache': ('extractcache', 'main', 'extraction cache statistics / clear', True),
+    'reextract': ('reextract', 'main', 're-extract stored documents from the page archive', True),
+    'summarize': ('summarizer', 'main', 'preview extractive summaries of archived pages', True),
+    'export': ('export', 'main', 'incremental Parquet / Arrow corpus export', True),
+    'bulk-load': ('bulk_loader', 'main', 'COPY-based backfill of everything the fetcher yields', False),
+    'bench': ('benchmarks', 'main', 'pipeline benchmarks', True),
+}
+
+
+def usage():
+    width = max(len(name) for name in COMMANDS)
+    lines = ['usage: cli.py <command> [arguments]', '', 'commands:']
+    lines += [f"  {name:<{width}}  {spec[2]}" for name, spec in COMMANDS.items()]
+    return '\n'.join(lines)
+
+
+def load(command):
+    """The entry function of `command`, importing its module on demand"""
+    import importlib
+    module_name, function, _, _ = COMMANDS[command]
+    return getattr(importlib.import_module(module_name), function)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"cli.py: unknown command '{command}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    entry = load(command)
+    if COMMANDS[command][3]:
+        # The module parses sys.argv itself
+        sys.argv = [f"cli.py {command}"] + args
+        entry()
+        return 0
+
+    import profiling
+    with profiling.profile_run(command.replace('-', '_'), profiling.mode_from_argv(args)):
+        entry()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,12 +5,17 @@ Complete FDA Philippines content extraction with full text and URLs
 - Stores proper URLs 
 - Keeps existing entries (no deletion)
 - Processes all available documents
+- Re-checks every URL in one pass; for scheduled refreshes use jobqueue.py (adaptive revisit intervals)
 """
 import logging
-import requests
 from bs4 import BeautifulSoup
 from db import Database
-import time
+from http_client import default_client
+import extractcache
+import profiling
+from document import Document
+from metadata import MetadataExtractor
+from summarizer import Summarizer
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 
@@ -23,50 +28,71 @@ class CompleteFDAExtractor:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         }
+        # Shared session with adaptive per-host politeness instead of fixed sleeps
+        self.client = default_client()
+        # Parsed pages are memoized by URL + content across runs and scripts (see extractcache.py)
+        self.cache = extractcache.default_cache()
+        self.cache_namespace = f'complete:{extractcache.code_version(self._parse_page)}'
+        self.summarizer = Summarizer(max_chars=1000)
     
     def extract_complete_content(self, url):
         """Extract complete full text content from FDA Philippines URL"""
         try:
-            print(f'   🌐 Fetching: {url[:80]}...')
-            
-            response = requests.get(url, timeout=30, headers=self.HEADERS)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Get text content
-            text_content = soup.get_text()
-            
-            # Clean up the text
-            lines = (line.strip() for line in text_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            clean_text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            # Get title from the page
-            title_tag = soup.find('title')
-            page_title = title_tag.get_text().strip() if title_tag else 'FDA Document'
-            
-            # Clean up title (remove site suffix)
-            if ' - Food and Drug Administration' in page_title:
-                page_title = page_title.replace(' - Food and Drug Administration', '')
+            page = self.cache.recent(self.cache_namespace, url) if self.cache is not None else None
+            if page is not None:
+                print(f'   🧠 Extracted recently, not fetching again: {url[:80]}...')
+            else:
+                print(f'   🌐 Fetching: {url[:80]}...')
+
+                with profiling.stage('fetch'):
+                    response = self.client.get(url, timeout=30, headers=self.HEADERS)
+                response.raise_for_status()
+
+                html = response.text
+                if self.cache is not None:
+                    page = self.cache.memoize(self.cache_namespace, url, html, lambda: self._parse_page(html))
+                else:
+                    page = self._parse_page(html)
             
-            print(f'   ✅ Extracted {len(clean_text)} characters')
+            print(f'   ✅ Extracted {len(page["content"])} characters')
             
             return {
-                'title': page_title,
-                'content': clean_text,
+                'title': page['title'],
+                'content': page['content'],
                 'url': url,
-                'content_length': len(clean_text)
+                'content_length': len(page['content'])
             }
             
         except Exception as e:
             print(f'   ❌ Failed to extract from {url}: {e}')
             return None
     
+    def _parse_page(self, html):
+        """{'title', 'content'} of a fetched page"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "footer", "header"]):
+            script.decompose()
+
+        # Get text content
+        text_content = soup.get_text()
+
+        # Clean up the text
+        lines = (line.strip() for line in text_content.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        clean_text = ' '.join(chunk for chunk in chunks if chunk)
+
+        # Get title from the page
+        title_tag = soup.find('title')
+        page_title = title_tag.get_text().strip() if title_tag else 'FDA Document'
+
+        # Clean up title (remove site suffix)
+        if ' - Food and Drug Administration' in page_title:
+            page_title = page_title.replace(' - Food and Drug Administration', '')
+
+        return {'title': page_title, 'content': clean_text}
+
     def process_all_urls(self):
         """Process all URLs from processed_urls.txt with complete content extraction"""
         
@@ -89,6 +115,7 @@ class CompleteFDAExtractor:
         
         # Initialize database
         db = Database()
+        metadata_extractor = MetadataExtractor()
         
         try:
             processed_count = 0
@@ -103,28 +130,26 @@ class CompleteFDAExtractor:
                     existing = cursor.fetchone()
                 
                 # Extract complete content
-                doc_data = self.extract_complete_content(url)
+                with profiling.stage('extract'):
+                    doc_data = self.extract_complete_content(url)
                 
                 if doc_data:
                     try:
+                        with profiling.stage('metadata'):
+                            meta = metadata_extractor.extract(doc_data['title'], doc_data['content'])
+
+                        # Proper summary from full content
+                        with profiling.stage('summarize'):
+                            summary = self.summarizer.summarize(doc_data['content'], doc_data['title'], url)
+
                         # Store/update in database with COMPLETE content
-                        db.upsert_guideline(
-                            title=doc_data['title'],
-                            summary=doc_data['content'][:1000] + '...' if len(doc_data['content']) > 1000 else doc_data['content'],  # Proper summary from full content
-                            issue_date=None,
-                            products=None,
-                            link_guidance=doc_data['url'],  # Complete URL
-                            link_file=None,
-                            country='Philippines',
-                            agency='FDA Philippines',
-                            all_text=doc_data['content'],  # COMPLETE FULL TEXT - NO TRUNCATION
-                            json_data={
-                                'source_url': doc_data['url'],
-                                'content_length': doc_data['content_length'],
+                        with profiling.stage('store'):
+                            # COMPLETE FULL TEXT - NO TRUNCATION
+                            doc = Document.from_post(doc_data, meta, summary=summary, extra={
                                 'extraction_method': 'complete_content_extraction',
                                 'processed_date': '2025-08-27'
-                            }
-                        )
+                            })
+                            db.upsert_document(doc)
                         
                         action = 'Updated' if existing else 'Inserted'
                         print(f'   ✅ {action} document with {doc_data["content_length"]} characters')
@@ -138,9 +163,6 @@ class CompleteFDAExtractor:
                 # Progress update every 50 documents
                 if i % 50 == 0:
                     print(f'\\n📊 Progress: {i}/{len(urls)} processed ({success_count} successful)')
-                
-                # Small delay to be respectful to the server
-                time.sleep(0.5)
             
             print(f'\\n🎉 PROCESSING COMPLETE!')
             print(f'   📊 Total URLs processed: {processed_count}')
@@ -150,39 +172,33 @@ class CompleteFDAExtractor:
             
             # Final verification
             print(f'\\n🔍 FINAL VERIFICATION:')
-            with db.conn.cursor() as cursor:
-                cursor.execute('SELECT COUNT(*) FROM source.medical_guidelines WHERE agency = %s', ('FDA Philippines',))
-                total_count = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT AVG(LENGTH(all_text)) FROM source.medical_guidelines WHERE agency = %s AND all_text IS NOT NULL', ('FDA Philippines',))
-                avg_length = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM source.medical_guidelines WHERE agency = %s AND link_guidance IS NOT NULL', ('FDA Philippines',))
-                url_count = cursor.fetchone()[0]
-                
-                print(f'   📊 Total FDA Philippines documents: {total_count}')
-                print(f'   📝 Average content length: {int(avg_length) if avg_length else 0} characters')
-                print(f'   🔗 Documents with URLs: {url_count}')
-                
-                # Show sample of complete content
-                cursor.execute('SELECT title, link_guidance, LENGTH(all_text) FROM source.medical_guidelines WHERE agency = %s ORDER BY created_at DESC LIMIT 3', ('FDA Philippines',))
-                samples = cursor.fetchall()
-                
-                print(f'\\n📋 Sample documents with complete content:')
-                for title, url, content_length in samples:
-                    print(f'   - {title[:60]}...')
-                    print(f'     URL: {url[:70]}...')
-                    print(f'     Content: {content_length} characters')
-                    print()
+            fda_stats = db.stats_snapshot()['agencies'].get('FDA Philippines', {})
+            print(f'   📊 Total FDA Philippines documents: {fda_stats.get("documents", 0)}')
+            print(f'   📝 Average content length: {fda_stats.get("avg_length", 0)} characters')
+            print(f'   🔗 Documents with URLs: {fda_stats.get("with_urls", 0)}')
+
+            # Show sample of complete content
+            samples = db.iter_rows(['title', 'link_guidance', 'LENGTH(all_text) AS content_length'],
+                                   where='agency = %s', params=('FDA Philippines',),
+                                   order_by='created_at DESC', limit=3)
+
+            print(f'\\n📋 Sample documents with complete content:')
+            for title, url, content_length in samples:
+                print(f'   - {title[:60]}...')
+                print(f'     URL: {url[:70]}...')
+                print(f'     Content: {content_length} characters')
+                print()
         
         except Exception as e:
             print(f'❌ Error: {e}')
         finally:
             db.close()
+            extractcache.log_report()
 
 def main():
     extractor = CompleteFDAExtractor()
     extractor.process_all_urls()
 
 if __name__ == '__main__':
-    main()
+    with profiling.profile_run('complete_extraction', profiling.mode_from_argv()):
+        main()
@@ -6,11 +6,15 @@ Complete FDA Philippines Guidelines Extraction for Current & Previous Year
 - Comprehensive coverage of all regulatory documents
 """
 import logging
-import requests
 from bs4 import BeautifulSoup
 from db import Database
-import time
-import re
+from http_client import default_client
+import extractcache
+import profiling
+from classifier import IssuanceClassifier
+from document import Document
+from metadata import MetadataExtractor
+from summarizer import Summarizer
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
@@ -24,7 +28,16 @@ class ComprehensiveFDAExtractor:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         }
+        # Shared session with adaptive per-host politeness instead of fixed sleeps
+        self.client = default_client()
+        # Parsed pages are memoized by URL + content across runs and scripts (see extractcache.py)
+        self.cache = extractcache.default_cache()
+        self.cache_namespace = f'comprehensive:{extractcache.code_version(self._parse_page)}'
         
+        self.classifier = IssuanceClassifier(extra_keywords=['draft for comments'])
+        self.metadata_extractor = MetadataExtractor()
+        self.summarizer = Summarizer(max_chars=1000)
+
         # Dynamic year calculation
         current_year = datetime.now().year
         self.target_years = [str(current_year), str(current_year - 1)]
@@ -33,40 +46,25 @@ class ComprehensiveFDAExtractor:
     def extract_complete_content(self, url, title=""):
         """Extract complete full text content from FDA Philippines URL"""
         try:
-            print(f'   🌐 Fetching: {url[:80]}...')
-            
-            response = requests.get(url, timeout=30, headers=self.HEADERS)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove navigation and non-content elements
-            for element in soup(["script", "style", "nav", "footer", "header", "aside", "noscript"]):
-                element.decompose()
-            
-            # Get text content
-            text_content = soup.get_text()
-            
-            # Clean up the text
-            lines = (line.strip() for line in text_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            clean_text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            # Get title from the page if not provided
-            if not title:
-                title_tag = soup.find('title')
-                title = title_tag.get_text().strip() if title_tag else 'FDA Document'
+            page = self.cache.recent(self.cache_namespace, url) if self.cache is not None else None
+            if page is not None:
+                print(f'   🧠 Extracted recently, not fetching again: {url[:80]}...')
+            else:
+                print(f'   🌐 Fetching: {url[:80]}...')
                 
-                # Clean up title (remove site suffix)
-                if ' - Food and Drug Administration' in title:
-                    title = title.replace(' - Food and Drug Administration', '')
-            
-            # Extract issue date from title if possible
-            issue_date = None
-            date_match = re.search(r'(\d{4})', title)
-            if date_match:
-                year = date_match.group(1)
-                issue_date = f"{year}-01-01"  # Default to start of year
+                with profiling.stage('fetch'):
+                    response = self.client.get(url, timeout=30, headers=self.HEADERS)
+                response.raise_for_status()
+
+                html = response.text
+                if self.cache is not None:
+                    page = self.cache.memoize(self.cache_namespace, url, html, lambda: self._parse_page(html))
+                else:
+                    page = self._parse_page(html)
+
+            # Title from the page if not provided
+            title = title or page['title']
+            clean_text = page['content']
             
             print(f'   ✅ Extracted {len(clean_text)} characters')
             
@@ -74,14 +72,38 @@ class ComprehensiveFDAExtractor:
                 'title': title,
                 'content': clean_text,
                 'url': url,
-                'content_length': len(clean_text),
-                'issue_date': issue_date
+                'content_length': len(clean_text)
             }
             
         except Exception as e:
             print(f'   ❌ Failed to extract from {url}: {e}')
             return None
     
+    def _parse_page(self, html):
+        """{'title', 'content'} of a fetched page"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Remove navigation and non-content elements
+        for element in soup(["script", "style", "nav", "footer", "header", "aside", "noscript"]):
+            element.decompose()
+
+        # Get text content
+        text_content = soup.get_text()
+
+        # Clean up the text
+        lines = (line.strip() for line in text_content.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        clean_text = ' '.join(chunk for chunk in chunks if chunk)
+
+        title_tag = soup.find('title')
+        title = title_tag.get_text().strip() if title_tag else 'FDA Document'
+
+        # Clean up title (remove site suffix)
+        if ' - Food and Drug Administration' in title:
+            title = title.replace(' - Food and Drug Administration', '')
+
+        return {'title': title, 'content': clean_text}
+
     def fetch_all_guidelines_from_api(self):
         """Fetch ALL regulatory documents from WordPress API for target years"""
         
@@ -105,7 +127,7 @@ class ComprehensiveFDAExtractor:
                 
                 print(f'📄 Fetching page {page} from WordPress API...')
                 
-                resp = requests.get(api_url, params=params, timeout=15, headers=self.HEADERS)
+                resp = self.client.get(api_url, params=params, timeout=15, headers=self.HEADERS)
                 if resp.status_code != 200:
                     print(f'⚠️ API request failed for page {page}: {resp.status_code}')
                     break
@@ -123,8 +145,9 @@ class ComprehensiveFDAExtractor:
                 
                 page_documents = 0
                 found_older_docs = False
+                classifications = self.classifier.classify_posts(posts_data)
                 
-                for post in posts_data:
+                for post, classification in zip(posts_data, classifications):
                     title = post.get('title', {}).get('rendered', '')
                     link = post.get('link', '')
                     date = post.get('date', '')
@@ -139,29 +162,15 @@ class ComprehensiveFDAExtractor:
                             found_older_docs = True
                         continue
                     
-                    # Check if it's a regulatory document
-                    is_regulatory = (
-                        '||' in title and (
-                            any(doc_type in title for doc_type in [
-                                'FDA Circular No.', 'Administrative Order No.', 'FDA Order No.',
-                                'FDA Memorandum', 'DEPARTMENT CIRCULAR NO.', 'FDA Advisory No.',
-                                'ITB No.', 'ANNOUNCEMENT', 'Announcement'
-                            ]) or
-                            any(pattern in title.lower() for pattern in [
-                                'circular no.', 'order no.', 'advisory no.', 'memorandum no.',
-                                'administrative order', 'fda circular', 'fda advisory',
-                                'fda memorandum', 'itb no.', 'announcement', 'draft for comments'
-                            ])
-                        )
-                    )
-                    
-                    if is_regulatory:
+                    if classification.is_regulatory:
                         all_documents.append({
                             'title': title,
                             'url': link,
                             'date': date[:10],
                             'excerpt': excerpt,
-                            'year': year
+                            'year': year,
+                            'doc_type': classification.doc_type,
+                            'doc_number': classification.number
                         })
                         page_documents += 1
                         total_found += 1
@@ -173,7 +182,6 @@ class ComprehensiveFDAExtractor:
                     break
                 
                 page += 1
-                time.sleep(0.5)  # Be respectful to the API
             
             print(f'\\n📊 TOTAL GUIDELINES FOUND: {total_found} from {"/".join(self.target_years)}')
             
@@ -205,7 +213,8 @@ class ComprehensiveFDAExtractor:
         print()
         
         # Fetch all guidelines from API
-        guidelines = self.fetch_all_guidelines_from_api()
+        with profiling.stage('listing'):
+            guidelines = self.fetch_all_guidelines_from_api()
         
         if not guidelines:
             print('❌ No guidelines found!')
@@ -227,30 +236,28 @@ class ComprehensiveFDAExtractor:
                 print(f'   📅 Date: {guideline["date"]} ({guideline["year"]})')
                 
                 # Extract complete content
-                doc_data = self.extract_complete_content(guideline['url'], guideline['title'])
+                with profiling.stage('extract'):
+                    doc_data = self.extract_complete_content(guideline['url'], guideline['title'])
                 
                 if doc_data:
                     try:
+                        with profiling.stage('metadata'):
+                            meta = self.metadata_extractor.extract(doc_data['title'], doc_data['content'], guideline['date'])
+
+                        with profiling.stage('summarize'):
+                            summary = self.summarizer.summarize(doc_data['content'], doc_data['title'], guideline['url'])
+
                         # Store in database with COMPLETE content
-                        db.upsert_guideline(
-                            title=doc_data['title'],
-                            summary=doc_data['content'][:1000] + '...' if len(doc_data['content']) > 1000 else doc_data['content'],
-                            issue_date=doc_data.get('issue_date'),
-                            products=None,
-                            link_guidance=doc_data['url'],
-                            link_file=None,
-                            country='Philippines',
-                            agency='FDA Philippines',
-                            all_text=doc_data['content'],  # COMPLETE FULL TEXT
-                            json_data={
-                                'source_url': doc_data['url'],
-                                'content_length': doc_data['content_length'],
-                                'extraction_date': guideline['date'],
+                        with profiling.stage('store'):
+                            # COMPLETE FULL TEXT
+                            doc = Document.from_post(doc_data, meta, summary=summary, extraction_date=guideline['date'], extra={
                                 'year': guideline['year'],
+                                'doc_type': guideline['doc_type'],
+                                'doc_number': guideline['doc_number'],
                                 'extraction_method': 'comprehensive_api_extraction',
                                 'processed_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                            }
-                        )
+                            })
+                            db.upsert_document(doc)
                         
                         print(f'   ✅ Stored with {doc_data["content_length"]} characters of complete content')
                         success_count += 1
@@ -267,9 +274,6 @@ class ComprehensiveFDAExtractor:
                 # Progress update every 25 documents
                 if i % 25 == 0:
                     print(f'\\n📊 Progress: {i}/{len(guidelines)} processed ({success_count} successful, {failed_count} failed)')
-                
-                # Small delay to be respectful to the server
-                time.sleep(0.8)
             
             print(f'\\n🎉 COMPREHENSIVE EXTRACTION COMPLETE!')
             print(f'   📊 Total guidelines processed: {processed_count}')
@@ -279,50 +283,35 @@ class ComprehensiveFDAExtractor:
             
             # Final verification
             print(f'\\n🔍 FINAL DATABASE VERIFICATION:')
-            with db.conn.cursor() as cursor:
-                cursor.execute('SELECT COUNT(*) FROM source.medical_guidelines WHERE agency = %s', ('FDA Philippines',))
-                total_count = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT AVG(LENGTH(all_text)) FROM source.medical_guidelines WHERE agency = %s AND all_text IS NOT NULL', ('FDA Philippines',))
-                avg_length = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM source.medical_guidelines WHERE agency = %s AND link_guidance IS NOT NULL', ('FDA Philippines',))
-                url_count = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(DISTINCT json_data::json->>\'year\') FROM source.medical_guidelines WHERE agency = %s', ('FDA Philippines',))
-                year_coverage = cursor.fetchone()[0]
-                
-                print(f'   📊 Total FDA Philippines guidelines: {total_count}')
-                print(f'   📝 Average content length: {int(avg_length) if avg_length else 0} characters')
-                print(f'   🔗 Guidelines with URLs: {url_count}')
-                print(f'   📅 Years covered: {year_coverage}')
-                
-                # Show sample of different document types
-                cursor.execute('''
-                    SELECT title, link_guidance, LENGTH(all_text), 
-                           json_data::json->>'year' as year
-                    FROM source.medical_guidelines 
-                    WHERE agency = %s 
-                    ORDER BY created_at DESC 
-                    LIMIT 5
-                ''', ('FDA Philippines',))
-                samples = cursor.fetchall()
-                
-                print(f'\\n📋 Sample guidelines with complete content:')
-                for title, url, content_length, year in samples:
-                    print(f'   📄 [{year}] {title[:50]}...')
-                    print(f'      🔗 {url[:60]}...')
-                    print(f'      📝 Content: {content_length} characters')
-                    print()
+            fda_stats = db.stats_snapshot()['agencies'].get('FDA Philippines', {})
+            print(f'   📊 Total FDA Philippines guidelines: {fda_stats.get("documents", 0)}')
+            print(f'   📝 Average content length: {fda_stats.get("avg_length", 0)} characters')
+            print(f'   🔗 Guidelines with URLs: {fda_stats.get("with_urls", 0)}')
+            print(f'   📅 Years covered: {len([year for year in fda_stats.get("years", {}) if year])}')
+
+            # Show sample of different document types
+            samples = db.iter_rows(['title', 'link_guidance', 'LENGTH(all_text) AS content_length',
+                                    "json_data->>'year' AS year"],
+                                   where='agency = %s', params=('FDA Philippines',),
+                                   order_by='created_at DESC', limit=5)
+
+            print(f'\\n📋 Sample guidelines with complete content:')
+            for title, url, content_length, year in samples:
+                print(f'   📄 [{year}] {title[:50]}...')
+                print(f'      🔗 {url[:60]}...')
+                print(f'      📝 Content: {content_length} characters')
+                print()
         
         except Exception as e:
             print(f'❌ Error during processing: {e}')
         finally:
             db.close()
+            extractcache.log_report()
 
 def main():
     extractor = ComprehensiveFDAExtractor()
     extractor.process_all_guidelines()
 
 if __name__ == '__main__':
-    main()
+    with profiling.profile_run('comprehensive_extraction', profiling.mode_from_argv()):
+        main()
@@ -20,5 +20,69 @@ PH_DOWNLOAD_DIR = os.path.join(DOWNLOAD_DIR, 'ph')
 # FDA API endpoint (example, update as needed)
 FDA_API_URL = 'https://www.fda.gov.ph/wp-json/wp/v2/posts?categories=latest-issuances&per_page=100&page={page}'
 
+# WordPress REST API posts endpoint used for listing (see sources.FDA_PHILIPPINES)
+FDA_WP_POSTS_URL = 'https://www.fda.gov.ph/wp-json/wp/v2/posts'
+
 # PH guidance base URL
 PH_GUIDANCE_URL = 'https://www.fda.gov.ph/latest-issuances/'
+
+# Connection pool for concurrent writers (see db.ConnectionPool)
+DB_POOL_MIN = int(os.getenv('FDA_DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.getenv('FDA_DB_POOL_MAX', '8'))
+DB_POOL_TIMEOUT = float(os.getenv('FDA_DB_POOL_TIMEOUT', '30'))  # seconds to wait for a free connection
+DB_HEALTHCHECK_INTERVAL = 60  # seconds a connection may sit idle before it is pinged
+DB_ITERSIZE = int(os.getenv('FDA_DB_ITERSIZE', '1000'))  # rows per round trip for server-side cursor scans
+
+# Compressed archive of raw HTML + extracted text (see archive.Archive)
+ARCHIVE_ENABLED = os.getenv('FDA_ARCHIVE', '1') != '0'
+ARCHIVE_DIR = os.getenv('FDA_ARCHIVE_DIR', os.path.join(DOWNLOAD_DIR, 'archive'))
+ARCHIVE_SEGMENT_BYTES = 64 * 1024 * 1024  # roll over to a new segment file at this size
+ARCHIVE_DICT_BYTES = 112 * 1024           # size of the trained compression dictionary
+
+# Parquet / Arrow corpus exports (see export.py)
+EXPORT_DIR = os.getenv('FDA_EXPORT_DIR', os.path.join(DOWNLOAD_DIR, 'export'))
+# Rows updated less than this many seconds ago wait for the next export; a writer's transaction
+# may still commit an updated_at from before the watermark within this window
+EXPORT_LAG_SECONDS = int(os.getenv('FDA_EXPORT_LAG_SECONDS', '300'))
+
+# Per-run crawl analytics reports (see crawlstats.py)
+CRAWL_REPORT_DIR = os.getenv('FDA_CRAWL_REPORT_DIR', os.path.join(DOWNLOAD_DIR, 'crawl_reports'))
+
+# Shared HTTP client (see http_client.HttpClient)
+HTTP_POOL_SIZE = 16                     # keep-alive connections per host
+HTTP_TIMEOUT = 15                       # seconds
+DEFAULT_HOST_RATE = 2.0                 # requests per second to any one host (hard ceiling when adaptive)
+HOST_RATE_LIMITS = {
+    'www.fda.gov.ph': 2.0,
+}
+HTTP_ADAPTIVE = os.getenv('FDA_HTTP_ADAPTIVE', '1') != '0'  # AIMD rate/concurrency control (http_client.AdaptiveRateLimiter)
+HTTP_START_RATE = 1.0                   # requests per second to a host before any latency is observed
+HTTP_MIN_RATE = 0.1                     # back-off floor
+HTTP_MAX_CONCURRENCY = 4                # in-flight requests per host, hard ceiling
+HTTP_LATENCY_TOLERANCE = 2.0            # back off once latency exceeds this multiple of its baseline
+
+# Daemon mode (see daemon.py)
+DAEMON_SCHEDULE = os.getenv('FDA_DAEMON_SCHEDULE', '0 * * * *')  # cron expression or interval such as '30m'
+DAEMON_HEALTH_PORT = int(os.getenv('FDA_DAEMON_HEALTH_PORT', '8089'))  # 0 disables the health endpoint
+
+# Durable job queue (see jobqueue.py)
+JOB_LEASE_SECONDS = int(os.getenv('FDA_JOB_LEASE_SECONDS', '300'))  # a claimed job is retried after this long without completing
+JOB_MAX_ATTEMPTS = int(os.getenv('FDA_JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_DELAY = int(os.getenv('FDA_JOB_RETRY_DELAY', '60'))  # seconds per attempt before a failed job is retried
+JOB_REVISIT_INITIAL = int(os.getenv('FDA_JOB_REVISIT_INITIAL', str(7 * 86400)))  # first refresh of an ingested document
+JOB_REVISIT_MIN = int(os.getenv('FDA_JOB_REVISIT_MIN', '86400'))  # documents that keep changing
+JOB_REVISIT_MAX = int(os.getenv('FDA_JOB_REVISIT_MAX', str(180 * 86400)))  # documents that never change
+JOB_REFRESH_BATCH = int(os.getenv('FDA_JOB_REFRESH_BATCH', '200'))  # refresh jobs queued per run
+
+# Opt-in profiling (see profiling.py)
+PROFILE_MODE = os.getenv('FDA_PROFILE', '')  # 'cprofile' or 'sample' profiles every run (daemon: one cycle)
+PROFILE_DIR = os.getenv('FDA_PROFILE_DIR', os.path.join(DOWNLOAD_DIR, 'profiles'))
+PROFILE_INTERVAL_MS = float(os.getenv('FDA_PROFILE_INTERVAL_MS', '5'))
+
+# Extraction result cache (see extractcache.py)
+EXTRACT_CACHE_ENABLED = os.getenv('FDA_EXTRACT_CACHE', '1') != '0'
+EXTRACT_CACHE_PATH = os.getenv('FDA_EXTRACT_CACHE_PATH', os.path.join(DOWNLOAD_DIR, 'extract_cache.sqlite'))
+EXTRACT_CACHE_MEMORY_BYTES = int(os.getenv('FDA_EXTRACT_CACHE_MEMORY_MB', '64')) * 1024 * 1024
+EXTRACT_CACHE_DISK_BYTES = int(os.getenv('FDA_EXTRACT_CACHE_DISK_MB', '512')) * 1024 * 1024  # compressed values
+EXTRACT_CACHE_TTL = int(os.getenv('FDA_EXTRACT_CACHE_TTL', str(30 * 86400)))  # seconds before an entry expires
+EXTRACT_CACHE_FRESH_SECONDS = int(os.getenv('FDA_EXTRACT_CACHE_FRESH_SECONDS', '3600'))  # a URL extracted this recently is not fetched again
@@ -0,0 +1,230 @@
+"""
+Crawl analytics recorded at the transport layer (http_client.HttpClient)
+- Per URL class (listing / post / pdf): response sizes, time to first byte, total download time,
+  status codes, retries and connection errors
+- Size and latency histograms plus percentiles, for capacity planning
+- write_report() saves crawl-<run>.json and crawl-<run>.html under CRAWL_REPORT_DIR
+"""
+import html
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+from config import CRAWL_REPORT_DIR
+
+logging.basicConfig(level=logging.INFO)
+
+URL_CLASSES = ('listing', 'post', 'pdf')
+SIZE_BUCKETS = (16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024)  # bytes
+TIME_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+MAX_SAMPLES = 50000  # per class and series; the full 17k-post archive fits
+
+
+def classify_url(url):
+    """URL class used to group the report: WordPress API / listing pages, PDFs, everything else is a post"""
+    parts = urlsplit(url)
+    path = parts.path.lower()
+    if path.endswith('.pdf'):
+        return 'pdf'
+    if '/wp-json/' in path or '/page/' in path or 'page=' in parts.query or '/category/' in path:
+        return 'listing'
+    return 'post'
+
+
+def _histogram(samples, bounds):
+    counts = [0] * (len(bounds) + 1)
+    for value in samples:
+        i = 0
+        while i < len(bounds) and value > bounds[i]:
+            i += 1
+        counts[i] += 1
+    return counts
+
+
+def _percentiles(samples):
+    if not samples:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+    return {'p50': pct(0.50), 'p90': pct(0.90), 'p99': pct(0.99), 'max': ordered[-1]}
+
+
+class _ClassStats:
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.retries = 0
+        self.retried_requests = 0
+        self.errors = 0
+        self.statuses = {}
+        self.sizes = []
+        self.ttfb = []
+        self.total = []
+
+    def add(self, status, size, ttfb, total, retries):
+        self.requests += 1
+        self.retries += retries
+        if retries:
+            self.retried_requests += 1
+        if status is None:
+            self.errors += 1
+            return
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes += size
+        if len(self.sizes) < MAX_SAMPLES:
+            self.sizes.append(size)
+            self.ttfb.append(ttfb)
+            self.total.append(total)
+
+    def report(self):
+        return {
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'errors': self.errors,
+            'retries': self.retries,
+            'retried_requests': self.retried_requests,
+            'statuses': {str(code): count for code, count in sorted(self.statuses.items())},
+            'size_bytes': dict(_percentiles(self.sizes), mean=self.bytes / len(self.sizes) if self.sizes else None,
+                               histogram=_histogram(self.sizes, SIZE_BUCKETS)),
+            'ttfb_s': dict(_percentiles(self.ttfb), histogram=_histogram(self.ttfb, TIME_BUCKETS)),
+            'total_s': dict(_percentiles(self.total), sum=round(sum(self.total), 3),
+                            histogram=_histogram(self.total, TIME_BUCKETS)),
+        }
+
+
+class CrawlStats:
+    """Thread-safe per-run collector; HttpClient calls record() once per logical request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now()
+            self._classes = {}
+
+    def record(self, url, status, size=0, ttfb=0.0, total=0.0, retries=0, url_class=None):
+        """status None: every attempt failed with a connection error or timeout"""
+        url_class = url_class or classify_url(url)
+        with self._lock:
+            stats = self._classes.get(url_class)
+            if stats is None:
+                stats = self._classes[url_class] = _ClassStats()
+            stats.add(status, size, ttfb, total, retries)
+
+    def report(self):
+        with self._lock:
+            classes = {name: stats.report() for name, stats in self._classes.items()}
+            started_at = self.started_at
+        return {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'size_buckets': list(SIZE_BUCKETS),
+            'time_buckets': list(TIME_BUCKETS),
+            'totals': {
+                'requests': sum(c['requests'] for c in classes.values()),
+                'bytes': sum(c['bytes'] for c in classes.values()),
+                'download_s': round(sum(c['total_s']['sum'] for c in classes.values()), 3),
+                'errors': sum(c['errors'] for c in classes.values()),
+                'retries': sum(c['retries'] for c in classes.values()),
+            },
+            'classes': classes,
+        }
+
+    def write_report(self, out_dir=CRAWL_REPORT_DIR, run_id=None):
+        """Write the JSON and HTML report for this run; returns (json path, html path) or None if nothing was fetched"""
+        report = self.report()
+        if not report['totals']['requests']:
+            return None
+        run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S')
+        os.makedirs(out_dir, exist_ok=True)
+        json_path = os.path.join(out_dir, f'crawl-{run_id}.json')
+        html_path = os.path.join(out_dir, f'crawl-{run_id}.html')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(render_html(report))
+        totals = report['totals']
+        logging.info(f"📈 Crawl report: {totals['requests']} requests, {totals['bytes'] / 1048576:.1f} MiB, "
+                     f"{totals['download_s']:.0f}s downloading -> {html_path}")
+        return json_path, html_path
+
+
+def _bucket_labels(bounds, fmt):
+    labels = [f"≤ {fmt(bounds[0])}"]
+    labels += [f"{fmt(low)}–{fmt(high)}" for low, high in zip(bounds, bounds[1:])]
+    labels.append(f"> {fmt(bounds[-1])}")
+    return labels
+
+
+def _fmt_bytes(n):
+    if n is None:
+        return '–'
+    for unit in ('B', 'KiB', 'MiB'):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def _fmt_seconds(s):
+    return '–' if s is None else f"{s * 1000:.0f} ms" if s < 1 else f"{s:.2f} s"
+
+
+def _histogram_html(counts, labels):
+    peak = max(counts) or 1
+    rows = ''.join(
+        f"<tr><td>{html.escape(label)}</td><td class='n'>{count}</td>"
+        f"<td><div class='bar' style='width:{count * 100 // peak}%'></div></td></tr>"
+        for label, count in zip(labels, counts))
+    return f"<table class='hist'>{rows}</table>"
+
+
+def render_html(report):
+    size_labels = _bucket_labels(report['size_buckets'], _fmt_bytes)
+    time_labels = _bucket_labels(report['time_buckets'], _fmt_seconds)
+    totals = report['totals']
+    sections = []
+    for name in sorted(report['classes'], key=lambda n: URL_CLASSES.index(n) if n in URL_CLASSES else len(URL_CLASSES)):
+        c = report['classes'][name]
+        statuses = ', '.join(f"{code}: {count}" for code, count in c['statuses'].items()) or '–'
+        summary = ''.join(f"<tr><th>{label}</th><td>{_fmt_bytes(c['size_bytes'][key])}</td>"
+                          f"<td>{_fmt_seconds(c['ttfb_s'][key])}</td><td>{_fmt_seconds(c['total_s'][key])}</td></tr>"
+                          for label, key in (('p50', 'p50'), ('p90', 'p90'), ('p99', 'p99'), ('max', 'max')))
+        sections.append(f"""
+<h2>{html.escape(name)}</h2>
+<p>{c['requests']} requests · {_fmt_bytes(c['bytes'])} · {c['total_s']['sum']:.1f} s downloading ·
+{c['errors']} errors · {c['retries']} retries on {c['retried_requests']} requests · statuses {html.escape(statuses)}</p>
+<table><tr><th></th><th>size</th><th>TTFB</th><th>total</th></tr>{summary}</table>
+<div class='hists'>
+<div><h3>Size</h3>{_histogram_html(c['size_bytes']['histogram'], size_labels)}</div>
+<div><h3>TTFB</h3>{_histogram_html(c['ttfb_s']['histogram'], time_labels)}</div>
+<div><h3>Total time</h3>{_histogram_html(c['total_s']['histogram'], time_labels)}</div>
+</div>""")
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Crawl report {html.escape(report['started_at'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+table {{ border-collapse: collapse; margin: .5em 0; }}
+th, td {{ padding: 2px 10px; text-align: left; }}
+td.n {{ text-align: right; }}
+.hists {{ display: flex; gap: 3em; }}
+.hist td:last-child {{ width: 160px; }}
+.bar {{ background: #4a7ab5; height: 10px; }}
+</style></head><body>
+<h1>Crawl report</h1>
+<p>{html.escape(report['started_at'])} – {html.escape(report['finished_at'])} ·
+{totals['requests']} requests · {_fmt_bytes(totals['bytes'])} · {totals['download_s']:.1f} s downloading ·
+{totals['errors']} errors · {totals['retries']} retries</p>
+{''.join(sections)}
+</body></html>
+"""
+
+
+# Process-wide collector used by HttpClient unless it is given its own
+crawl_stats = CrawlStats()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Long-running ingestion daemon
+- Runs the multi-source scheduler on a cron-like schedule ("*/30 * * * *") or a fixed interval ("15m")
+- HTTP session, DB pool, page archive, processed-URL index and dedup detector stay warm between cycles
+- SIGTERM / SIGINT: finish the current cycle, then exit
+- SIGHUP: reload config.py (schedule, rate limits) and re-read the processed-URL files
+- GET /health on FDA_DAEMON_HEALTH_PORT: last-cycle latency, backlog, next run; GET /metrics: metrics snapshot
+- Profiling of a single cycle: FDA_PROFILE / --profile profile the first cycle, SIGUSR1 the next one (sampling)
+
+Usage: python3 daemon.py
+       python3 daemon.py --schedule 15m --sources fda_ph
+       python3 daemon.py --once         # a single cycle with the daemon's setup
+"""
+import argparse
+import importlib
+import json
+import logging
+import signal
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import profiling
+from metrics import metrics
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))  # minute hour day-of-month month day-of-week (0/7 = Sunday)
+_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-'))
+        else:
+            start = end = int(part)
+            if step:
+                end = high
+        if not (low <= start <= end <= high):
+            raise ValueError(f"Cron field '{field}' is outside {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class Schedule:
+    """A 5-field cron expression (minute hour day month weekday, 0 = Sunday) or an interval like '90s', '15m', '6h'"""
+
+    def __init__(self, spec):
+        self.spec = spec.strip()
+        self.interval = None
+        if self.spec[:-1].isdigit() and self.spec[-1] in _INTERVAL_UNITS:
+            self.interval = int(self.spec[:-1]) * _INTERVAL_UNITS[self.spec[-1]]
+            return
+        fields = self.spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Schedule must be an interval like '15m' or a 5-field cron expression, got '{spec}'")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(field, *_FIELD_RANGES[i]) for i, field in enumerate(fields))
+        self.weekdays = {day % 7 for day in weekdays}
+        # Cron semantics: with both day fields restricted, either may match
+        self._any_day = fields[2] != '*' and fields[4] != '*'
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.isoweekday() % 7) in self.weekdays
+        return (day or weekday) if self._any_day else (day and weekday)
+
+    def next_after(self, moment):
+        """First run time strictly after `moment`"""
+        if self.interval is not None:
+            return moment + timedelta(seconds=self.interval)
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Schedule '{self.spec}' never fires")
+
+
+class Daemon:
+    def __init__(self, schedule=None, source_names=None, health_port=None, profile=None):
+        import config
+        self._schedule_override = schedule
+        self.source_names = source_names
+        self.schedule = Schedule(schedule or config.DAEMON_SCHEDULE)
+        self.health_port = config.DAEMON_HEALTH_PORT if health_port is None else health_port
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._wake = threading.Event()  # interrupts the sleep between cycles
+        self.started_at = datetime.now()
+        self.cycles = 0
+        self.last_cycle = None
+        self.next_run = None
+        self.running = False
+        # Profiler mode for the next cycle only (see profiling.py)
+        self.profile_next = profile or config.PROFILE_MODE or None
+        self._setup()
+
+    def _setup(self):
+        """Open the long-lived resources shared by every cycle"""
+        from archive import Archive
+        from config import ARCHIVE_ENABLED
+        from db import ConnectionPool, Database
+        from extractcache import default_cache
+        from http_client import HttpClient
+        from scheduler import DocumentWriter, SourceScheduler
+        from sources import SOURCES, get_source
+
+        names = self.source_names or list(SOURCES)
+        self.pool = ConnectionPool()
+        self.client = HttpClient()
+        self.archive = Archive() if ARCHIVE_ENABLED else None
+        self.cache = default_cache()
+        self.writer = DocumentWriter(Database(pool=self.pool))
+        self.scheduler = SourceScheduler([get_source(name) for name in names], self.writer,
+                                         client=self.client, archive=self.archive)
+        logging.info(f"🔧 Daemon ready: sources {', '.join(names)}, schedule '{self.schedule.spec}'")
+
+    # ---- signals ---------------------------------------------------------
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        signal.signal(signal.SIGUSR1, self._handle_profile)
+
+    def _handle_stop(self, signum, frame):
+        logging.info(f"🛑 Received {signal.Signals(signum).name}, stopping after the current cycle")
+        self.stop()
+
+    def _handle_reload(self, signum, frame):
+        self._reload.set()
+        self._wake.set()
+
+    def _handle_profile(self, signum, frame):
+        # Low-overhead sampling, safe to switch on in production
+        self.profile_next = self.profile_next or 'sample'
+        logging.info(f"🔬 Received SIGUSR1, profiling the next cycle ({self.profile_next})")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def reload(self):
+        """Re-read config.py and the processed-URL files; pools and caches stay open"""
+        import config
+        importlib.reload(config)
+        self.schedule = Schedule(self._schedule_override or config.DAEMON_SCHEDULE)
+        for host, rate in config.HOST_RATE_LIMITS.items():
+            self.client.rate_limiter.set_rate(host, rate)
+        self.client.rate_limiter.default_rate = config.DEFAULT_HOST_RATE
+        for fetcher in self.scheduler.fetchers.values():
+            fetcher.reload_processed_urls()
+        self.next_run = self.schedule.next_after(datetime.now())
+        logging.info(f"🔄 Reloaded configuration; schedule '{self.schedule.spec}', next run {self.next_run:%Y-%m-%d %H:%M:%S}")
+
+    # ---- cycles ----------------------------------------------------------
+
+    def run_cycle(self):
+        started = datetime.now()
+        start = time.perf_counter()
+        stored_before = self.writer.stored
+        self.client.stats.reset()
+        self.running = True
+        profile, self.profile_next = self.profile_next, None
+        try:
+            with profiling.profile_run(f'daemon-cycle{self.cycles + 1}', profile) if profile else nullcontext():
+                results = self.scheduler.run()
+        finally:
+            self.running = False
+        duration = time.perf_counter() - start
+        self.cycles += 1
+        metrics.observe('daemon.cycle', duration)
+        self.last_cycle = {
+            'started_at': started.isoformat(timespec='seconds'),
+            'duration_s': round(duration, 3),
+            'stored': self.writer.stored - stored_before,
+            'failed_sources': sorted(name for name, result in results.items() if isinstance(result, Exception)),
+            'backlog': self.scheduler.backlog(),
+        }
+        logging.info(f"⏱️ Cycle {self.cycles} took {duration:.1f}s, stored {self.last_cycle['stored']} documents")
+        try:
+            self.client.stats.write_report(run_id=started.strftime('%Y%m%dT%H%M%S'))
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write crawl report: {e}")
+        self.client.stats.reset()
+        if self.cache is not None:
+            self.last_cycle['extract_cache'] = self.cache.log_report()
+            self.cache.reset()
+        return self.last_cycle
+
+    def run_forever(self):
+        self.next_run = datetime.now()
+        while not self._stop.is_set():
+            if self._reload.is_set():
+                self._reload.clear()
+                self.reload()
+            wait = (self.next_run - datetime.now()).total_seconds()
+            if wait > 0:
+                # Signals set _wake; the 60s cap also picks up clock changes
+                self._wake.wait(min(wait, 60))
+                self._wake.clear()
+                continue
+            try:
+                self.run_cycle()
+            except Exception as e:
+                logging.error(f"❌ Cycle failed: {e}")
+            self.next_run = self.schedule.next_after(datetime.now())
+            logging.info(f"💤 Next run at {self.next_run:%Y-%m-%d %H:%M:%S}")
+
+    # ---- health ----------------------------------------------------------
+
+    def health(self):
+        return {
+            'status': 'running' if self.running else 'idle',
+            'uptime_s': int((datetime.now() - self.started_at).total_seconds()),
+            'cycles': self.cycles,
+            'last_cycle': self.last_cycle,
+            'backlog': self.last_cycle['backlog'] if self.last_cycle else None,
+            'next_run_at': self.next_run.isoformat(timespec='seconds') if self.next_run else None,
+            'schedule': self.schedule.spec,
+            'pool_healthy': self.pool.health_check() if not self.running else None,
+            'hosts': self.client.rate_limiter.snapshot() if hasattr(self.client.rate_limiter, 'snapshot') else None,
+        }
+
+    def start_health_server(self):
+        if not self.health_port:
+            return None
+        daemon = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/health':
+                    body = daemon.health()
+                elif self.path == '/metrics':
+                    body = metrics.snapshot()
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(body, default=str).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', self.health_port), HealthHandler)
+        threading.Thread(target=server.serve_forever, name='health', daemon=True).start()
+        logging.info(f"🩺 Health endpoint on http://127.0.0.1:{self.health_port}/health")
+        self._health_server = server
+        return server
+
+    def close(self):
+        server = getattr(self, '_health_server', None)
+        if server is not None:
+            server.shutdown()
+        self.client.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.cache is not None:
+            self.cache.close()
+        self.pool.close()
+        logging.info("👋 Daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the ingestion pipeline as a long-running daemon')
+    parser.add_argument('--schedule', help="cron expression or interval (default: config.DAEMON_SCHEDULE)")
+    parser.add_argument('--sources', help='comma-separated source names (default: all registered)')
+    parser.add_argument('--health-port', type=int, default=None, help='0 disables the health endpoint')
+    parser.add_argument('--once', action='store_true', help='run a single cycle and exit')
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.sources.split(',')] if args.sources else None
+    daemon = Daemon(args.schedule, names, args.health_port, profile=args.profile)
+    try:
+        if args.once:
+            daemon.run_cycle()
+        else:
+            daemon.install_signal_handlers()
+            daemon.start_health_server()
+            daemon.run_forever()
+    finally:
+        daemon.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,67 +1,560 @@
+import itertools
 import logging
+import threading
+import time
+from collections import namedtuple
 import psycopg2
+from contextlib import contextmanager
 from psycopg2.extras import execute_values
-from config import DB_CONFIG, TABLE_NAME
-import uuid
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from config import DB_CONFIG, TABLE_NAME, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_HEALTHCHECK_INTERVAL, DB_ITERSIZE
+from metrics import metrics
 import json
-from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 
+# Errors that mean the connection itself is unusable and must be replaced
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# Metadata only some writers know; an update that passes None keeps the stored value
+# (reprocess_with_content.py and complete_extraction.py rewrite text without it)
+KEEP_IF_NONE = ('issuance_type', 'issuance_number', 'effective_date', 'product_categories', 'duplicate_of')
+
+
+def _row_type(columns):
+    """Namedtuple class for a column projection; 'LENGTH(all_text) AS content_length' becomes content_length"""
+    names = []
+    for column in columns:
+        head, sep, alias = column.rpartition(' ')
+        names.append(alias if sep and head.rstrip().lower().endswith(' as') else column.split('.')[-1])
+    return namedtuple('Row', names, rename=True)
+
+
+# Names of server-side cursors; only need to be unique per connection
+_scan_ids = itertools.count()
+
+
+SearchResult = namedtuple('SearchResult', ['id', 'title', 'link_guidance', 'agency', 'issue_date', 'rank', 'snippet'])
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes free within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool shared by several pipeline workers
+    - Backpressure: callers block (up to `timeout` seconds) when every connection is checked out
+    - Health checks: idle connections are pinged before reuse and replaced if dead
+    - Metrics: db.pool.wait (time spent waiting for a connection), db.pool.checkouts, db.pool.reconnects
+    """
+
+    def __init__(self, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+                 healthcheck_interval=DB_HEALTHCHECK_INTERVAL, **db_config):
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self._db_config = db_config or DB_CONFIG
+        self._pool = ThreadedConnectionPool(minconn, maxconn, **self._db_config)
+        # ThreadedConnectionPool raises immediately when exhausted; the semaphore turns that into waiting
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+        self._lock = threading.Lock()
+        logging.info(f"🔌 Opened PostgreSQL pool ({minconn}-{maxconn} connections)")
+
+    @contextmanager
+    def connection(self):
+        """Check out a healthy connection; it is returned (or discarded if broken) on exit"""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            metrics.incr('db.pool.timeouts')
+            raise PoolTimeout(f"No database connection available after {self.timeout}s ({self.maxconn} in use)")
+        metrics.observe('db.pool.wait', time.perf_counter() - start)
+        metrics.incr('db.pool.checkouts')
+
+        conn = None
+        broken = False
+        try:
+            conn = self._checkout()
+            yield conn
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            if conn is not None:
+                self._checkin(conn, broken)
+            self._slots.release()
+
+    def _checkout(self):
+        conn = self._pool.getconn()
+        if not self._is_healthy(conn):
+            logging.warning("   ⚠️ Discarding dead database connection, reconnecting...")
+            metrics.incr('db.pool.reconnects')
+            self._discard(conn)
+            conn = self._pool.getconn()
+        return conn
+
+    def _checkin(self, conn, broken):
+        if broken or conn.closed:
+            metrics.incr('db.pool.reconnects')
+            self._discard(conn)
+            return
+        try:
+            # Never hand a connection with an open transaction to the next worker
+            conn.rollback()
+        except CONNECTION_ERRORS:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._last_used[id(conn)] = time.monotonic()
+        self._pool.putconn(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        with self._lock:
+            last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.healthcheck_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+    def health_check(self):
+        """Return True if a connection can be checked out and answers a ping"""
+        try:
+            with self.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                    return cur.fetchone()[0] == 1
+        except (PoolError, *CONNECTION_ERRORS) as e:
+            logging.error(f"❌ Database health check failed: {e}")
+            return False
+
+    def close(self):
+        self._pool.closeall()
+        logging.info("🔌 Closed PostgreSQL pool")
+
+
 class Database:
-    def __init__(self):
-        self.conn = psycopg2.connect(**DB_CONFIG)
-        # Table already exists with the correct schema
+    _migrated = set()
 
-    def upsert_guideline(self, title, summary, issue_date, products, link_guidance, link_file, country, agency, all_text, json_data=None):
+    def __init__(self, pool=None, table_name=TABLE_NAME, auto_migrate=False):
+        # With a shared pool each write borrows a connection; otherwise keep one dedicated connection
+        self.pool = pool
+        self.table_name = table_name
+        self.conn = None if pool else psycopg2.connect(**DB_CONFIG)
+        # Migrations need owner rights and rewrite tables, so they run only when asked for
+        # (python3 cli.py migrate); auto_migrate applies them once per process
+        if auto_migrate and table_name not in Database._migrated:
+            from schema import migrate
+            with self._connection() as conn:
+                migrate(conn, table_name)
+            Database._migrated.add(table_name)
+
+    @contextmanager
+    def _connection(self):
+        if self.pool:
+            with self.pool.connection() as conn:
+                yield conn
+        else:
+            if self.conn.closed:
+                logging.warning("   ⚠️ Database connection lost, reconnecting...")
+                metrics.incr('db.reconnects')
+                self.conn = psycopg2.connect(**DB_CONFIG)
+            yield self.conn
+
+    def upsert_guideline(self, title, summary, issue_date, products, link_guidance, link_file, country, agency, all_text, json_data=None,
+                         issuance_type=None, issuance_number=None, effective_date=None, product_categories=None,
+                         duplicate_of=None, before_commit=None):
         """
-        Insert or update guideline in the existing database schema
+        Insert or update guideline in the existing database schema.
+        before_commit(cur, row_id), if given, runs in the same transaction (e.g. to mark a queue job done).
+        Returns the row id.
         """
         # Convert json_data to JSON string if it's a dict
         if isinstance(json_data, dict):
             json_data = json.dumps(json_data)
-        
-        with self.conn.cursor() as cur:
-            # Check if document already exists based on link_guidance URL
-            cur.execute(f"SELECT id FROM {TABLE_NAME} WHERE link_guidance = %s", (link_guidance,))
-            existing = cur.fetchone()
-            
-            if existing:
-                # Update existing record
+
+        values = {
+            'title': title,
+            'summary': summary,
+            'issue_date': issue_date,
+            'products': products,
+            'link_guidance': link_guidance,
+            'link_file': link_file,
+            'country': country,
+            'agency': agency,
+            'all_text': all_text,
+            'json_data': json_data,
+            'issuance_type': issuance_type,
+            'issuance_number': issuance_number,
+            'effective_date': effective_date,
+            'product_categories': product_categories,
+            'duplicate_of': duplicate_of,
+        }
+        try:
+            return self._upsert_row(values, before_commit)
+        except CONNECTION_ERRORS as e:
+            # The broken connection has already been dropped; retry once on a fresh one
+            logging.warning(f"   ⚠️ Database connection error ({e}), retrying once...")
+            return self._upsert_row(values, before_commit)
+
+    def upsert_document(self, doc, json_data=None, duplicate_of=None, before_commit=None):
+        """
+        upsert_guideline() for a document.Document, using its cached summary and json_data.
+        A near-duplicate keeps its text; duplicate_of links it to the canonical row.
+        """
+        return self.upsert_guideline(
+            title=doc.title,
+            summary=doc.summary,
+            issue_date=doc.issue_date,
+            products=doc.products,
+            link_guidance=doc.link_guidance,
+            link_file=doc.link_file,
+            country=doc.country,
+            agency=doc.agency,
+            all_text=doc.all_text,
+            json_data=json_data or doc.json_data,
+            issuance_type=doc.issuance_type,
+            issuance_number=doc.issuance_number,
+            effective_date=doc.effective_date,
+            product_categories=doc.product_categories,
+            duplicate_of=duplicate_of,
+            before_commit=before_commit
+        )
+
+    def _upsert_row(self, values, before_commit=None):
+        title, link_guidance = values['title'], values['link_guidance']
+        with self._connection() as conn:
+            start = time.perf_counter()
+            try:
+                with conn.cursor() as cur:
+                    # Serialize writers of the same URL so concurrent workers can't both insert it
+                    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (link_guidance,))
+
+                    # Check if document already exists based on link_guidance URL
+                    cur.execute(f"SELECT id FROM {self.table_name} WHERE link_guidance = %s", (link_guidance,))
+                    existing = cur.fetchone()
+
+                    if existing:
+                        row_id = existing[0]
+                        # Update existing record
+                        columns = [column for column in values if column != 'link_guidance']
+                        assignments = ', '.join(f"{column} = COALESCE(%s, {column})" if column in KEEP_IF_NONE
+                                                else f"{column} = %s" for column in columns)
+                        # updated_at from the server clock, as every writer sets it (see export_rows)
+                        cur.execute(f"UPDATE {self.table_name} SET {assignments}, updated_at = clock_timestamp() "
+                                    "WHERE link_guidance = %s", [values[column] for column in columns] + [link_guidance])
+                        logging.info(f"   📝 Updated existing document: {title[:50]}...")
+                    else:
+                        # Insert new record
+                        row_id = self._get_next_id(cur)
+                        columns = ', '.join(values)
+                        placeholders = ', '.join(['%s'] * (len(values) + 1))
+                        cur.execute(f"INSERT INTO {self.table_name} (id, {columns}, created_at, updated_at) "
+                                    f"VALUES ({placeholders}, clock_timestamp(), clock_timestamp())",
+                                    [row_id] + list(values.values()))
+                        logging.info(f"   💾 Inserted new document: {title[:50]}...")
+
+                    if before_commit is not None:
+                        before_commit(cur, row_id)
+
+                conn.commit()
+                return row_id
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                metrics.observe('db.statement.upsert', time.perf_counter() - start)
+
+    def _prefix(self):
+        """Qualified name prefix of the side tables created by schema.py, e.g. source.medical_guidelines"""
+        schema, _, name = self.table_name.rpartition('.')
+        return f"{schema or 'public'}.{name}"
+
+    def _get_next_id(self, cur):
+        """Get the next available ID for the sequence"""
+        # MAX(id) + 1 is only safe while one writer allocates at a time
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self.table_name,))
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {self.table_name}")
+        return cur.fetchone()[0]
+
+    def save_minhash(self, guideline_id, signature, band_keys):
+        """Store (or replace) a document's MinHash signature and its LSH band buckets"""
+        prefix = self._prefix()
+        with self._connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"""
+                        INSERT INTO {prefix}_minhash (guideline_id, signature) VALUES (%s, %s)
+                        ON CONFLICT (guideline_id) DO UPDATE SET signature = EXCLUDED.signature
+                    """, (guideline_id, list(signature)))
+                    cur.execute(f"DELETE FROM {prefix}_lsh WHERE guideline_id = %s", (guideline_id,))
+                    execute_values(cur, f"INSERT INTO {prefix}_lsh (band, bucket, guideline_id) VALUES %s",
+                                   [(band, bucket, guideline_id) for band, bucket in band_keys])
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+
+    def minhash_candidates(self, band_keys, exclude_link=None):
+        """
+        Canonical documents sharing at least one LSH bucket with `band_keys`.
+        Returns (id, link_guidance, issuance_number, signature) tuples; only index lookups, no table scan.
+        """
+        prefix = self._prefix()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
                 cur.execute(f"""
-                    UPDATE {TABLE_NAME} SET
-                        title = %s,
-                        summary = %s,
-                        issue_date = %s,
-                        products = %s,
-                        link_file = %s,
-                        country = %s,
-                        agency = %s,
-                        all_text = %s,
-                        json_data = %s,
-                        updated_at = %s
-                    WHERE link_guidance = %s
-                """, (title, summary, issue_date, products, link_file, country, agency, all_text, json_data, datetime.now(), link_guidance))
-                logging.info(f"   📝 Updated existing document: {title[:50]}...")
-            else:
-                # Insert new record
-                new_id = self._get_next_id()
+                    SELECT g.id, g.link_guidance, g.issuance_number, m.signature
+                    FROM (
+                        SELECT DISTINCT l.guideline_id
+                        FROM {prefix}_lsh l
+                        JOIN (SELECT * FROM unnest(%s::smallint[], %s::bigint[]) AS k(band, bucket)) keys
+                          ON l.band = keys.band AND l.bucket = keys.bucket
+                    ) c
+                    JOIN {prefix}_minhash m ON m.guideline_id = c.guideline_id
+                    JOIN {self.table_name} g ON g.id = c.guideline_id
+                    WHERE g.duplicate_of IS NULL AND g.link_guidance IS DISTINCT FROM %s
+                """, ([band for band, _ in band_keys], [bucket for _, bucket in band_keys], exclude_link))
+                rows = cur.fetchall()
+            conn.rollback()
+        return rows
+
+    def documents_without_minhash(self, after_id=0, limit=200):
+        """
+        Canonical documents not yet in the MinHash index, in id order:
+        (id, link_guidance, title, issuance_number, all_text)
+        """
+        prefix = self._prefix()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
                 cur.execute(f"""
-                    INSERT INTO {TABLE_NAME} (
-                        id, title, summary, issue_date, products, link_guidance, 
-                        link_file, country, agency, all_text, json_data, created_at, updated_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (new_id, title, summary, issue_date, products, link_guidance, link_file, 
-                      country, agency, all_text, json_data, datetime.now(), datetime.now()))
-                logging.info(f"   💾 Inserted new document: {title[:50]}...")
-            
-            self.conn.commit()
-
-    def _get_next_id(self):
-        """Get the next available ID for the sequence"""
-        with self.conn.cursor() as cur:
-            cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {TABLE_NAME}")
-            return cur.fetchone()[0]
+                    SELECT g.id, g.link_guidance, g.title, g.issuance_number, g.all_text
+                    FROM {self.table_name} g
+                    LEFT JOIN {prefix}_minhash m ON m.guideline_id = g.id
+                    WHERE g.id > %s AND m.guideline_id IS NULL AND g.duplicate_of IS NULL AND g.all_text IS NOT NULL
+                    ORDER BY g.id
+                    LIMIT %s
+                """, (after_id, limit))
+                rows = cur.fetchall()
+            conn.rollback()
+        return rows
+
+    def link_duplicate(self, guideline_id, canonical_id):
+        """Mark an existing row as a near-duplicate of `canonical_id`"""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"UPDATE {self.table_name} SET duplicate_of = %s WHERE id = %s", (canonical_id, guideline_id))
+            conn.commit()
+
+    def text_hashes(self):
+        """{link_guidance: md5(all_text)} for canonical documents, to detect changed re-extractions"""
+        return dict(self.iter_query(f"""
+            SELECT link_guidance, md5(all_text) FROM {self.table_name}
+            WHERE duplicate_of IS NULL AND link_guidance IS NOT NULL
+        """))
+
+    def update_extracted(self, documents, page_size=100):
+        """
+        Batch-update the extracted fields of existing rows (matched on link_guidance).
+        Dates, issuance fields and json_data keys (e.g. year) keep their stored value when the new
+        extraction found none. The rows' MinHash signatures are dropped in the same transaction, so the
+        next dedup.rebuild() indexes the new text.
+        """
+        rows = [(doc['link_guidance'], doc['summary'], doc['all_text'], doc['products'],
+                 json.dumps(doc['json_data']), doc['issue_date'], doc['effective_date'],
+                 doc['issuance_type'], doc['issuance_number'], doc['product_categories'])
+                for doc in documents]
+        if not rows:
+            return 0
+        with self._connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    execute_values(cur, f"""
+                        UPDATE {self.table_name} AS g SET
+                            summary = v.summary,
+                            all_text = v.all_text,
+                            products = COALESCE(v.products, g.products),
+                            json_data = COALESCE(g.json_data, '{{}}'::jsonb) || jsonb_strip_nulls(v.json_data::jsonb),
+                            issue_date = COALESCE(v.issue_date::date, g.issue_date),
+                            effective_date = COALESCE(v.effective_date::date, g.effective_date),
+                            issuance_type = COALESCE(v.issuance_type, g.issuance_type),
+                            issuance_number = COALESCE(v.issuance_number, g.issuance_number),
+                            product_categories = COALESCE(v.product_categories::text[], g.product_categories),
+                            updated_at = clock_timestamp()
+                        FROM (VALUES %s) AS v (link_guidance, summary, all_text, products, json_data, issue_date,
+                                               effective_date, issuance_type, issuance_number, product_categories)
+                        WHERE g.link_guidance = v.link_guidance
+                    """, rows, page_size=page_size)
+                    prefix = self._prefix()
+                    links = [row[0] for row in rows]
+                    cur.execute(f"""
+                        WITH stale AS (
+                            DELETE FROM {prefix}_minhash m USING {self.table_name} g
+                            WHERE m.guideline_id = g.id AND g.link_guidance = ANY(%s)
+                            RETURNING m.guideline_id
+                        )
+                        DELETE FROM {prefix}_lsh l USING stale WHERE l.guideline_id = stale.guideline_id
+                    """, (links,))
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+        metrics.incr('db.rows.reextracted', len(rows))
+        return len(rows)
+
+    def iter_query(self, sql, params=(), itersize=DB_ITERSIZE):
+        """
+        Stream the rows of a read-only query through a named server-side cursor.
+        Rows arrive `itersize` at a time, so memory stays constant however large the result is.
+        """
+        with self._connection() as conn:
+            try:
+                with conn.cursor(name=f'scan_{next(_scan_ids)}') as cur:
+                    cur.itersize = itersize
+                    cur.execute(sql, params)
+                    for row in cur:
+                        yield row
+            finally:
+                if not conn.closed:
+                    conn.rollback()
+
+    def iter_rows(self, columns=('id', 'title', 'link_guidance'), where=None, params=(), order_by=None,
+                  limit=None, itersize=DB_ITERSIZE):
+        """
+        Stream a column projection of the guidelines table as lightweight namedtuples.
+        Columns may be expressions with an alias, e.g. "LENGTH(all_text) AS content_length".
+
+            for row in db.iter_rows(['title', 'link_guidance'], where='agency = %s', params=('FDA Philippines',)):
+                print(row.title, row.link_guidance)
+        """
+        row_type = _row_type(columns)
+        sql = f"SELECT {', '.join(columns)} FROM {self.table_name}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        make = row_type._make
+        for row in self.iter_query(sql, params, itersize):
+            yield make(row)
+
+    def export_rows(self, columns, since=None, lag_seconds=0, itersize=DB_ITERSIZE):
+        """
+        Rows for an export in (updated_at, id) order.
+        `since` is an (updated_at, id) watermark; only rows modified after it are returned.
+        Rows updated in the last `lag_seconds` (by the server clock every writer uses) are left for the
+        next export, so a transaction that commits later with an earlier updated_at is not skipped.
+        """
+        where, params = ['updated_at <= clock_timestamp() - make_interval(secs => %s)'], [lag_seconds]
+        if since is not None:
+            where.append('(updated_at, id) > (%s, %s)')
+            params.extend(since)
+        return self.iter_rows(columns, where=' AND '.join(where), params=tuple(params), order_by='updated_at, id',
+                              itersize=itersize)
+
+    def search(self, query, agency=None, year_range=None, limit=20):
+        """
+        Ranked full-text search over title, summary and all_text (see schema.py migration 006).
+        query uses web-search syntax: "exact phrase", -excluded, OR.
+        year_range is an inclusive (first_year, last_year) tuple on issue_date.
+        Returns SearchResult tuples, best match first, each with a highlighted snippet.
+        """
+        # Near-duplicates are listed once, through their canonical document
+        filters = ["t.search_vector @@ q.query", "t.duplicate_of IS NULL"]
+        params = [query]
+        if agency:
+            filters.append("t.agency = %s")
+            params.append(agency)
+        if year_range:
+            first_year, last_year = year_range
+            filters.append("t.issue_date >= make_date(%s, 1, 1) AND t.issue_date < make_date(%s, 1, 1)")
+            params.extend([int(first_year), int(last_year) + 1])
+        params.append(limit)
+
+        start = time.perf_counter()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                # Rank every match via the GIN index, but build snippets only for the top `limit`
+                cur.execute(f"""
+                    WITH q AS (SELECT websearch_to_tsquery('english', %s) AS query)
+                    SELECT top.id, top.title, top.link_guidance, top.agency, top.issue_date, top.rank,
+                           ts_headline('english', COALESCE(top.all_text, ''), q.query,
+                                       'MaxFragments=2, MinWords=8, MaxWords=25, StartSel=**, StopSel=**') AS snippet
+                    FROM (
+                        SELECT t.id, t.title, t.link_guidance, t.agency, t.issue_date, t.all_text,
+                               ts_rank_cd(t.search_vector, q.query) AS rank
+                        FROM {self.table_name} t, q
+                        WHERE {' AND '.join(filters)}
+                        ORDER BY rank DESC
+                        LIMIT %s
+                    ) top, q
+                    ORDER BY top.rank DESC
+                """, params)
+                rows = cur.fetchall()
+            conn.rollback()
+        metrics.observe('db.statement.search', time.perf_counter() - start)
+        return [SearchResult(*row) for row in rows]
+
+    def stats_snapshot(self):
+        """
+        Corpus statistics read from the trigger-maintained stats tables (see schema.py migration 004).
+        Cost depends on the number of agencies/years, not on the number of documents.
+        """
+        prefix = self._prefix()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT agency, doc_count, url_count, text_count, total_length, last_ingest_at FROM {prefix}_agency_stats")
+                agency_rows = cur.fetchall()
+                cur.execute(f"SELECT agency, year, doc_count FROM {prefix}_year_stats WHERE doc_count > 0 ORDER BY agency, year")
+                year_rows = cur.fetchall()
+                cur.execute(f"SELECT agency, doc_count FROM {prefix}_daily_stats WHERE day = CURRENT_DATE")
+                today_rows = cur.fetchall()
+            conn.rollback()
+
+        agencies = {}
+        for agency, doc_count, url_count, text_count, total_length, last_ingest_at in agency_rows:
+            if doc_count <= 0:
+                continue
+            agencies[agency or None] = {
+                'documents': doc_count,
+                'with_urls': url_count,
+                'total_length': total_length,
+                'avg_length': total_length // text_count if text_count else 0,
+                'last_ingest_at': last_ingest_at,
+                'years': {},
+                'added_today': 0,
+            }
+        for agency, year, doc_count in year_rows:
+            if (agency or None) in agencies:
+                agencies[agency or None]['years'][year or None] = doc_count
+        for agency, doc_count in today_rows:
+            if (agency or None) in agencies:
+                agencies[agency or None]['added_today'] = doc_count
+
+        return {
+            'total_documents': sum(a['documents'] for a in agencies.values()),
+            'added_today': sum(a['added_today'] for a in agencies.values()),
+            'last_ingest_at': max((a['last_ingest_at'] for a in agencies.values() if a['last_ingest_at']), default=None),
+            'agencies': agencies,
+        }
 
     def close(self):
-        self.conn.close()
+        # A shared pool is owned (and closed) by whoever created it
+        if self.conn is not None:
+            self.conn.close()
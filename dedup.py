@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for republished issuances (reposted announcements, the same issuance under another URL)
+- MinHash signatures over word shingles of the document body; site chrome (navigation, footer, share
+  links) is stripped first so pages of the same site don't look alike because of their template
+- Two documents with different issuance numbers are never duplicates, however similar their text
+- LSH banding finds candidate duplicates via index lookups instead of comparing every pair
+- Signatures and band buckets live in the database and grow incrementally with each new document
+- Duplicates keep their all_text and are linked (duplicate_of) to the canonical row; search lists only the latter
+- Re-extracted documents (reextract.py) lose their signature and are indexed again by --rebuild
+
+Usage: python3 dedup.py --rebuild   # index documents that have no signature yet and link duplicates
+"""
+import argparse
+import hashlib
+import logging
+import random
+import re
+import struct
+import zlib
+from collections import namedtuple
+from summarizer import body_text
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+NUM_PERM = 128
+BANDS = 16          # 16 bands x 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+SHINGLE_SIZE = 5    # words per shingle
+MAX_WORDS = 3000    # the head of the body is enough to recognise a repost
+THRESHOLD = 0.85    # estimated Jaccard similarity that counts as a duplicate
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r'[a-z0-9]+')
+
+Duplicate = namedtuple('Duplicate', ['id', 'link_guidance', 'similarity'])
+
+
+def normalize(text, title=None):
+    """Lowercased words of the body, without the site chrome around it (see summarizer.body_text)"""
+    return _WORD.findall(body_text(text, title).lower())[:MAX_WORDS]
+
+
+def same_issuance(first, second):
+    """False when both issuance numbers are known and differ"""
+    return not (first and second) or first.strip().lower() == second.strip().lower()
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, shingle_size=SHINGLE_SIZE, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Fixed seed: signatures stored in the database must stay comparable across runs
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def _shingles(self, words):
+        k = self.shingle_size
+        if len(words) < k:
+            return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+        return {zlib.crc32(' '.join(words[i:i + k]).encode('utf-8')) for i in range(len(words) - k + 1)}
+
+    def signature(self, text, title=None):
+        """MinHash signature (tuple of num_perm ints < 2**61), or None for documents without text"""
+        shingles = list(self._shingles(normalize(text, title)))
+        if not shingles:
+            return None
+        prime = _MERSENNE_PRIME
+        return tuple(min([(a * h + b) % prime for h in shingles]) for a, b in self._perms)
+
+    def band_keys(self, signature):
+        """(band, bucket) pairs; documents sharing any pair are duplicate candidates"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f'<{self.rows}Q', *chunk), digest_size=8).digest()
+            keys.append((band, struct.unpack('<q', digest)[0]))
+        return keys
+
+    @staticmethod
+    def similarity(first, second):
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class NearDuplicateIndex:
+    """In-memory LSH index (used for batches that are not in the database yet)"""
+
+    def __init__(self, hasher=None, threshold=THRESHOLD):
+        self.hasher = hasher or MinHasher()
+        self.threshold = threshold
+        self._buckets = {}
+        self._signatures = {}
+
+    def add(self, key, signature):
+        self._signatures[key] = signature
+        for band_key in self.hasher.band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def query(self, signature):
+        """Best (key, similarity) above the threshold, or None"""
+        candidates = set()
+        for band_key in self.hasher.band_keys(signature):
+            candidates |= self._buckets.get(band_key, set())
+        best = max(((key, self.hasher.similarity(signature, self._signatures[key])) for key in candidates),
+                   key=lambda item: item[1], default=None)
+        return best if best and best[1] >= self.threshold else None
+
+
+class NearDuplicateDetector:
+    """Database-backed detector used by the ingestion pipeline"""
+
+    def __init__(self, db, hasher=None, threshold=THRESHOLD):
+        self.db = db
+        self.hasher = hasher or MinHasher()
+        self.threshold = threshold
+
+    def check(self, link_guidance, text, title=None, issuance_number=None):
+        """
+        Returns (duplicate, signature): duplicate is a Duplicate of the best canonical match
+        above the threshold (or None); pass signature to register() after storing the document.
+        A candidate with a different issuance number is never a match.
+        """
+        signature = self.hasher.signature(text, title)
+        if signature is None:
+            return None, None
+        best = None
+        for guideline_id, link, number, stored in self.db.minhash_candidates(self.hasher.band_keys(signature),
+                                                                             exclude_link=link_guidance):
+            if not same_issuance(issuance_number, number):
+                continue
+            similarity = self.hasher.similarity(signature, stored)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = Duplicate(guideline_id, link, similarity)
+        return best, signature
+
+    def register(self, guideline_id, signature):
+        """Add a canonical document to the index"""
+        if signature is not None:
+            self.db.save_minhash(guideline_id, signature, self.hasher.band_keys(signature))
+
+
+def rebuild(db, batch_size=200):
+    """Index every document without a signature, linking the ones that duplicate an indexed document"""
+    detector = NearDuplicateDetector(db)
+    indexed = linked = 0
+    last_id = 0
+    while True:
+        rows = db.documents_without_minhash(after_id=last_id, limit=batch_size)
+        if not rows:
+            break
+
+        for guideline_id, link, title, number, text in rows:
+            last_id = guideline_id
+            duplicate, signature = detector.check(link, text, title, number)
+            if duplicate:
+                # Existing rows keep their text; they are only linked to the canonical document
+                db.link_duplicate(guideline_id, duplicate.id)
+                linked += 1
+                logging.info(f"   🔗 {link[:70]} duplicates #{duplicate.id} ({duplicate.similarity:.0%})")
+            else:
+                detector.register(guideline_id, signature)
+                indexed += 1
+        logging.info(f"📊 Indexed {indexed} documents, linked {linked} duplicates so far")
+
+    logging.info(f"🎉 Near-duplicate index up to date: {indexed} indexed, {linked} duplicates linked")
+    return indexed, linked
+
+
+def main():
+    from db import Database
+
+    parser = argparse.ArgumentParser(description='Near-duplicate index for FDA Philippines issuances')
+    parser.add_argument('--rebuild', action='store_true', help='index documents that have no signature yet')
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+    db = Database()
+    try:
+        rebuild(db)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
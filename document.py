@@ -0,0 +1,150 @@
+"""
+Document model passed from the extraction stage to the database
+- One slotted object per document instead of a dict of upsert_guideline kwargs built per stage
+- Derived fields (summary, content length, text hash, year, json_data) are computed once, on first
+  use, and cached; the text is read-only so they cannot go stale
+- The summary is normally the extractive one of summarizer.py (computed in batch by the Fetcher);
+  without it, the first summary_chars characters of the text
+- Field types are checked on construction, so a bad extractor fails where the document is built
+  instead of in the SQL
+- Read access like the dict it replaces (doc['title'], doc.get('summary'), **doc), so existing callers,
+  bulk_loader.py and Database.update_extracted() take either
+"""
+import hashlib
+from datetime import date
+
+SUMMARY_CHARS = 500
+
+
+def _check(name, value, types, optional=True):
+    if value is None and optional:
+        return value
+    if not isinstance(value, types):
+        expected = ' or '.join(t.__name__ for t in (types if isinstance(types, tuple) else (types,)))
+        raise TypeError(f"Document.{name} must be {expected}{' or None' if optional else ''}, got {type(value).__name__}")
+    return value
+
+
+class Document:
+    # upsert_guideline columns, in its argument order
+    FIELDS = ('title', 'summary', 'issue_date', 'products', 'link_guidance', 'link_file', 'country', 'agency',
+              'all_text', 'json_data', 'issuance_type', 'issuance_number', 'effective_date', 'product_categories')
+
+    __slots__ = ('title', 'link_guidance', 'link_file', 'country', 'agency', 'issue_date', 'effective_date',
+                 'issuance_type', 'issuance_number', 'product_categories', 'extraction_date', 'extra',
+                 'summary_chars', '_text', '_summary', '_length', '_text_hash', '_json_data')
+
+    def __init__(self, title, link_guidance, all_text, agency='FDA Philippines', country='Philippines',
+                 issue_date=None, effective_date=None, issuance_type=None, issuance_number=None,
+                 product_categories=None, link_file=None, extraction_date=None, extra=None, summary=None,
+                 summary_chars=SUMMARY_CHARS):
+        self.title = _check('title', title, str, optional=False)
+        self.link_guidance = _check('link_guidance', link_guidance, str)
+        self._text = _check('all_text', all_text, str, optional=False)
+        self.agency = _check('agency', agency, str)
+        self.country = _check('country', country, str)
+        self.issue_date = _check('issue_date', issue_date, date)
+        self.effective_date = _check('effective_date', effective_date, date)
+        self.issuance_type = _check('issuance_type', issuance_type, str)
+        self.issuance_number = _check('issuance_number', issuance_number, str)
+        self.product_categories = _check('product_categories', product_categories, (list, tuple))
+        self.link_file = _check('link_file', link_file, str)
+        self.extraction_date = extraction_date
+        self.extra = _check('extra', extra, dict)  # additional json_data keys
+        self.summary_chars = summary_chars
+        self._length = self._text_hash = self._json_data = None
+        self._summary = _check('summary', summary, str)
+
+    @classmethod
+    def from_post(cls, post, meta, agency='FDA Philippines', country='Philippines', **kwargs):
+        """Document for an extracted post ({'title', 'url', 'content', ...}) and its IssuanceMetadata"""
+        kwargs.setdefault('extraction_date', post.get('extraction_date'))
+        kwargs.setdefault('summary', post.get('summary'))
+        return cls(
+            title=post.get('title') or 'Unknown Title',
+            link_guidance=post.get('url') or '',
+            all_text=post.get('content') or '',
+            agency=agency,
+            country=country,
+            issue_date=meta.issue_date,  # Signing date from the body, else the post date
+            effective_date=meta.effective_date,
+            issuance_type=meta.issuance_type,
+            issuance_number=meta.issuance_number,
+            product_categories=meta.product_categories,
+            **kwargs
+        )
+
+    # ---- derived fields --------------------------------------------------
+
+    @property
+    def all_text(self):
+        return self._text
+
+    @property
+    def length(self):
+        if self._length is None:
+            self._length = len(self._text)
+        return self._length
+
+    @property
+    def summary(self):
+        if self._summary is None:
+            self._summary = self._text[:self.summary_chars] + '...' if self.length > self.summary_chars else self._text
+        return self._summary
+
+    @property
+    def text_hash(self):
+        """md5 of the text, the digest of Database.text_hashes() (and of the job queue's content_hash column)"""
+        if self._text_hash is None:
+            self._text_hash = hashlib.md5(self._text.encode('utf-8')).hexdigest()
+        return self._text_hash
+
+    @property
+    def year(self):
+        return self.issue_date.strftime('%Y') if self.issue_date else None
+
+    @property
+    def products(self):
+        return ', '.join(self.product_categories) if self.product_categories else None
+
+    @property
+    def json_data(self):
+        if self._json_data is None:
+            self._json_data = {
+                'source_url': self.link_guidance,
+                'extraction_date': self.extraction_date,
+                'content_length': self.length,
+                'is_text_only': True,
+                'year': self.year,
+                **(self.extra or {}),
+            }
+        return self._json_data
+
+    # ---- dict-style access -----------------------------------------------
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def keys(self):
+        return self.FIELDS
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def as_dict(self):
+        """The upsert_guideline kwargs"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return f"Document({self.title[:40]!r}, {self.link_guidance!r}, {self.length} chars)"
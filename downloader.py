@@ -1,52 +1,110 @@
+import hashlib
 import os
 import logging
+import queue
+import re
+import tempfile
+import threading
 from config import DOWNLOAD_DIR
+from metrics import metrics
 
 logging.basicConfig(level=logging.INFO)
 
+# Files are spread over 256 sub-folders (first two hex digits of the URL hash)
+SHARD_CHARS = 2
+WRITE_QUEUE_SIZE = 256
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9 _-]+')
+
 class Downloader:
-    def __init__(self):
+    def __init__(self, background=True):
         # Create ONLY HTML_EXTRACT folder - NO PDF processing
         self.base_dir = DOWNLOAD_DIR
         self.html_dir = os.path.join(self.base_dir, "HTML_EXTRACT")
-        
+
         os.makedirs(self.html_dir, exist_ok=True)
         logging.info(f"📁 Created HTML_EXTRACT folder only: {self.html_dir}")
 
+        self._shards = set()
+        self._queue = None
+        self._writer = None
+        if background:
+            # Bounded queue: the main loop only blocks if the disk falls far behind
+            self._queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._write_loop, name='downloader-writer', daemon=True)
+            self._writer.start()
+
+    def text_path(self, url, title):
+        """Deterministic path for a document: <shard>/<title slug>_<url hash>_HTML.txt"""
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        slug = _UNSAFE.sub('', title).strip()[:70] or 'untitled'
+        return os.path.join(self.html_dir, digest[:SHARD_CHARS], f"{slug}_{digest[:10]}_HTML.txt")
+
     def save_text_content(self, url, source, text_content, title):
-        """Save ONLY HTML text content to HTML_EXTRACT folder"""
+        """Save ONLY HTML text content to HTML_EXTRACT folder; returns the file path (written in the background)"""
         if not text_content or len(text_content.strip()) < 50:
             return None
-            
-        # Create safe filename from title
-        safe_title = ''.join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title.replace(' ', ' ')[:70]  # Limit length
-        filename = f"{safe_title}_HTML.txt"
-        
-        # Handle duplicates
-        filepath = os.path.join(self.html_dir, filename)
-        counter = 1
-        original_filepath = filepath
-        while os.path.exists(filepath):
-            base_name = original_filepath.replace('_HTML.txt', '')
-            filepath = f"{base_name}_HTML_{counter}.txt"
-            counter += 1
-        
+
+        filepath = self.text_path(url, title)
+        data = (
+            f"Source: {source}\n"
+            f"URL: {url}\n"
+            f"Title: {title}\n"
+            f"Type: HTML Content\n"
+            + "=" * 80 + "\n\n"
+            + text_content
+        )
+
+        if self._queue is None:
+            return filepath if self._write(filepath, data) else None
+        self._queue.put((filepath, data))
+        return filepath
+
+    def _write(self, filepath, data):
+        """Atomic write: readers never see a half-written file"""
+        directory = os.path.dirname(filepath)
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"Source: {source}\n")
-                f.write(f"URL: {url}\n")
-                f.write(f"Title: {title}\n")
-                f.write(f"Type: HTML Content\n")
-                f.write("="*80 + "\n\n")
-                f.write(text_content)
-            
+            if directory not in self._shards:
+                os.makedirs(directory, exist_ok=True)
+                self._shards.add(directory)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, filepath)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            metrics.incr('downloader.files')
             logging.info(f"✅ Saved HTML text content to: {filepath}")
-            return filepath
-            
+            return True
         except Exception as e:
+            metrics.incr('downloader.errors')
             logging.error(f"Failed to save text content: {e}")
-            return None
+            return False
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued file is on disk"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
 
     def download_pdf(self, url, source, text_content, title):
         """
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Packed corpus export for downstream analytics
+- Writes the corpus to Parquet (or Arrow IPC) files partitioned by year: <out>/year=2025/part-....parquet
+- Rows stream from a server-side cursor in batches, so memory stays bounded by the batch size
+- Incremental: a watermark of the last exported (updated_at, id) is kept in <out>/_watermark.json,
+  and later runs append a new part file with only the rows added or changed since then.
+  A changed row appears in several parts; keep the one with the latest updated_at per id.
+- Every writer sets updated_at from the server clock, and rows updated in the last FDA_EXPORT_LAG_SECONDS
+  wait for the next run, so a transaction still in flight during an export is not skipped for good
+
+Usage: python3 export.py                    # incremental export to FDA_EXPORT_DIR
+       python3 export.py --full             # ignore the watermark and export everything
+       python3 export.py --format arrow
+"""
+import argparse
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from config import EXPORT_DIR, EXPORT_LAG_SECONDS
+from metrics import metrics
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+COLUMNS = ('id', 'title', 'issue_date', 'effective_date', 'link_guidance', 'link_file', 'agency', 'country',
+           'issuance_type', 'issuance_number', 'product_categories', 'all_text', 'json_data',
+           'duplicate_of', 'created_at', 'updated_at')
+BATCH_SIZE = 1000
+WATERMARK_FILE = '_watermark.json'
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('issue_date', pa.date32()),
+        ('effective_date', pa.date32()),
+        ('link_guidance', pa.string()),
+        ('link_file', pa.string()),
+        ('agency', pa.string()),
+        ('country', pa.string()),
+        ('issuance_type', pa.string()),
+        ('issuance_number', pa.string()),
+        ('product_categories', pa.list_(pa.string())),
+        ('all_text', pa.string()),
+        ('json_data', pa.string()),  # JSON text; parse downstream
+        ('duplicate_of', pa.int64()),
+        ('created_at', pa.timestamp('us')),
+        ('updated_at', pa.timestamp('us')),
+    ])
+
+
+def _year(row):
+    """Partition key: issue date year, else the year recorded in json_data, else 'unknown'"""
+    issue_date, json_data = row.issue_date, row.json_data
+    if issue_date:
+        return str(issue_date.year)
+    if isinstance(json_data, dict) and json_data.get('year'):
+        return str(json_data['year'])
+    return 'unknown'
+
+
+def _tmp_path(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.tmp')
+
+
+class CorpusExporter:
+    def __init__(self, db, out_dir=EXPORT_DIR, fmt='parquet', batch_size=BATCH_SIZE, lag_seconds=EXPORT_LAG_SECONDS):
+        if fmt not in ('parquet', 'arrow'):
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.db = db
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.lag_seconds = lag_seconds
+        self.schema = _schema()
+        self._writers = {}
+        self._buffers = {}
+        self._paths = {}
+
+    # ---- watermark -------------------------------------------------------
+
+    def _watermark_path(self):
+        return os.path.join(self.out_dir, WATERMARK_FILE)
+
+    def load_watermark(self):
+        path = self._watermark_path()
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            mark = json.load(f)
+        return datetime.fromisoformat(mark['updated_at']), mark['id']
+
+    def _save_watermark(self, updated_at, row_id):
+        path = self._watermark_path()
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'updated_at': updated_at.isoformat(), 'id': row_id}, f)
+        os.replace(path + '.tmp', path)
+
+    # ---- writers ---------------------------------------------------------
+
+    def _writer(self, year):
+        writer = self._writers.get(year)
+        if writer is None:
+            import pyarrow.parquet as pq
+            import pyarrow.ipc as ipc
+            directory = os.path.join(self.out_dir, f'year={year}')
+            os.makedirs(directory, exist_ok=True)
+            extension = 'parquet' if self.fmt == 'parquet' else 'arrow'
+            path = os.path.join(directory, f'part-{self._run_id}.{extension}')
+            # Written under a hidden temporary name (skipped by dataset readers) and renamed once the run succeeded
+            self._paths[year] = path
+            if self.fmt == 'parquet':
+                writer = pq.ParquetWriter(_tmp_path(path), self.schema, compression='zstd')
+            else:
+                writer = ipc.new_file(_tmp_path(path), self.schema)
+            self._writers[year] = writer
+        return writer
+
+    def _flush(self, year):
+        import pyarrow as pa
+        rows = self._buffers.pop(year, None)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        writer = self._writer(year)
+        if self.fmt == 'parquet':
+            writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            writer.write_batch(batch)
+
+    def _close_writers(self, commit):
+        for year, writer in self._writers.items():
+            writer.close()
+            path = self._paths[year]
+            if commit:
+                os.replace(_tmp_path(path), path)
+            else:
+                os.unlink(_tmp_path(path))
+        self._writers.clear()
+        self._paths.clear()
+
+    # ---- export ----------------------------------------------------------
+
+    def export(self, full=False):
+        """Export rows changed since the watermark (or everything with full=True); returns the row count"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        since = None if full else self.load_watermark()
+        # Unique per run so an append never replaces an earlier part
+        self._run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        logging.info(f"📦 Exporting {'all rows' if since is None else f'rows changed since {since[0]}'} "
+                     f"as {self.fmt} to {self.out_dir}")
+
+        start = time.perf_counter()
+        count = 0
+        last = None
+        try:
+            for row in self.db.export_rows(COLUMNS, since=since, lag_seconds=self.lag_seconds,
+                                               itersize=self.batch_size):
+                year = _year(row)
+                if row.json_data is not None:
+                    row = row._replace(json_data=json.dumps(row.json_data))
+                buffer = self._buffers.setdefault(year, [])
+                buffer.append(row)
+                if len(buffer) >= self.batch_size:
+                    self._flush(year)
+                count += 1
+                if row.updated_at is not None:
+                    last = (row.updated_at, row.id)
+                if count % 10000 == 0:
+                    logging.info(f"   📊 {count} rows exported")
+            for year in list(self._buffers):
+                self._flush(year)
+        except BaseException:
+            self._buffers.clear()
+            self._close_writers(commit=False)
+            raise
+        self._close_writers(commit=True)
+        if last is not None:
+            self._save_watermark(*last)
+
+        elapsed = time.perf_counter() - start
+        metrics.incr('export.rows', count)
+        logging.info(f"🎉 Exported {count} rows in {elapsed:.1f}s")
+        return count
+
+
+def main():
+    import profiling
+    from db import Database
+
+    parser = argparse.ArgumentParser(description='Export the FDA Philippines corpus to Parquet / Arrow')
+    parser.add_argument('--out', default=EXPORT_DIR, help='output directory')
+    parser.add_argument('--format', choices=('parquet', 'arrow'), default='parquet')
+    parser.add_argument('--full', action='store_true', help='ignore the watermark and export every row')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--lag', type=int, default=EXPORT_LAG_SECONDS,
+                        help='leave rows updated in the last N seconds for the next export')
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
+    db = Database()
+    try:
+        with profiling.profile_run('export', args.profile):
+            CorpusExporter(db, args.out, args.format, args.batch_size, args.lag).export(full=args.full)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
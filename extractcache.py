@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Memoization of per-URL extraction results, within a run and across runs
+- Keyed by extractor namespace + URL + hash of the input (raw HTML for text extraction,
+  title/date/text for metadata), so an unchanged page is never parsed twice and a changed
+  page never returns a stale result
+- Memory tier: LRU bounded by EXTRACT_CACHE_MEMORY_BYTES, shared by every Fetcher in the process
+- Disk tier: SQLite file of zlib-compressed JSON values; entries expire after EXTRACT_CACHE_TTL and
+  the least recently used are evicted beyond EXTRACT_CACHE_DISK_BYTES
+- recent(): a URL extracted less than EXTRACT_CACHE_FRESH_SECONDS ago is not fetched again
+  (the processed_urls replay and the different extractor scripts)
+- Hit ratios per tier are logged at the end of each run (report())
+- Text extractors put code_version() of their parsing functions in the namespace, so editing them
+  invalidates their entries; bump CACHE_VERSION for other output changes (metadata). Older entries
+  are then ignored and age out
+
+Usage: python3 extractcache.py --stats
+       python3 extractcache.py --clear
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from config import (EXTRACT_CACHE_ENABLED, EXTRACT_CACHE_PATH, EXTRACT_CACHE_MEMORY_BYTES,
+                    EXTRACT_CACHE_DISK_BYTES, EXTRACT_CACHE_TTL, EXTRACT_CACHE_FRESH_SECONDS)
+from metrics import metrics
+
+logging.basicConfig(level=logging.INFO)
+
+CACHE_VERSION = 1
+# Evict down to this share of the disk budget so eviction does not run on every insert
+EVICT_TO = 0.9
+COUNTERS = ('memory_hits', 'disk_hits', 'url_hits', 'misses', 'stores', 'evictions', 'expired')
+
+
+def input_hash(content):
+    return hashlib.sha1((content or '').encode('utf-8')).hexdigest()
+
+
+def code_version(*functions):
+    """Short hash of the functions' source code, for namespaces that must change with the extractor"""
+    digest = hashlib.sha1()
+    for function in functions:
+        try:
+            source = inspect.getsource(function)
+        except (OSError, TypeError):
+            # No source file (frozen, builtin): the bytecode, else the name
+            code = getattr(getattr(function, '__func__', function), '__code__', None)
+            source = code.co_code.hex() if code else getattr(function, '__qualname__', repr(function))
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:10]
+
+
+def _versioned(namespace):
+    return f"{namespace}:v{CACHE_VERSION}"
+
+
+class ExtractionCache:
+    def __init__(self, path=EXTRACT_CACHE_PATH, memory_bytes=EXTRACT_CACHE_MEMORY_BYTES,
+                 disk_bytes=EXTRACT_CACHE_DISK_BYTES, ttl=EXTRACT_CACHE_TTL, fresh_seconds=EXTRACT_CACHE_FRESH_SECONDS):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ttl = ttl
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (value, JSON size, stored_at)
+        self._memory_used = 0
+        self._latest = {}              # (namespace, url) -> key of the latest stored result
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self._db = None
+        self._disk_used = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )''')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_url ON entries (namespace, url, stored_at)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used_at)')
+            self.purge_expired()
+            self._disk_used = self._db.execute('SELECT COALESCE(SUM(bytes), 0) FROM entries').fetchone()[0]
+
+    @staticmethod
+    def key(namespace, url, content):
+        return hashlib.sha1(f"{_versioned(namespace)}\0{url}\0{input_hash(content)}".encode('utf-8')).hexdigest()
+
+    def _count(self, name):
+        self.counts[name] += 1
+        metrics.incr(f'extract_cache.{name}')
+
+    # ---- memory tier (callers hold the lock) -----------------------------
+
+    def _remember(self, key, value, size, stored_at):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= old[1]
+        self._memory[key] = (value, size, stored_at)
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, (_, evicted, _) = self._memory.popitem(last=False)
+            self._memory_used -= evicted
+
+    def _from_memory(self, key, now):
+        item = self._memory.get(key)
+        if item is None:
+            return None
+        if now - item[2] > self.ttl:
+            self._memory.pop(key)
+            self._memory_used -= item[1]
+            return None
+        self._memory.move_to_end(key)
+        return item
+
+    # ---- disk tier (callers hold the lock) -------------------------------
+
+    def _from_disk(self, where, params, now):
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            f'SELECT key, value, bytes, stored_at FROM entries WHERE {where} AND stored_at > ? '
+            'ORDER BY stored_at DESC LIMIT 1', (*params, now - self.ttl)).fetchone()
+        if row is None:
+            return None
+        key, blob, _, stored_at = row
+        self._db.execute('UPDATE entries SET used_at = ? WHERE key = ?', (now, key))
+        raw = zlib.decompress(blob)
+        value = json.loads(raw)
+        self._remember(key, value, len(raw), stored_at)
+        return key, value, stored_at
+
+    def _evict_disk(self):
+        target = self.disk_bytes * EVICT_TO
+        rows = self._db.execute('SELECT key, bytes FROM entries ORDER BY used_at').fetchall()
+        evict = []
+        for key, size in rows:
+            if self._disk_used <= target:
+                break
+            evict.append((key,))
+            self._disk_used -= size
+        self._db.executemany('DELETE FROM entries WHERE key = ?', evict)
+        self.counts['evictions'] += len(evict)
+        metrics.incr('extract_cache.evictions', len(evict))
+
+    def purge_expired(self):
+        """Delete disk entries older than the TTL; returns how many were deleted"""
+        if self._db is None:
+            return 0
+        with self._lock:
+            cutoff = time.time() - self.ttl
+            expired = self._db.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries WHERE stored_at <= ?',
+                                       (cutoff,)).fetchone()
+            if expired[0]:
+                self._db.execute('DELETE FROM entries WHERE stored_at <= ?', (cutoff,))
+                self._disk_used -= expired[1]
+                self.counts['expired'] += expired[0]
+            return expired[0]
+
+    # ---- lookups ---------------------------------------------------------
+
+    def get(self, namespace, url, content):
+        """Cached result for this exact input, or None"""
+        key = self.key(namespace, url, content)
+        now = time.time()
+        with self._lock:
+            item = self._from_memory(key, now)
+            if item is not None:
+                self._count('memory_hits')
+                return item[0]
+            found = self._from_disk('key = ?', (key,), now)
+            if found is not None:
+                self._latest[(namespace, url)] = key
+                self._count('disk_hits')
+                return found[1]
+            self._count('misses')
+            return None
+
+    def recent(self, namespace, url):
+        """Latest result for `url` if it was stored less than fresh_seconds ago (no need to fetch the page)"""
+        if not self.fresh_seconds:
+            return None
+        now = time.time()
+        with self._lock:
+            key = self._latest.get((namespace, url))
+            item = self._from_memory(key, now) if key else None
+            if item is not None and now - item[2] <= self.fresh_seconds:
+                self._count('url_hits')
+                return item[0]
+            found = self._from_disk('namespace = ? AND url = ? AND stored_at > ?',
+                                    (_versioned(namespace), url, now - self.fresh_seconds), now)
+            if found is not None:
+                self._latest[(namespace, url)] = found[0]
+                self._count('url_hits')
+                return found[1]
+            return None
+
+    def put(self, namespace, url, content, value):
+        """Store a JSON-serializable result for this input"""
+        key = self.key(namespace, url, content)
+        raw = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        blob = zlib.compress(raw)
+        size = len(blob)
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, len(raw), now)
+            self._latest[(namespace, url)] = key
+            self._count('stores')
+            if self._db is None:
+                return
+            old = self._db.execute('SELECT bytes FROM entries WHERE key = ?', (key,)).fetchone()
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (key, _versioned(namespace), url, blob, size, now, now))
+            self._disk_used += size - (old[0] if old else 0)
+            if self._disk_used > self.disk_bytes:
+                self._evict_disk()
+
+    def memoize(self, namespace, url, content, compute, encode=None, decode=None):
+        """compute() through the cache; encode/decode convert results that are not plain JSON values"""
+        value = self.get(namespace, url, content)
+        if value is not None:
+            return decode(value) if decode else value
+        result = compute()
+        if result is not None:
+            self.put(namespace, url, content, encode(result) if encode else result)
+        return result
+
+    # ---- reporting -------------------------------------------------------
+
+    def report(self):
+        counts = dict(self.counts)
+        lookups = counts['memory_hits'] + counts['disk_hits'] + counts['misses']
+        hits = counts['memory_hits'] + counts['disk_hits']
+        with self._lock:
+            memory = {'entries': len(self._memory), 'bytes': self._memory_used, 'budget': self.memory_bytes}
+            disk = None
+            if self._db is not None:
+                disk = {'entries': self._db.execute('SELECT COUNT(*) FROM entries').fetchone()[0],
+                        'bytes': self._disk_used, 'budget': self.disk_bytes}
+        return {
+            **counts,
+            'lookups': lookups,
+            'hit_ratio': round(hits / lookups, 3) if lookups else None,
+            'memory_hit_ratio': round(counts['memory_hits'] / lookups, 3) if lookups else None,
+            'disk_hit_ratio': round(counts['disk_hits'] / lookups, 3) if lookups else None,
+            'memory': memory,
+            'disk': disk,
+        }
+
+    def log_report(self):
+        report = self.report()
+        if not report['lookups'] and not report['url_hits']:
+            return report
+        ratio = f"{100 * report['hit_ratio']:.0f}%" if report['hit_ratio'] is not None else 'n/a'
+        logging.info(f"🧠 Extraction cache: {ratio} hits ({report['memory_hits']} memory, {report['disk_hits']} disk, "
+                     f"{report['misses']} misses), {report['url_hits']} pages not re-fetched, "
+                     f"{report['evictions']} evicted")
+        return report
+
+    def reset(self):
+        """Start a new reporting period (the cached entries are kept)"""
+        self.counts = dict.fromkeys(COUNTERS, 0)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            self._latest.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM entries')
+                self._db.execute('VACUUM')
+                self._disk_used = 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Process-wide cache shared by every extractor, or None when FDA_EXTRACT_CACHE=0"""
+    global _default_cache
+    if not EXTRACT_CACHE_ENABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
+
+
+def log_report():
+    """Log the hit ratios of the process-wide cache, if one was used"""
+    return _default_cache.log_report() if _default_cache is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extraction cache maintenance')
+    parser.add_argument('--stats', action='store_true', help='entries and size per namespace')
+    parser.add_argument('--clear', action='store_true', help='delete every cached result')
+    args = parser.parse_args()
+
+    cache = ExtractionCache()
+    try:
+        if args.clear:
+            cache.clear()
+            logging.info(f"🧹 Cleared {cache.path}")
+            return
+        rows = cache._db.execute('SELECT namespace, COUNT(*), SUM(bytes) FROM entries GROUP BY namespace').fetchall()
+        logging.info(f"🧠 {cache.path}: {sum(r[1] for r in rows)} entries, "
+                     f"{cache._disk_used / 1048576:.1f} / {cache.disk_bytes / 1048576:.0f} MiB")
+        for namespace, count, size in rows:
+            logging.info(f"   {namespace}: {count} entries, {size / 1048576:.1f} MiB")
+    finally:
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,11 @@
 import logging
-import fitz  # PyMuPDF
 
 logging.basicConfig(level=logging.INFO)
 
 class Extractor:
     def extract_text(self, pdf_path):
         try:
+            import fitz  # PyMuPDF, only loaded once a PDF is actually extracted
             doc = fitz.open(pdf_path)
             text = "\n".join(page.get_text() for page in doc)
             doc.close()
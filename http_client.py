@@ -0,0 +1,251 @@
+"""
+Shared HTTP client for all sources
+- One requests.Session with a sized connection pool, so keep-alive connections are reused across threads
+- Per-host rate limits (requests per second) replace the fixed sleeps between requests
+- AdaptiveRateLimiter (default): AIMD control of each host's request rate and concurrency from observed
+  latency and errors, never above the configured per-host ceiling
+- Retries connection errors and timeouts with a fixed delay
+- Every logical request is recorded in crawlstats (size, TTFB, total time, status, retries per URL class)
+"""
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from config import (HTTP_POOL_SIZE, HTTP_TIMEOUT, DEFAULT_HOST_RATE, HOST_RATE_LIMITS, HTTP_ADAPTIVE,
+                    HTTP_START_RATE, HTTP_MIN_RATE, HTTP_MAX_CONCURRENCY, HTTP_LATENCY_TOLERANCE)
+from crawlstats import crawl_stats
+from metrics import metrics
+
+logging.basicConfig(level=logging.INFO)
+
+RETRY_COUNT = 3
+RETRY_DELAY = 2
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36'
+
+
+class RateLimiter:
+    """Spaces request starts to each host at least 1/rate seconds apart"""
+
+    def __init__(self, default_rate=DEFAULT_HOST_RATE, rates=None):
+        self.default_rate = default_rate
+        self._rates = dict(HOST_RATE_LIMITS if rates is None else rates)
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, host, rate):
+        with self._lock:
+            self._rates[host] = rate
+
+    def rate(self, host):
+        return self._rates.get(host, self.default_rate)
+
+    def wait(self, host):
+        """Block until a request to `host` may start"""
+        interval = 1.0 / self.rate(host)
+        with self._lock:
+            # Reserve the next slot under the lock, sleep outside it so other hosts are not held up
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            metrics.observe('http.rate_limit.wait', delay)
+            time.sleep(delay)
+
+    def acquire(self, host):
+        self.wait(host)
+
+    def release(self, host, latency, status=None):
+        """Report a finished request (status None: connection error or timeout)"""
+
+
+class _HostState:
+    def __init__(self, rate, ceiling):
+        self.rate = rate
+        self.ceiling = ceiling
+        self.concurrency = 1.0
+        self.in_flight = 0
+        self.next_slot = 0.0
+        self.baseline = None     # slowly drifting minimum of the latency
+        self.latency = None      # short-term EWMA of the latency
+        self.backoff_until = 0.0
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    AIMD politeness per host. While latency stays within HTTP_LATENCY_TOLERANCE x its baseline the
+    rate grows by about one request/s per second and concurrency by about one slot per round of requests;
+    5xx, 429, connection errors or rising latency halve both (at most once per cool-down).
+    Rates set in config / set_rate() are hard ceilings; concurrency never exceeds max_concurrency.
+    """
+
+    INCREASE = 1.0          # requests/s added per second of healthy responses
+    DECREASE = 0.5          # multiplicative back-off
+    SHORT_ALPHA = 0.3       # weight of a new sample in the short-term latency
+    BASELINE_DRIFT = 0.01   # baseline creeps up 1% per sample so a permanently slower site is re-learned
+
+    def __init__(self, default_rate=DEFAULT_HOST_RATE, rates=None, start_rate=HTTP_START_RATE,
+                 min_rate=HTTP_MIN_RATE, max_concurrency=HTTP_MAX_CONCURRENCY,
+                 latency_tolerance=HTTP_LATENCY_TOLERANCE):
+        super().__init__(default_rate, rates)
+        self.start_rate = start_rate
+        self.min_rate = min_rate
+        self.max_concurrency = max_concurrency
+        self.latency_tolerance = latency_tolerance
+        self._hosts = {}
+        self._cond = threading.Condition(self._lock)
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            ceiling = self._rates.get(host, self.default_rate)
+            state = self._hosts[host] = _HostState(min(self.start_rate, ceiling), ceiling)
+        return state
+
+    def set_rate(self, host, rate):
+        """Set the hard ceiling for `host`"""
+        with self._lock:
+            self._rates[host] = rate
+            state = self._hosts.get(host)
+            if state is not None:
+                state.ceiling = rate
+                state.rate = min(state.rate, rate)
+
+    def rate(self, host):
+        with self._lock:
+            return self._state(host).rate
+
+    def acquire(self, host):
+        """Block until a request to `host` may start: a free concurrency slot, then a rate slot"""
+        waited = time.monotonic()
+        with self._cond:
+            state = self._state(host)
+            while state.in_flight >= int(state.concurrency):
+                self._cond.wait()
+            state.in_flight += 1
+            now = time.monotonic()
+            slot = max(now, state.next_slot)
+            state.next_slot = slot + 1.0 / min(state.rate, state.ceiling)
+        delay = slot - now
+        if delay > 0:
+            try:
+                time.sleep(delay)
+            except BaseException:
+                # Interrupted before the request started: free the slot without counting a result
+                with self._cond:
+                    state.in_flight = max(0, state.in_flight - 1)
+                    self._cond.notify_all()
+                raise
+        waited = time.monotonic() - waited
+        if waited > 0.001:
+            metrics.observe('http.rate_limit.wait', waited)
+
+    def release(self, host, latency, status=None):
+        now = time.monotonic()
+        with self._cond:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            failed = status is None or status == 429 or status >= 500
+            if not failed:
+                state.latency = latency if state.latency is None else (
+                    self.SHORT_ALPHA * latency + (1 - self.SHORT_ALPHA) * state.latency)
+                state.baseline = latency if state.baseline is None else (
+                    min(latency, state.baseline * (1 + self.BASELINE_DRIFT)))
+            slow = state.latency is not None and state.latency > state.baseline * self.latency_tolerance
+            if failed or slow:
+                if now >= state.backoff_until:
+                    self._decrease(host, state, now, 'error' if failed else 'latency')
+            elif now >= state.backoff_until:
+                # Additive increase: +INCREASE/s per second at the current rate, +1 slot per round of requests
+                state.rate = min(state.ceiling, state.rate + self.INCREASE / state.rate)
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1.0 / state.concurrency)
+            self._cond.notify_all()
+
+    def _decrease(self, host, state, now, reason):
+        state.rate = max(self.min_rate, min(state.rate, state.ceiling) * self.DECREASE)
+        state.concurrency = max(1.0, state.concurrency * self.DECREASE)
+        # One back-off per cool-down: a burst of errors from requests already in flight counts once
+        state.backoff_until = now + max(1.0, 2 * (state.latency or 0.0), 1.0 / state.rate)
+        # Let the short-term latency recover from the spike instead of triggering again
+        if state.latency is not None and state.baseline is not None:
+            state.latency = min(state.latency, state.baseline * self.latency_tolerance)
+        metrics.incr(f'http.backoff.{reason}')
+        logging.info(f"   🐢 {host}: backing off ({reason}) to {state.rate:.2f} req/s, "
+                     f"{int(state.concurrency)} concurrent")
+
+    def snapshot(self):
+        with self._lock:
+            return {host: {
+                'rate': round(state.rate, 3),
+                'ceiling': state.ceiling,
+                'concurrency': int(state.concurrency),
+                'in_flight': state.in_flight,
+                'latency_ms': round(state.latency * 1000, 1) if state.latency is not None else None,
+                'baseline_ms': round(state.baseline * 1000, 1) if state.baseline is not None else None,
+            } for host, state in self._hosts.items()}
+
+
+class HttpClient:
+    def __init__(self, rate_limiter=None, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT,
+                 retries=RETRY_COUNT, retry_delay=RETRY_DELAY, stats=None):
+        self.rate_limiter = rate_limiter or (AdaptiveRateLimiter() if HTTP_ADAPTIVE else RateLimiter())
+        self.stats = stats or crawl_stats
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, url_class=None, **kwargs):
+        """
+        GET with per-host rate limiting; connection errors are retried, HTTP errors are returned as-is.
+        url_class ('listing', 'post', 'pdf') overrides crawlstats.classify_url for the crawl report.
+        """
+        host = urlsplit(url).hostname
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.retries):
+            self.rate_limiter.acquire(host)
+            start = time.perf_counter()
+            resp = error = None
+            try:
+                resp = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                error = e
+            finally:
+                # Exactly one release per acquire, whatever was raised (KeyboardInterrupt, a signal handler, ...)
+                elapsed = time.perf_counter() - start
+                self.rate_limiter.release(host, elapsed, resp.status_code if resp is not None else None)
+            if error is not None:
+                metrics.incr('http.errors')
+                logging.warning(f"   ⚠️ Attempt {attempt + 1} failed: {error}")
+                if attempt == self.retries - 1:
+                    self.stats.record(url, None, retries=attempt, url_class=url_class)
+                    raise error
+                time.sleep(self.retry_delay)
+                continue
+            metrics.observe('http.request', elapsed)
+            metrics.incr(f'http.status.{resp.status_code}')
+            self.stats.record(url, resp.status_code, size=len(resp.content), ttfb=resp.elapsed.total_seconds(),
+                              total=elapsed, retries=attempt, url_class=url_class)
+            return resp
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """Process-wide client shared by every Fetcher that is not given its own"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Durable ingestion job queue in PostgreSQL (<table>_jobs, schema.py migration 009)
+- One job per document URL with state (pending / running / done / failed), attempts and a lease
+- Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of threads, processes
+  or machines can pull from the same queue without handing out a job twice
+- A job is marked done in the same transaction as its upsert into source.medical_guidelines:
+  a crash either loses both or keeps both, and a retried job just repeats an idempotent upsert
+- Jobs whose worker died are picked up again once their lease expires
+- Priorities: new issuances first, then posts modified since they were ingested, then refreshes
+- Refreshes follow a per-document revisit interval that doubles while the text stays the same and
+  halves when it changes; at most FDA_JOB_REFRESH_BATCH are queued per run, with jitter, so
+  refresh work is spread out instead of arriving all at once
+- queue.time_to_ingest (discovery -> stored) and queue.publish_to_ingest metrics for new issuances
+
+Usage: python3 jobqueue.py enqueue [--sources fda_ph]    # list sources and queue new URLs
+       python3 jobqueue.py work --workers 4              # process queued jobs until none are left
+       python3 jobqueue.py status
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from psycopg2.extras import execute_values
+from config import (JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY, JOB_REVISIT_INITIAL,
+                    JOB_REVISIT_MIN, JOB_REVISIT_MAX, JOB_REFRESH_BATCH)
+from metrics import metrics
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+PRIORITY_NEW, PRIORITY_MODIFIED, PRIORITY_REFRESH = 0, 1, 2
+PRIORITY_NAMES = {PRIORITY_NEW: 'new', PRIORITY_MODIFIED: 'modified', PRIORITY_REFRESH: 'refresh'}
+
+Job = namedtuple('Job', ['id', 'source', 'url', 'listing', 'attempts', 'priority', 'content_hash',
+                         'revisit_seconds', 'created_at'])
+
+
+def next_revisit(revisit_seconds, changed):
+    """Adaptive revisit interval: back off while a document is stable, come back sooner once it changes"""
+    if revisit_seconds is None:
+        return JOB_REVISIT_INITIAL
+    interval = revisit_seconds // 2 if changed else revisit_seconds * 2
+    return max(JOB_REVISIT_MIN, min(JOB_REVISIT_MAX, interval))
+
+
+class LeaseLost(Exception):
+    """The job's lease expired and another worker claimed it; the upsert is rolled back"""
+
+
+class JobQueue:
+    def __init__(self, db, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS,
+                 retry_delay=JOB_RETRY_DELAY):
+        self.db = db
+        self.table = f"{db._prefix()}_jobs"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    def _execute(self, sql, params=(), fetch=False):
+        with self.db._connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql, params)
+                    rows = cur.fetchall() if fetch else cur.rowcount
+                conn.commit()
+                return rows
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+
+    def enqueue(self, source_name, listings):
+        """
+        Queue listing docs ({'url', 'title', 'modified', ...}). Unseen URLs are queued as new; ingested
+        URLs whose 'modified' stamp moved are queued again as modified. Returns (new, modified).
+        """
+        rows = [(source_name, doc['url'], json.dumps(doc), PRIORITY_NEW) for doc in listings if doc.get('url')]
+        if not rows:
+            return 0, 0
+        with self.db._connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    # xmax = 0 only for freshly inserted rows
+                    results = execute_values(cur, f"""
+                        INSERT INTO {self.table} AS j (source, url, listing, priority) VALUES %s
+                        ON CONFLICT (url) DO UPDATE SET
+                            listing = EXCLUDED.listing,
+                            priority = {PRIORITY_MODIFIED},
+                            state = 'pending',
+                            attempts = 0,
+                            lease_expires_at = NULL,
+                            updated_at = now()
+                        WHERE j.state IN ('done', 'failed')
+                          AND EXCLUDED.listing->>'modified' IS DISTINCT FROM j.listing->>'modified'
+                        RETURNING (xmax = 0)
+                    """, rows, fetch=True)
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+        new = sum(1 for (inserted,) in results if inserted)
+        metrics.incr('queue.enqueued.new', new)
+        metrics.incr('queue.enqueued.modified', len(results) - new)
+        return new, len(results) - new
+
+    def schedule_refresh(self, limit=JOB_REFRESH_BATCH):
+        """Queue up to `limit` ingested documents whose revisit time has come, most overdue first"""
+        refreshed = self._execute(f"""
+            UPDATE {self.table} SET state = 'pending', priority = {PRIORITY_REFRESH}, attempts = 0,
+                lease_expires_at = NULL, updated_at = now()
+            WHERE id IN (
+                SELECT id FROM {self.table}
+                WHERE state = 'done' AND next_visit_at <= now()
+                ORDER BY next_visit_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+        """, (limit,))
+        metrics.incr('queue.enqueued.refresh', refreshed)
+        return refreshed
+
+    def claim(self, limit=1, worker_id=None):
+        """Lease up to `limit` claimable jobs to this worker"""
+        rows = self._execute(f"""
+            UPDATE {self.table} j SET
+                state = 'running',
+                attempts = j.attempts + 1,
+                lease_expires_at = now() + make_interval(secs => %s),
+                locked_by = %s,
+                updated_at = now()
+            WHERE j.id IN (
+                SELECT id FROM {self.table}
+                WHERE state IN ('pending', 'running')
+                  AND (lease_expires_at IS NULL OR lease_expires_at < now())
+                  AND attempts < %s
+                ORDER BY priority, id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING j.id, j.source, j.url, j.listing, j.attempts, j.priority, j.content_hash,
+                      j.revisit_seconds, j.created_at
+        """, (self.lease_seconds, worker_id or self.worker_id, self.max_attempts, limit), fetch=True)
+        metrics.incr('queue.claimed', len(rows))
+        return [Job(*row) for row in rows]
+
+    def _mark_done(self, cur, job, worker_id, text_hash):
+        changed = text_hash != job.content_hash
+        interval = next_revisit(job.revisit_seconds, changed)
+        cur.execute(f"""
+            UPDATE {self.table} SET
+                state = 'done',
+                lease_expires_at = NULL,
+                last_error = NULL,
+                content_hash = %s,
+                revisit_seconds = %s,
+                next_visit_at = now() + make_interval(secs => %s),
+                last_changed_at = CASE WHEN %s THEN now() ELSE last_changed_at END,
+                visits = visits + 1,
+                changes = changes + %s,
+                updated_at = now()
+            WHERE id = %s AND locked_by = %s AND state = 'running'
+        """, (text_hash, interval, interval * random.uniform(0.8, 1.2), changed, int(changed),
+              job.id, worker_id or self.worker_id))
+        if cur.rowcount != 1:
+            raise LeaseLost(f"Lease on job {job.id} ({job.url}) was lost")
+
+    def completer(self, job, text_hash, worker_id=None):
+        """before_commit hook for Database.upsert_guideline: marks `job` done in the upsert transaction"""
+        def mark_done(cur, row_id):
+            self._mark_done(cur, job, worker_id, text_hash)
+        return mark_done
+
+    def complete_unchanged(self, job, worker_id=None):
+        """Mark a refresh done whose text matches what is stored; nothing is written to the guidelines table"""
+        with self.db._connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    self._mark_done(cur, job, worker_id, job.content_hash)
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+
+    def fail(self, job, error, worker_id=None):
+        """Release a failed job for a later retry, or mark it failed after max_attempts"""
+        self._execute(f"""
+            UPDATE {self.table} SET
+                state = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                lease_expires_at = now() + make_interval(secs => %s * attempts),
+                last_error = %s,
+                updated_at = now()
+            WHERE id = %s AND locked_by = %s AND state = 'running'
+        """, (self.max_attempts, self.retry_delay, str(error)[:1000], job.id, worker_id or self.worker_id))
+        metrics.incr('queue.failed')
+
+    def reap(self):
+        """Mark jobs that ran out of attempts while their worker was gone as failed"""
+        return self._execute(f"""
+            UPDATE {self.table} SET state = 'failed', last_error = COALESCE(last_error, 'lease expired'), updated_at = now()
+            WHERE state = 'running' AND lease_expires_at < now() AND attempts >= %s
+        """, (self.max_attempts,))
+
+    def retry_failed(self):
+        """Give failed jobs a fresh set of attempts"""
+        return self._execute(f"""
+            UPDATE {self.table} SET state = 'pending', attempts = 0, lease_expires_at = NULL, updated_at = now()
+            WHERE state = 'failed'
+        """)
+
+    def stats(self):
+        rows = self._execute(f"SELECT state, priority, COUNT(*) FROM {self.table} GROUP BY state, priority", fetch=True)
+        stats = {state: 0 for state in ('pending', 'running', 'done', 'failed')}
+        stats['pending_by_priority'] = {name: 0 for name in PRIORITY_NAMES.values()}
+        for state, priority, count in rows:
+            stats[state] += count
+            if state == 'pending':
+                stats['pending_by_priority'][PRIORITY_NAMES.get(priority, str(priority))] += count
+        return stats
+
+    def backlog(self):
+        stats = self.stats()
+        return stats['pending'] + stats['running']
+
+
+class QueueWorker:
+    """Claims jobs and runs them through the source's Fetcher and the DocumentWriter"""
+
+    def __init__(self, queue, writer, fetchers, batch_size=1):
+        self.queue = queue
+        self.writer = writer
+        self.fetchers = fetchers  # {source name: Fetcher}
+        self.batch_size = batch_size
+
+    def process(self, job, worker_id):
+        fetcher = self.fetchers.get(job.source)
+        if fetcher is None:
+            raise ValueError(f"No fetcher for source '{job.source}'")
+        doc = fetcher.fetch_document(job.listing)
+        if doc is None:
+            raise RuntimeError(f"No content fetched from {job.url}")
+        text_hash = doc.text_hash
+        if text_hash == job.content_hash:
+            self.queue.complete_unchanged(job, worker_id)
+            metrics.incr('queue.unchanged')
+            return
+        self.writer.store(doc, before_commit=self.queue.completer(job, text_hash, worker_id))
+        if job.priority == PRIORITY_NEW:
+            self.observe_time_to_ingest(job)
+
+    def observe_time_to_ingest(self, job):
+        now = datetime.now(timezone.utc)
+        metrics.observe('queue.time_to_ingest', (now - job.created_at).total_seconds())
+        published = (job.listing or {}).get('published')
+        if published:
+            try:
+                published_at = datetime.fromisoformat(published).replace(tzinfo=timezone.utc)
+            except ValueError:
+                return
+            metrics.observe('queue.publish_to_ingest', (now - published_at).total_seconds())
+
+    def run(self, stop=None):
+        """Process jobs until the queue has nothing claimable (or `stop` is set); returns jobs completed"""
+        worker_id = f"{self.queue.worker_id}:{threading.current_thread().name}"
+        done = 0
+        while stop is None or not stop.is_set():
+            jobs = self.queue.claim(self.batch_size, worker_id)
+            if not jobs:
+                break
+            for job in jobs:
+                try:
+                    self.process(job, worker_id)
+                    done += 1
+                    metrics.incr(f'queue.done.{PRIORITY_NAMES.get(job.priority, job.priority)}')
+                except Exception as e:
+                    logging.error(f"   ❌ Job {job.id} ({job.url[:70]}) failed on attempt {job.attempts}: {e}")
+                    try:
+                        self.queue.fail(job, e, worker_id)
+                    except Exception as release_error:
+                        # The lease expires on its own; another worker will retry the job
+                        logging.error(f"   ❌ Could not release job {job.id}: {release_error}")
+        return done
+
+
+def drain(queue, writer, fetchers, workers=4, stop=None):
+    """Run `workers` QueueWorker threads until the queue is drained; returns jobs completed"""
+    start = time.perf_counter()
+    queue.reap()
+    refreshed = queue.schedule_refresh()
+    if refreshed:
+        logging.info(f"🔁 Queued {refreshed} documents due for a refresh")
+    worker = QueueWorker(queue, writer, fetchers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='queue') as pool:
+        done = sum(pool.map(lambda _: worker.run(stop), range(workers)))
+    logging.info(f"🎉 Completed {done} jobs in {time.perf_counter() - start:.1f}s with {workers} workers")
+    return done
+
+
+def main():
+    import extractcache
+    import profiling
+    from archive import Archive
+    from config import ARCHIVE_ENABLED
+    from db import ConnectionPool, Database
+    from fetcher import Fetcher
+    from http_client import HttpClient
+    from scheduler import DocumentWriter
+    from sources import SOURCES, get_source
+
+    parser = argparse.ArgumentParser(description='Durable ingestion job queue')
+    parser.add_argument('command', choices=('enqueue', 'work', 'status', 'retry-failed'))
+    parser.add_argument('--sources', help='comma-separated source names (default: all registered)')
+    parser.add_argument('--workers', type=int, default=4, help='worker threads for "work"')
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
+    sources = [get_source(name.strip()) for name in args.sources.split(',')] if args.sources else list(SOURCES.values())
+    pool = ConnectionPool(maxconn=max(args.workers * 2, 2))
+    client = HttpClient()
+    archive = Archive() if ARCHIVE_ENABLED and args.command == 'work' else None
+    try:
+        db = Database(pool=pool)
+        queue = JobQueue(db)
+        if args.command == 'enqueue':
+            for source in sources:
+                listings = Fetcher(source=source, client=client, archive=archive).list_documents()
+                new, modified = queue.enqueue(source.name, listings)
+                logging.info(f"📥 [{source.name}] queued {new} new and {modified} modified of {len(listings)} listed")
+        elif args.command == 'work':
+            fetchers = {source.name: Fetcher(source=source, client=client, archive=archive) for source in sources}
+            with profiling.profile_run('jobqueue', args.profile):
+                drain(queue, DocumentWriter(db), fetchers, workers=args.workers)
+        elif args.command == 'retry-failed':
+            logging.info(f"🔁 {queue.retry_failed()} failed jobs queued again")
+        logging.info(f"📊 Queue: {queue.stats()}")
+        client.stats.write_report()
+        extractcache.log_report()
+        timings = metrics.snapshot()['timers']
+        for name in ('queue.time_to_ingest', 'queue.publish_to_ingest'):
+            if name in timings and timings[name]['count']:
+                logging.info(f"   ⏱️ {name}: p50 {timings[name]['p50_ms'] / 1000:.0f}s, "
+                             f"p95 {timings[name]['p95_ms'] / 1000:.0f}s over {timings[name]['count']} new documents")
+    finally:
+        client.close()
+        if archive is not None:
+            archive.close()
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 import logging
-import time
 from fetcher import Fetcher
 from db import Database
+import extractcache
+import profiling
+from scheduler import DocumentWriter
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 
@@ -9,6 +11,7 @@ def main():
     # Initialize components
     fetcher = Fetcher()
     db = Database()
+    writer = DocumentWriter(db)
     
     processed_count = 0
     
@@ -18,29 +21,16 @@ def main():
         for pdf_info in fetcher.yield_all_pdfs():
             try:
                 processed_count += 1
-                title = pdf_info['title']
+                title = pdf_info.title
                 
                 logging.info(f"\n[{processed_count}] Processing: {title[:60]}...")
                 
-                # Insert/update document in database
-                db.upsert_guideline(
-                    title=pdf_info['title'],
-                    summary=pdf_info['summary'],
-                    issue_date=pdf_info['issue_date'],
-                    products=pdf_info['products'],
-                    link_guidance=pdf_info['link_guidance'],
-                    link_file=pdf_info['link_file'],
-                    country=pdf_info['country'],
-                    agency=pdf_info['agency'],
-                    all_text=pdf_info['all_text'],
-                    json_data=pdf_info['json_data']
-                )
+                # Insert/update document in database (near-duplicates are stored as links)
+                writer.store(pdf_info)
                 
                 if processed_count % 25 == 0:
                     logging.info(f"   📊 Milestone: {processed_count} documents processed")
                     
-                time.sleep(0.5)  # Polite delay
-                    
             except Exception as e:
                 logging.error(f"   ❌ Error processing document {processed_count}: {e}")
                 continue
@@ -49,10 +39,14 @@ def main():
         logging.error(f"❌ Error in main execution: {e}")
     finally:
         db.close()
+        fetcher.client.stats.write_report()
+        extractcache.log_report()
         logging.info(f"\n🎉 Processing Complete!")
         logging.info(f"   📊 Total FDA Philippines documents processed: {processed_count}")
+        logging.info(f"   🔗 Near-duplicates linked instead of stored: {writer.duplicates}")
         logging.info(f"   🗄️ All documents stored in PostgreSQL database")
         logging.info(f"   🔌 Database connection closed")
 
 if __name__ == '__main__':
-    main()
+    with profiling.profile_run('main_updated', profiling.mode_from_argv()):
+        main()
@@ -0,0 +1,146 @@
+"""
+Structured metadata extraction stage
+- Issuance type and number (via IssuanceClassifier)
+- Real signing/issue date and effective date from the document body,
+  falling back to the WordPress post date instead of a fake "<year>-01-01"
+- Product categories from title + body
+- Patterns are compiled once; extract_batch() runs the stage over a whole batch
+- metadata_to_json() / metadata_from_json() let results be cached (see extractcache.py)
+"""
+import re
+from collections import namedtuple
+from datetime import date
+from classifier import IssuanceClassifier
+
+# Regulated product categories as published by FDA Philippines
+PRODUCT_CATEGORIES = {
+    'Drugs': r'\bdrugs?\b|\bmedicines?\b|pharmaceutical',
+    'Food': r'\bfood\b|food supplements?|dietary supplements?',
+    'Cosmetics': r'cosmetics?',
+    'Medical Devices': r'medical devices?|in[- ]vitro diagnostic',
+    'Vaccines': r'vaccines?',
+    'Household/Urban Hazardous Substances': r'household(?:/urban)? hazardous|urban hazardous|pesticides?',
+    'Toys and Childcare Articles': r'\btoys?\b|childcare articles?',
+    'Radiation Devices': r'radiation[- ]emitting|radiation devices?',
+}
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+          r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)')
+
+# One pass over the text finds dates and "effective" markers together
+_DATE_PATTERN = re.compile(
+    r'(?P<effective>\beffective\b|\btake[s]? effect\b|\beffectivity\b)'
+    rf'|\b(?P<d1>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<m1>{_MONTH})\.?,?\s+(?P<y1>(?:19|20)\d{{2}})\b'
+    rf'|\b(?P<m2>{_MONTH})\.?\s+(?P<d2>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<y2>(?:19|20)\d{{2}})\b'
+    r'|\b(?P<y3>(?:19|20)\d{2})-(?P<m3>\d{2})-(?P<d3>\d{2})\b',
+    re.IGNORECASE,
+)
+
+# A date this close after an "effective" marker is the effective date
+EFFECTIVE_WINDOW = 120
+# Only the start of the document body carries the signing date
+BODY_WINDOW = 8000
+
+IssuanceMetadata = namedtuple('IssuanceMetadata', [
+    'issuance_type', 'issuance_number', 'issue_date', 'effective_date', 'product_categories',
+])
+
+
+def metadata_to_json(meta):
+    """IssuanceMetadata as a JSON-serializable dict (dates as ISO strings)"""
+    return {key: value.isoformat() if isinstance(value, date) else value for key, value in meta._asdict().items()}
+
+
+def metadata_from_json(data):
+    """Inverse of metadata_to_json()"""
+    return IssuanceMetadata(**{
+        key: date.fromisoformat(value) if key in ('issue_date', 'effective_date') and value else value
+        for key, value in data.items()
+    })
+
+
+def _to_date(match):
+    """Build a date from whichever alternative of _DATE_PATTERN matched, or None if invalid"""
+    for d, m, y in (('d1', 'm1', 'y1'), ('d2', 'm2', 'y2'), ('d3', 'm3', 'y3')):
+        if match.group(y):
+            month = match.group(m)
+            month = int(month) if month.isdigit() else _MONTHS[month[:3].lower()]
+            try:
+                return date(int(match.group(y)), month, int(match.group(d)))
+            except ValueError:
+                return None
+    return None
+
+
+class MetadataExtractor:
+    def __init__(self, classifier=None, product_categories=PRODUCT_CATEGORIES):
+        self.classifier = classifier or IssuanceClassifier(separator=None)
+        self._category_pattern = re.compile(
+            '|'.join(f'(?P<c{i}>{pattern})' for i, pattern in enumerate(product_categories.values())),
+            re.IGNORECASE,
+        )
+        self._category_names = {f'c{i}': name for i, name in enumerate(product_categories)}
+
+    def _body(self, text, classification):
+        """Skip the site navigation: start the body where the issuance number first appears"""
+        start = text.find(classification.number) if classification.number else -1
+        return text[max(start, 0):max(start, 0) + BODY_WINDOW]
+
+    def _dates(self, body):
+        issue_date = effective_date = None
+        effective_at = None
+        for match in _DATE_PATTERN.finditer(body):
+            if match.group('effective'):
+                effective_at = match.end()
+                continue
+            found = _to_date(match)
+            if found is None or found.year > date.today().year + 1:
+                continue
+            if effective_at is not None and match.start() - effective_at <= EFFECTIVE_WINDOW:
+                effective_date = effective_date or found
+                effective_at = None
+            elif issue_date is None:
+                issue_date = found
+            if issue_date and effective_date:
+                break
+        return issue_date, effective_date
+
+    def extract(self, title, text, posted_date=None):
+        """
+        Extract metadata for one document.
+        posted_date ('YYYY-MM-DD' from the WordPress API) is used when the body carries no date.
+        """
+        text = text or ''
+        classification = self.classifier.classify(title or '')
+        body = self._body(text, classification)
+        issue_date, effective_date = self._dates(body)
+        if issue_date is None and posted_date:
+            try:
+                issue_date = date.fromisoformat(posted_date[:10])
+            except ValueError:
+                pass
+
+        seen = set()
+        categories = []
+        for match in self._category_pattern.finditer(f'{title}\n{body}'):
+            name = self._category_names[match.lastgroup]
+            if name not in seen:
+                seen.add(name)
+                categories.append(name)
+
+        return IssuanceMetadata(
+            issuance_type=classification.doc_type,
+            issuance_number=classification.number,
+            issue_date=issue_date,
+            effective_date=effective_date,
+            product_categories=sorted(categories) or None,
+        )
+
+    def extract_batch(self, documents):
+        """Run the stage over a batch of {'title', 'content', 'date'} dicts; results are in the same order"""
+        extract = self.extract
+        return [extract(doc.get('title', ''), doc.get('content', ''), doc.get('date')) for doc in documents]
@@ -0,0 +1,101 @@
+"""
+Lightweight in-process metrics for the FDA Philippines pipeline
+- Counters and latency timers shared by the DB pool, fetcher and workers
+- Thread-safe, no external dependencies
+- snapshot() returns a plain dict for logging or JSON output
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Timer:
+    """Accumulates observations (in seconds) and reports count/avg/max/percentiles"""
+
+    MAX_SAMPLES = 2048
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            # Keep a bounded reservoir so long-running processes don't grow
+            if len(self._samples) < self.MAX_SAMPLES:
+                self._samples.append(seconds)
+            else:
+                self._samples[self.count % self.MAX_SAMPLES] = seconds
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total, maximum = self.count, self.total, self.max
+
+        def pct(p):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            'count': count,
+            'avg_ms': round(total / count * 1000, 3) if count else 0.0,
+            'p50_ms': round(pct(0.50) * 1000, 3),
+            'p95_ms': round(pct(0.95) * 1000, 3),
+            'max_ms': round(maximum * 1000, 3),
+        }
+
+
+class Metrics:
+    """Registry of named counters and timers"""
+
+    def __init__(self):
+        self._counters = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timer(self, name):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = Timer()
+            return timer
+
+    def observe(self, name, seconds):
+        self.timer(name).observe(seconds)
+
+    @contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            timers = dict(self._timers)
+        return {
+            'counters': counters,
+            'timers': {name: timer.snapshot() for name, timer in timers.items()},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+# Process-wide registry used by default
+metrics = Metrics()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Dry run: what the next ingestion run would do, from the listing stage alone
+- Lists each source through its posts API (minimal fields); no post pages are downloaded and
+  nothing is written to the database, the archive or the processed-URL files
+- new: URLs never fetched before; changed: fetched before, modified since (per the page archive);
+  skipped: already fetched and unchanged
+- Changed documents are re-fetched by the job queue only (jobqueue.py re-queues modified posts); `run`,
+  `schedule` and the daemon skip every processed URL, so they are listed as "changed (queue only)" and
+  estimated separately (estimated_bytes_queue)
+- Estimated download size from the average post size of the latest crawl report (crawlstats.py),
+  else the page archive, else a default
+
+Usage: python3 plan.py                     # every registered source
+       python3 plan.py --sources fda_ph --json
+       python3 cli.py plan --json > plan.json
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from config import ARCHIVE_DIR, CRAWL_REPORT_DIR
+
+DEFAULT_PAGE_BYTES = 80 * 1024
+# Archive records hold the raw HTML plus its extracted text and JSON framing
+ARCHIVE_HTML_SHARE = 0.8
+
+
+def _parse_time(value, assume_utc=False):
+    """Aware datetime from a WordPress *_gmt value (UTC) or an archive fetched_at (local time)"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc) if assume_utc else moment.astimezone()
+    return moment
+
+
+def average_page_bytes(archive_index, report_dir=CRAWL_REPORT_DIR):
+    """(bytes per post page, where the estimate comes from)"""
+    reports = sorted(glob.glob(os.path.join(report_dir, 'crawl-*.json')), key=os.path.getmtime, reverse=True)
+    for path in reports:
+        try:
+            with open(path, encoding='utf-8') as f:
+                post = json.load(f)['classes'].get('post')
+        except (OSError, ValueError, KeyError):
+            continue
+        if post and post['size_bytes']['mean']:
+            return int(post['size_bytes']['mean']), f"crawl report {os.path.basename(path)}"
+    if archive_index:
+        raw = sum(entry.raw for entry in archive_index.values()) / len(archive_index)
+        return int(raw * ARCHIVE_HTML_SHARE), f"page archive ({len(archive_index)} pages)"
+    return DEFAULT_PAGE_BYTES, 'default'
+
+
+def _processed_urls(source):
+    if not source.processed_urls_file or not os.path.exists(source.processed_urls_file):
+        return set()
+    with open(source.processed_urls_file) as f:
+        return set(line.strip() for line in f if line.strip())
+
+
+def plan_source(source, client, archive_index, page_bytes):
+    from sources import target_years
+
+    start = time.perf_counter()
+    listed = source.list_documents(client, set(), target_years())
+    processed = _processed_urls(source)
+    plan = {'source': source.name, 'listed': len(listed), 'new': [], 'changed': [], 'skipped': []}
+    for doc in listed:
+        item = {key: doc.get(key) for key in ('url', 'title', 'date', 'modified', 'doc_type', 'doc_number')}
+        entry = archive_index.get(doc['url'])
+        if doc['url'] not in processed and entry is None:
+            plan['new'].append(item)
+            continue
+        fetched_at = _parse_time(entry.fetched_at) if entry else None
+        modified = _parse_time(doc.get('modified'), assume_utc=True)
+        if fetched_at and modified and modified > fetched_at:
+            item['fetched_at'] = entry.fetched_at
+            plan['changed'].append(item)
+        else:
+            item['reason'] = 'unchanged' if fetched_at else 'already processed'
+            plan['skipped'].append(item)
+    plan['counts'] = {key: len(plan[key]) for key in ('new', 'changed', 'skipped')}
+    # What `run` / `schedule` / the daemon download; the job queue also re-fetches the changed ones
+    plan['estimated_bytes'] = len(plan['new']) * page_bytes
+    plan['estimated_bytes_queue'] = (len(plan['new']) + len(plan['changed'])) * page_bytes
+    plan['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return plan
+
+
+def build_plan(sources, client, archive_path=ARCHIVE_DIR):
+    from archive import read_index
+
+    archive_index = read_index(archive_path)
+    page_bytes, basis = average_page_bytes(archive_index)
+    plans = [plan_source(source, client, archive_index, page_bytes) for source in sources]
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'page_bytes_estimate': page_bytes,
+        'estimate_basis': basis,
+        'counts': {key: sum(p['counts'][key] for p in plans) for key in ('new', 'changed', 'skipped')},
+        'estimated_bytes': sum(p['estimated_bytes'] for p in plans),
+        'estimated_bytes_queue': sum(p['estimated_bytes_queue'] for p in plans),
+        'sources': plans,
+    }
+
+
+def print_plan(plan, limit=20):
+    for source in plan['sources']:
+        counts = source['counts']
+        print(f"📋 [{source['source']}] {source['listed']} listed: {counts['new']} new, "
+              f"{counts['changed']} changed (queue only), {counts['skipped']} skipped "
+              f"(~{source['estimated_bytes'] / 1048576:.1f} MiB to fetch, listed in {source['elapsed_s']:.1f}s)")
+        for label, key in (('🆕 new', 'new'), ('✏️ changed (queue only)', 'changed')):
+            for item in source[key][:limit]:
+                print(f"   {label}: {(item['title'] or '')[:60]}")
+                print(f"      {item['url']}")
+            if len(source[key]) > limit:
+                print(f"   ... and {len(source[key]) - limit} more {key}")
+    counts = plan['counts']
+    print(f"\n📦 Total: {counts['new']} new, {counts['changed']} changed (queue only), {counts['skipped']} skipped; "
+          f"~{plan['estimated_bytes'] / 1048576:.1f} MiB at {plan['page_bytes_estimate'] / 1024:.0f} KiB/page "
+          f"({plan['estimate_basis']})")
+    if counts['changed']:
+        print(f"   ✏️ The job queue (python3 cli.py queue) also re-fetches the changed documents: "
+              f"~{plan['estimated_bytes_queue'] / 1048576:.1f} MiB in total")
+
+
+def main(argv=None):
+    from http_client import HttpClient
+    from sources import SOURCES, get_source
+
+    parser = argparse.ArgumentParser(description='Show what the next run would fetch, without downloading any post pages')
+    parser.add_argument('--sources', help='comma-separated source names (default: all registered)')
+    parser.add_argument('--json', action='store_true', help='print the plan as JSON')
+    parser.add_argument('--limit', type=int, default=20, help='documents listed per category in text output')
+    args = parser.parse_args(argv)
+
+    if args.json:
+        # Keep stdout parseable
+        logging.getLogger().setLevel(logging.WARNING)
+    sources = [get_source(name.strip()) for name in args.sources.split(',')] if args.sources else list(SOURCES.values())
+    client = HttpClient()
+    try:
+        plan = build_plan(sources, client)
+    finally:
+        client.close()
+    if args.json:
+        json.dump(plan, sys.stdout, indent=2)
+        print()
+    else:
+        print_plan(plan, args.limit)
+    return plan
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Opt-in profiling for the entry points
+- `--profile` (cProfile) or `--profile sample` on the command line, or FDA_PROFILE=cprofile|sample
+- cprofile: deterministic; one <stage>.pstats per pipeline stage (listing, fetch, extract, metadata, store, ...)
+  Python 3.11 and earlier only: from 3.12 cProfile runs on sys.monitoring, which allows one active
+  profiler per interpreter, so the per-thread, per-stage profilers conflict; 3.12+ falls back to sample
+- sample: a background thread samples every thread's stack each FDA_PROFILE_INTERVAL_MS; low overhead, safe in production
+- Both modes write <stage>.collapsed stack files (the py-spy / flamegraph.pl / speedscope format)
+- summary.json: wall time per stage and the measured profiler overhead
+- Stages are marked with `with profiling.stage('fetch'):`, which costs nothing when profiling is off
+
+Usage: python3 main_updated.py --profile
+       FDA_PROFILE=sample python3 scheduler.py
+       python3 -m pstats Philippines_Extract/profiles/<run>/fetch.pstats
+       flamegraph.pl Philippines_Extract/profiles/<run>/fetch.collapsed > fetch.svg
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from config import PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_MODE
+
+logging.basicConfig(level=logging.INFO)
+
+MODES = ('cprofile', 'sample')
+# From 3.12 only one cProfile.Profile can be enabled at a time in the whole interpreter
+CPROFILE_PER_THREAD = sys.version_info < (3, 12)
+ROOT_STAGE = 'run'
+MAX_DEPTH = 128
+
+_NULL_STAGE = nullcontext()
+_active = None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _calibration_workload():
+    def fib(n):
+        return n if n < 2 else fib(n - 1) + fib(n - 2)
+    return fib(18)
+
+
+def _cprofile_slowdown():
+    """Slowdown of a call-heavy workload under cProfile (a worst case; I/O-bound stages see far less)"""
+    import cProfile
+    start = time.perf_counter()
+    _calibration_workload()
+    plain = time.perf_counter() - start
+    profile = cProfile.Profile()
+    start = time.perf_counter()
+    profile.enable()
+    _calibration_workload()
+    profile.disable()
+    return round((time.perf_counter() - start) / plain, 2) if plain else None
+
+
+class Profiler:
+    def __init__(self, mode='cprofile', out_dir=PROFILE_DIR, interval_ms=PROFILE_INTERVAL_MS, run_id=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (available: {', '.join(MODES)})")
+        if mode == 'cprofile' and not CPROFILE_PER_THREAD:
+            logging.warning(f"⚠️ Per-stage cProfile needs Python 3.11 or earlier (running "
+                            f"{sys.version_info.major}.{sys.version_info.minor}); using the sampler instead")
+            mode = 'sample'
+        self.mode = mode
+        self.interval = interval_ms / 1000.0
+        self.run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.out_dir = os.path.join(out_dir, self.run_id)
+        self._lock = threading.Lock()
+        self._thread_stages = {}       # thread ident -> stack of active stage names
+        self._profiles = {}            # (stage, thread ident) -> cProfile.Profile
+        self._samples = {}             # stage -> Counter of collapsed stacks
+        self._wall = Counter()         # stage -> seconds, summed over threads
+        self._calls = Counter()
+        self._sampler = None
+        self._stop = threading.Event()
+        self._sampler_cpu = 0.0
+        self._sample_count = 0
+
+    # ---- stages ----------------------------------------------------------
+
+    def _profile(self, name, ident):
+        import cProfile
+        key = (name, ident)
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = cProfile.Profile()
+        return profile
+
+    @contextmanager
+    def stage(self, name):
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._thread_stages.setdefault(ident, [])
+        profile = None
+        if self.mode == 'cprofile':
+            # One profiler per thread is active at a time: pause the enclosing stage's
+            if stack:
+                self._profile(stack[-1], ident).disable()
+            profile = self._profile(name, ident)
+            profile.enable()
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if profile is not None:
+                profile.disable()
+                if stack:
+                    self._profile(stack[-1], ident).enable()
+            with self._lock:
+                self._wall[name] += elapsed
+                self._calls[name] += 1
+
+    # ---- sampler ---------------------------------------------------------
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            cpu = time.thread_time()
+            with self._lock:
+                stages = {ident: stack[-1] for ident, stack in self._thread_stages.items() if stack}
+            for ident, frame in sys._current_frames().items():
+                stage = stages.get(ident)
+                if ident == own or stage is None:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < MAX_DEPTH:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                key = ';'.join(reversed(labels))
+                with self._lock:
+                    self._samples.setdefault(stage, Counter())[key] += 1
+            self._sample_count += 1
+            self._sampler_cpu += time.thread_time() - cpu
+
+    # ---- run -------------------------------------------------------------
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._slowdown = _cprofile_slowdown() if self.mode == 'cprofile' else None
+        self._sampler = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self._sampler.start()
+        self._root = self.stage(ROOT_STAGE)
+        self._root.__enter__()
+        logging.info(f"🔬 Profiling ({self.mode}) into {self.out_dir}")
+
+    def stop(self):
+        """Stop profiling, write the per-stage files; returns the summary"""
+        import pstats
+        self._root.__exit__(None, None, None)
+        wall = time.perf_counter() - self.started
+        self._stop.set()
+        self._sampler.join()
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        stages = {}
+        for name in sorted(set(self._wall) | set(self._samples)):
+            samples = self._samples.get(name, Counter())
+            if samples:
+                with open(os.path.join(self.out_dir, f'{name}.collapsed'), 'w', encoding='utf-8') as f:
+                    for key, count in samples.most_common():
+                        f.write(f"{key} {count}\n")
+            profiles = [p for (stage, _), p in self._profiles.items() if stage == name]
+            if profiles:
+                for profile in profiles:
+                    profile.create_stats()
+                profiles = [p for p in profiles if p.stats]
+            if profiles:
+                pstats.Stats(*profiles).dump_stats(os.path.join(self.out_dir, f'{name}.pstats'))
+            stages[name] = {
+                'wall_s': round(self._wall[name], 3),
+                'calls': self._calls[name],
+                'samples': sum(samples.values()),
+            }
+
+        summary = {
+            'run_id': self.run_id,
+            'mode': self.mode,
+            'wall_s': round(wall, 3),
+            'stages': stages,
+            'overhead': {
+                'sampler_cpu_s': round(self._sampler_cpu, 3),
+                'sampler_cpu_pct_of_wall': round(100 * self._sampler_cpu / wall, 2) if wall else None,
+                'samples': self._sample_count,
+                'interval_ms': self.interval * 1000,
+                'cprofile_slowdown_call_heavy': self._slowdown,
+            },
+        }
+        with open(os.path.join(self.out_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        logging.info(f"🔬 Profile written to {self.out_dir} ({wall:.1f}s profiled)")
+        for name, stats in sorted(stages.items(), key=lambda item: -item[1]['wall_s']):
+            logging.info(f"   ⏱️ {name}: {stats['wall_s']:.2f}s over {stats['calls']} calls, {stats['samples']} samples")
+        overhead = summary['overhead']
+        logging.info(f"   🧮 Overhead: sampler {overhead['sampler_cpu_pct_of_wall']}% of wall"
+                     + (f", cProfile up to {self._slowdown}x on call-heavy code" if self._slowdown else ''))
+        return summary
+
+
+def stage(name):
+    """Mark a pipeline stage for the active profiler (no-op when profiling is off)"""
+    return _active.stage(name) if _active is not None else _NULL_STAGE
+
+
+@contextmanager
+def profile_run(name, mode=None):
+    """Profile the enclosed run when `mode` or FDA_PROFILE selects a profiler; yields the Profiler or None"""
+    global _active
+    mode = mode or PROFILE_MODE
+    if not mode or _active is not None:
+        yield None
+        return
+    profiler = Profiler(mode, run_id=f"{name}-{datetime.now().strftime('%Y%m%dT%H%M%S')}")
+    profiler.start()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = None
+        profiler.stop()
+
+
+def add_argument(parser):
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=MODES, default=None,
+                        help='profile the run (default cprofile; "sample" for low overhead), see profiling.py')
+
+
+def mode_from_argv(argv=None):
+    """--profile / --profile sample / --profile=sample for scripts without an argument parser"""
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg == '--profile':
+            return argv[i + 1] if i + 1 < len(argv) and argv[i + 1] in MODES else 'cprofile'
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1]
+    return None
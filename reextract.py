@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Offline re-extraction from the page archive
+- Replays archived raw HTML through the current extraction pipeline of the page's source (see sources.py)
+- Pages are processed in parallel across CPU cores; no network requests are made
+- Only rows whose extracted text changed are written back (batched UPDATE)
+- Rewritten rows are re-indexed for near-duplicate detection afterwards (dedup.rebuild)
+
+Usage: python3 reextract.py                 # re-extract the whole archive
+       python3 reextract.py --dry-run       # report what would change
+       python3 reextract.py --url <url>     # a single page
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import ARCHIVE_DIR
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+CHUNK_SIZE = 50
+WRITE_BATCH = 200
+
+_archive = None
+
+
+def _init_worker(archive_path):
+    global _archive
+    from archive import Archive
+    _archive = Archive(archive_path)
+
+
+def _reextract_chunk(entries, stored_hashes):
+    """Re-extract a chunk of archive entries; returns (documents whose text changed, unchanged count)"""
+    from sources import FDA_PHILIPPINES, source_for_url
+    changed = []
+    unchanged = 0
+    for entry in entries:
+        page = _archive.read_entry(entry)
+        source = source_for_url(page.url, FDA_PHILIPPINES)
+        text = source.extract_text(page.html)
+        if hashlib.md5(text.encode('utf-8')).hexdigest() == stored_hashes[page.url]:
+            unchanged += 1
+            continue
+        post = {'title': page.title or '', 'url': page.url, 'content': text, 'extraction_date': page.fetched_at}
+        changed.append((source, post))
+    # Summaries per chunk, in one batch per source
+    documents = []
+    for source in {id(source): source for source, _ in changed}.values():
+        posts = [post for owner, post in changed if owner is source]
+        for post, summary in zip(posts, source.summarizer.summarize_batch(posts)):
+            post['summary'] = summary
+            documents.append(source.build_document(post, source.metadata.extract(post['title'], post['content'])))
+    return documents, unchanged
+
+
+def reextract(db, archive_path=ARCHIVE_DIR, workers=None, urls=None, dry_run=False):
+    """Re-extract archived pages that are stored in the database; returns (changed, unchanged)"""
+    from archive import Archive
+
+    archive = Archive(archive_path)
+    try:
+        stored = db.text_hashes()
+        entries = [e for e in archive.entries() if e.url in stored and (not urls or e.url in urls)]
+    finally:
+        archive.close()
+    logging.info(f"🗄️ {len(entries)} archived pages match stored documents")
+    if not entries:
+        return 0, 0
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    changed = unchanged = 0
+    pending = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(archive_path,)) as pool:
+        futures = []
+        for i in range(0, len(entries), CHUNK_SIZE):
+            chunk = entries[i:i + CHUNK_SIZE]
+            futures.append(pool.submit(_reextract_chunk, chunk, {e.url: stored[e.url] for e in chunk}))
+
+        for future in futures:
+            documents, same = future.result()
+            unchanged += same
+            changed += len(documents)
+            for doc in documents:
+                logging.info(f"   📝 Changed: {doc['title'][:60]}...")
+            pending.extend(documents)
+            if not dry_run and len(pending) >= WRITE_BATCH:
+                db.update_extracted(pending)
+                pending = []
+
+    if pending and not dry_run:
+        db.update_extracted(pending)
+    if changed and not dry_run:
+        # update_extracted() dropped the stale MinHash signatures of the rewritten rows
+        from dedup import rebuild
+        rebuild(db)
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"🎉 Re-extracted {len(entries)} pages in {elapsed:.1f}s with {workers} workers "
+                 f"({len(entries) / elapsed:.0f} pages/s)")
+    logging.info(f"   📝 Changed: {changed}{' (dry run, not written)' if dry_run else ''}")
+    logging.info(f"   ⏭️ Unchanged: {unchanged}")
+    return changed, unchanged
+
+
+def main():
+    import profiling
+    from db import Database
+
+    parser = argparse.ArgumentParser(description='Re-extract stored documents from archived raw HTML')
+    parser.add_argument('--archive', default=ARCHIVE_DIR, help='archive directory')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--url', action='append', help='only re-extract this URL (repeatable)')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing them')
+    profiling.add_argument(parser)  # the parent process only; worker processes are not profiled
+    args = parser.parse_args()
+
+    db = Database()
+    try:
+        with profiling.profile_run('reextract', args.profile):
+            reextract(db, args.archive, workers=args.workers, urls=set(args.url or ()), dry_run=args.dry_run)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
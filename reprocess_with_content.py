@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 """
 Script to re-process existing URLs and extract full content
+(re-downloads the pages; to apply a new text cleaner to archived pages use reextract.py, which needs no network)
 """
 import logging
 from fetcher import Fetcher
 from db import Database
-import time
+from document import Document
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 
@@ -56,22 +57,13 @@ def reprocess_with_content():
                     print(f'   📋 Content preview: {doc["content"][:150]}...')
                     
                     # Store in database with full content
-                    db.upsert_guideline(
+                    db.upsert_document(Document(
                         title=doc['title'],
-                        summary=doc['content'][:500] + '...' if len(doc['content']) > 500 else doc['content'],
-                        issue_date=None,
-                        products=None,
                         link_guidance=doc['url'],
-                        link_file=None,
-                        country='Philippines',
-                        agency='FDA Philippines',
                         all_text=doc['content'],  # Full extracted content
-                        json_data={
-                            'source_url': doc['url'],
-                            'content_length': len(doc['content']),
-                            'reprocessed': True
-                        }
-                    )
+                        summary=fetcher.source.summarizer.summarize(doc['content'], doc['title'], doc['url']),
+                        extra={'reprocessed': True}
+                    ))
                     
                     processed_count += 1
                     print(f'   ✅ Stored with full content!')
@@ -79,9 +71,6 @@ def reprocess_with_content():
                 else:
                     print(f'   ❌ Failed to extract content')
                 
-                # Small delay between requests
-                time.sleep(1)
-                
             except Exception as e:
                 print(f'   ❌ Error processing {url}: {e}')
                 continue
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-source ingestion
+- Runs one Fetcher per registered source (see sources.py) on a thread pool
+- Sources share one HTTP session (per-host rate limits), one page archive and one
+  database connection pool; documents go through a single DocumentWriter
+- A slow or failing source does not hold up the others
+
+Usage: python3 scheduler.py                    # every registered source
+       python3 scheduler.py --sources fda_ph
+"""
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import profiling
+from metrics import metrics
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+
+class DocumentWriter:
+    """Stores fetched documents: near-duplicate check, upsert, MinHash registration. Thread-safe."""
+
+    def __init__(self, db):
+        from dedup import NearDuplicateDetector
+        self.db = db
+        self.detector = NearDuplicateDetector(db)
+        self.stored = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def store(self, doc, before_commit=None):
+        """
+        Upsert one document.Document (as yielded by Fetcher.yield_all_pdfs); returns the row id.
+        before_commit(cur, row_id) runs inside the upsert transaction.
+        """
+        # Republished issuances are linked to the canonical row (duplicate_of) and left out of search
+        with profiling.stage('dedup'):
+            duplicate, signature = self.detector.check(doc.link_guidance, doc.all_text, doc.title,
+                                                         doc.issuance_number)
+        json_data = None
+        if duplicate:
+            json_data = dict(doc.json_data, duplicate_of=duplicate.link_guidance,
+                             duplicate_similarity=round(duplicate.similarity, 3))
+            logging.info(f"   🔗 Near-duplicate of #{duplicate.id} ({duplicate.similarity:.0%})")
+
+        with profiling.stage('store'):
+            guideline_id = self.db.upsert_document(doc, json_data=json_data,
+                                                   duplicate_of=duplicate.id if duplicate else None,
+                                                   before_commit=before_commit)
+        if not duplicate:
+            self.detector.register(guideline_id, signature)
+
+        with self._lock:
+            self.stored += 1
+            if duplicate:
+                self.duplicates += 1
+        return guideline_id
+
+
+class SourceScheduler:
+    def __init__(self, sources, writer, client=None, archive=None, max_workers=None):
+        self.sources = list(sources)
+        self.writer = writer
+        self.client = client
+        self.archive = archive
+        self.max_workers = max_workers or len(self.sources)
+        # One Fetcher per source, reused across runs so its processed-URL index stays loaded
+        self.fetchers = {}
+
+    def fetcher(self, source):
+        from fetcher import Fetcher
+        if source.name not in self.fetchers:
+            self.fetchers[source.name] = Fetcher(source=source, client=self.client, archive=self.archive)
+        return self.fetchers[source.name]
+
+    def backlog(self):
+        """Documents listed in the last run that could not be fetched"""
+        return sum(f.last_listed - f.last_fetched for f in self.fetchers.values())
+
+    def run_source(self, source):
+        """Fetch and store one source; returns the number of documents stored"""
+        fetcher = self.fetcher(source)
+        count = 0
+        for doc in fetcher.yield_all_pdfs():
+            try:
+                self.writer.store(doc)
+                count += 1
+                metrics.incr(f'scheduler.{source.name}.stored')
+            except Exception as e:
+                metrics.incr(f'scheduler.{source.name}.errors')
+                logging.error(f"   ❌ [{source.name}] Error storing {doc['link_guidance']}: {e}")
+        return count
+
+    def run(self):
+        """Run every source concurrently; returns {source name: documents stored (or the exception)}"""
+        results = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='source') as pool:
+            futures = {pool.submit(self.run_source, source): source for source in self.sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    results[source.name] = future.result()
+                    logging.info(f"✅ [{source.name}] {results[source.name]} documents stored")
+                except Exception as e:
+                    results[source.name] = e
+                    logging.error(f"❌ [{source.name}] failed: {e}")
+        logging.info(f"🎉 {len(self.sources)} sources finished in {time.perf_counter() - start:.1f}s")
+        return results
+
+
+def main():
+    import extractcache
+    from archive import Archive
+    from config import ARCHIVE_ENABLED
+    from db import ConnectionPool, Database
+    from http_client import HttpClient
+    from sources import SOURCES, get_source
+
+    parser = argparse.ArgumentParser(description='Ingest several regulators concurrently')
+    parser.add_argument('--sources', help=f"comma-separated source names (available: {', '.join(sorted(SOURCES))})")
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
+    sources = [get_source(name.strip()) for name in args.sources.split(',')] if args.sources else list(SOURCES.values())
+    pool = ConnectionPool()
+    client = HttpClient()
+    archive = Archive() if ARCHIVE_ENABLED else None
+    try:
+        writer = DocumentWriter(Database(pool=pool))
+        with profiling.profile_run('scheduler', args.profile):
+            SourceScheduler(sources, writer, client=client, archive=archive).run()
+        logging.info(f"   📊 Stored {writer.stored} documents ({writer.duplicates} near-duplicates linked)")
+        client.stats.write_report()
+        extractcache.log_report()
+    finally:
+        client.close()
+        if archive is not None:
+            archive.close()
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Managed schema migrations for source.medical_guidelines
+- Ordered, idempotent migrations recorded in <schema>.schema_migrations
+- Indexes for the hot lookups (link_guidance, agency + created_at, json_data year)
+- json_data stored as jsonb so ->> works without casting at query time
+- Per-agency / per-year / per-day stats tables kept current by triggers (see Database.stats_snapshot)
+- Typed issuance metadata columns (see metadata.py) indexed for date-range queries
+- tsvector search column maintained on write with a GIN index (see Database.search)
+- MinHash signatures and LSH buckets for near-duplicate detection (see dedup.py)
+- (updated_at, id) index for incremental corpus exports (see export.py)
+- Durable per-URL ingestion job queue with priorities and adaptive revisit intervals (see jobqueue.py)
+- Applied only on request (this script / cli.py migrate, BulkLoader.prepare()), never by Database();
+  they need owner rights, and 001 deletes older rows of duplicated URLs only with --delete-duplicates
+
+Usage: python3 schema.py                       # apply pending migrations
+       python3 schema.py --status              # list applied / pending migrations and duplicated rows
+       python3 schema.py --delete-duplicates   # also let 001 delete the older duplicated rows
+"""
+import argparse
+import logging
+from config import TABLE_NAME
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+# (version, description, statements). Statements are formatted with
+# {table} (qualified), {name} (bare table name) and {schema}.
+MIGRATIONS = [
+    ('001', 'unique index on link_guidance', [
+        # Older rows for the same URL would block the unique index; keep the most recent one
+        """
+        DELETE FROM {table} older USING {table} newer
+        WHERE older.link_guidance = newer.link_guidance
+          AND (COALESCE(older.updated_at, older.created_at), older.id)
+              < (COALESCE(newer.updated_at, newer.created_at), newer.id)
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS {name}_link_guidance_key ON {table} (link_guidance)",
+    ]),
+    ('002', 'composite index on (agency, created_at)', [
+        "CREATE INDEX IF NOT EXISTS {name}_agency_created_at_idx ON {table} (agency, created_at)",
+    ]),
+    ('003', 'json_data as jsonb with expression index on year', [
+        "ALTER TABLE {table} ALTER COLUMN json_data TYPE jsonb USING json_data::jsonb",
+        "CREATE INDEX IF NOT EXISTS {name}_json_year_idx ON {table} ((json_data->>'year'))",
+    ]),
+    ('004', 'stats tables maintained by triggers', [
+        # Writers queue behind this lock so the backfill and the trigger see the same rows
+        "LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE",
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.{name}_agency_stats (
+            agency TEXT PRIMARY KEY,
+            doc_count BIGINT NOT NULL DEFAULT 0,
+            url_count BIGINT NOT NULL DEFAULT 0,
+            text_count BIGINT NOT NULL DEFAULT 0,
+            total_length BIGINT NOT NULL DEFAULT 0,
+            last_ingest_at TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.{name}_year_stats (
+            agency TEXT NOT NULL,
+            year TEXT NOT NULL,
+            doc_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (agency, year)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.{name}_daily_stats (
+            agency TEXT NOT NULL,
+            day DATE NOT NULL,
+            doc_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (agency, day)
+        )
+        """,
+        # Add (sign = 1) or remove (sign = -1) one document's contribution to every stats table
+        """
+        CREATE OR REPLACE FUNCTION {schema}.{name}_stats_apply(
+            p_agency TEXT, p_year TEXT, p_created TIMESTAMP, p_has_url BOOLEAN, p_length INTEGER, p_sign INTEGER
+        ) RETURNS void AS $$
+        BEGIN
+            INSERT INTO {schema}.{name}_agency_stats AS s
+                (agency, doc_count, url_count, text_count, total_length, last_ingest_at)
+            VALUES (
+                COALESCE(p_agency, ''), p_sign,
+                CASE WHEN p_has_url THEN p_sign ELSE 0 END,
+                CASE WHEN p_length IS NULL THEN 0 ELSE p_sign END,
+                COALESCE(p_length, 0) * p_sign,
+                CASE WHEN p_sign > 0 THEN now() END
+            )
+            ON CONFLICT (agency) DO UPDATE SET
+                doc_count = s.doc_count + EXCLUDED.doc_count,
+                url_count = s.url_count + EXCLUDED.url_count,
+                text_count = s.text_count + EXCLUDED.text_count,
+                total_length = s.total_length + EXCLUDED.total_length,
+                last_ingest_at = GREATEST(s.last_ingest_at, EXCLUDED.last_ingest_at);
+
+            INSERT INTO {schema}.{name}_year_stats AS s (agency, year, doc_count)
+            VALUES (COALESCE(p_agency, ''), COALESCE(p_year, ''), p_sign)
+            ON CONFLICT (agency, year) DO UPDATE SET doc_count = s.doc_count + EXCLUDED.doc_count;
+
+            IF p_created IS NOT NULL THEN
+                INSERT INTO {schema}.{name}_daily_stats AS s (agency, day, doc_count)
+                VALUES (COALESCE(p_agency, ''), p_created::date, p_sign)
+                ON CONFLICT (agency, day) DO UPDATE SET doc_count = s.doc_count + EXCLUDED.doc_count;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION {schema}.{name}_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM {schema}.{name}_stats_apply(OLD.agency, OLD.json_data->>'year', OLD.created_at,
+                                                    OLD.link_guidance IS NOT NULL, LENGTH(OLD.all_text), -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM {schema}.{name}_stats_apply(NEW.agency, NEW.json_data->>'year', NEW.created_at,
+                                                    NEW.link_guidance IS NOT NULL, LENGTH(NEW.all_text), 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION {schema}.{name}_stats_truncate() RETURNS trigger AS $$
+        BEGIN
+            TRUNCATE {schema}.{name}_agency_stats, {schema}.{name}_year_stats, {schema}.{name}_daily_stats;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS {name}_stats ON {table}",
+        """
+        CREATE TRIGGER {name}_stats AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE PROCEDURE {schema}.{name}_stats_trigger()
+        """,
+        "DROP TRIGGER IF EXISTS {name}_stats_truncate ON {table}",
+        """
+        CREATE TRIGGER {name}_stats_truncate AFTER TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE PROCEDURE {schema}.{name}_stats_truncate()
+        """,
+        # One last full scan to seed the counters; from here on they are maintained on write
+        "TRUNCATE {schema}.{name}_agency_stats, {schema}.{name}_year_stats, {schema}.{name}_daily_stats",
+        """
+        INSERT INTO {schema}.{name}_agency_stats (agency, doc_count, url_count, text_count, total_length, last_ingest_at)
+        SELECT COALESCE(agency, ''), COUNT(*), COUNT(link_guidance), COUNT(all_text),
+               COALESCE(SUM(LENGTH(all_text)), 0), MAX(GREATEST(created_at, updated_at))
+        FROM {table} GROUP BY 1
+        """,
+        """
+        INSERT INTO {schema}.{name}_year_stats (agency, year, doc_count)
+        SELECT COALESCE(agency, ''), COALESCE(json_data->>'year', ''), COUNT(*) FROM {table} GROUP BY 1, 2
+        """,
+        """
+        INSERT INTO {schema}.{name}_daily_stats (agency, day, doc_count)
+        SELECT COALESCE(agency, ''), created_at::date, COUNT(*) FROM {table} WHERE created_at IS NOT NULL GROUP BY 1, 2
+        """,
+    ]),
+    ('005', 'typed issuance metadata columns', [
+        "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS issuance_type TEXT",
+        "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS issuance_number TEXT",
+        "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS effective_date DATE",
+        "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS product_categories TEXT[]",
+        "CREATE INDEX IF NOT EXISTS {name}_agency_issue_date_idx ON {table} (agency, issue_date)",
+        "CREATE INDEX IF NOT EXISTS {name}_issuance_number_idx ON {table} (issuance_number)",
+        "CREATE INDEX IF NOT EXISTS {name}_product_categories_idx ON {table} USING GIN (product_categories)",
+    ]),
+    ('006', 'full-text search vector with GIN index', [
+        "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        # Title weighs most, then the summary, then the body
+        """
+        CREATE OR REPLACE FUNCTION {schema}.{name}_search_vector(p_title TEXT, p_summary TEXT, p_text TEXT)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('english', COALESCE(p_title, '')), 'A')
+                || setweight(to_tsvector('english', COALESCE(p_summary, '')), 'B')
+                || setweight(to_tsvector('english', COALESCE(p_text, '')), 'C')
+        $$ LANGUAGE sql IMMUTABLE
+        """,
+        """
+        CREATE OR REPLACE FUNCTION {schema}.{name}_search_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW.search_vector IS NOT NULL
+               AND NEW.title IS NOT DISTINCT FROM OLD.title
+               AND NEW.summary IS NOT DISTINCT FROM OLD.summary
+               AND NEW.all_text IS NOT DISTINCT FROM OLD.all_text THEN
+                RETURN NEW;
+            END IF;
+            NEW.search_vector := {schema}.{name}_search_vector(NEW.title, NEW.summary, NEW.all_text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "UPDATE {table} SET search_vector = {schema}.{name}_search_vector(title, summary, all_text)",
+        "DROP TRIGGER IF EXISTS {name}_search ON {table}",
+        """
+        CREATE TRIGGER {name}_search BEFORE INSERT OR UPDATE ON {table}
+        FOR EACH ROW EXECUTE PROCEDURE {schema}.{name}_search_trigger()
+        """,
+        "CREATE INDEX IF NOT EXISTS {name}_search_idx ON {table} USING GIN (search_vector)",
+    ]),
+    ('007', 'near-duplicate links and MinHash/LSH index', [
+        "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS duplicate_of INTEGER",
+        "CREATE INDEX IF NOT EXISTS {name}_duplicate_of_idx ON {table} (duplicate_of) WHERE duplicate_of IS NOT NULL",
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.{name}_minhash (
+            guideline_id INTEGER PRIMARY KEY,
+            signature BIGINT[] NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.{name}_lsh (
+            band SMALLINT NOT NULL,
+            bucket BIGINT NOT NULL,
+            guideline_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, guideline_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS {name}_lsh_guideline_idx ON {schema}.{name}_lsh (guideline_id)",
+    ]),
+    ('008', 'index on (updated_at, id) for incremental exports', [
+        # Every row needs an updated_at to be picked up by the export watermark
+        "UPDATE {table} SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS {name}_updated_at_id_idx ON {table} (updated_at, id)",
+    ]),
+    ('009', 'durable ingestion job queue', [
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.{name}_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            source TEXT NOT NULL,
+            url TEXT NOT NULL UNIQUE,
+            listing JSONB,
+            state TEXT NOT NULL DEFAULT 'pending' CHECK (state IN ('pending', 'running', 'done', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_expires_at TIMESTAMPTZ,
+            locked_by TEXT,
+            last_error TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+        # Only claimable jobs are indexed, so the index stays small as done jobs accumulate
+        "CREATE INDEX IF NOT EXISTS {name}_jobs_claim_idx ON {schema}.{name}_jobs (id) WHERE state IN ('pending', 'running')",
+    ]),
+    ('010', 'job priorities and adaptive revisit intervals', [
+        """
+        ALTER TABLE {schema}.{name}_jobs
+            ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS content_hash TEXT,
+            ADD COLUMN IF NOT EXISTS revisit_seconds INTEGER,
+            ADD COLUMN IF NOT EXISTS next_visit_at TIMESTAMPTZ,
+            ADD COLUMN IF NOT EXISTS last_changed_at TIMESTAMPTZ,
+            ADD COLUMN IF NOT EXISTS visits INTEGER NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS changes INTEGER NOT NULL DEFAULT 0
+        """,
+        "DROP INDEX IF EXISTS {schema}.{name}_jobs_claim_idx",
+        "CREATE INDEX IF NOT EXISTS {name}_jobs_claim_idx ON {schema}.{name}_jobs (priority, id) WHERE state IN ('pending', 'running')",
+        "CREATE INDEX IF NOT EXISTS {name}_jobs_revisit_idx ON {schema}.{name}_jobs (next_visit_at) WHERE state = 'done'",
+    ]),
+]
+
+
+# Rows migration 001 deletes: all but the most recent row of every link_guidance stored more than once
+DUPLICATE_ROWS = """
+    SELECT COALESCE(SUM(n - 1), 0) FROM (
+        SELECT COUNT(*) AS n FROM {table} WHERE link_guidance IS NOT NULL
+        GROUP BY link_guidance HAVING COUNT(*) > 1
+    ) duplicated
+"""
+
+
+def _names(table_name):
+    schema, _, name = table_name.rpartition('.')
+    return {'table': table_name, 'name': name, 'schema': schema or 'public'}
+
+
+def _ensure_migrations_table(cur, schema):
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.schema_migrations (
+            table_name TEXT NOT NULL,
+            version TEXT NOT NULL,
+            description TEXT,
+            applied_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (table_name, version)
+        )
+    """)
+
+
+def applied_versions(conn, table_name=TABLE_NAME):
+    names = _names(table_name)
+    with conn.cursor() as cur:
+        _ensure_migrations_table(cur, names['schema'])
+        cur.execute(f"SELECT version FROM {names['schema']}.schema_migrations WHERE table_name = %s", (table_name,))
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def duplicate_rows(conn, table_name=TABLE_NAME):
+    """Number of rows migration 001 would delete"""
+    with conn.cursor() as cur:
+        cur.execute(DUPLICATE_ROWS.format(**_names(table_name)))
+        count = cur.fetchone()[0]
+    conn.commit()
+    return count
+
+
+def migrate(conn, table_name=TABLE_NAME, delete_duplicates=False):
+    """
+    Apply every pending migration to `table_name`; each migration runs in its own transaction.
+    Migration 001 refuses to run while duplicated URLs exist unless delete_duplicates is set.
+    """
+    names = _names(table_name)
+    done = applied_versions(conn, table_name)
+    applied = []
+
+    for version, description, statements in MIGRATIONS:
+        if version in done:
+            continue
+        logging.info(f"🛠️ Applying migration {version} to {table_name}: {description}")
+        try:
+            with conn.cursor() as cur:
+                # Two processes starting at once must not run the same migration twice
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"schema:{table_name}",))
+                cur.execute(f"SELECT 1 FROM {names['schema']}.schema_migrations WHERE table_name = %s AND version = %s",
+                            (table_name, version))
+                if cur.fetchone():
+                    conn.rollback()
+                    continue
+                if version == '001':
+                    cur.execute(DUPLICATE_ROWS.format(**names))
+                    duplicates = cur.fetchone()[0]
+                    if duplicates:
+                        logging.warning(f"⚠️ {duplicates} older row(s) share a link_guidance with a newer row")
+                        if not delete_duplicates:
+                            raise RuntimeError(f"Migration 001 would delete {duplicates} duplicated row(s); "
+                                               "run python3 schema.py --delete-duplicates to delete them")
+                        logging.info(f"🗑️ Deleting {duplicates} duplicated row(s)")
+                for statement in statements:
+                    cur.execute(statement.format(**names))
+                cur.execute(f"INSERT INTO {names['schema']}.schema_migrations (table_name, version, description) VALUES (%s, %s, %s)",
+                            (table_name, version, description))
+            conn.commit()
+            applied.append(version)
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"❌ Migration {version} failed: {e}")
+            raise
+
+    if applied:
+        logging.info(f"✅ Applied {len(applied)} migration(s) to {table_name}: {', '.join(applied)}")
+    return applied
+
+
+def main():
+    import psycopg2
+    from config import DB_CONFIG
+
+    parser = argparse.ArgumentParser(description='Manage the medical_guidelines schema')
+    parser.add_argument('--status', action='store_true', help='show applied and pending migrations only')
+    parser.add_argument('--delete-duplicates', action='store_true',
+                        help='let migration 001 delete all but the most recent row of each duplicated URL')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if args.status:
+            done = applied_versions(conn)
+            print(f'🗄️ SCHEMA STATUS ({TABLE_NAME})')
+            for version, description, _ in MIGRATIONS:
+                status = '✅' if version in done else '⏳'
+                print(f'   {status} {version} - {description}')
+            if '001' not in done:
+                print(f'   🗑️ Rows migration 001 would delete: {duplicate_rows(conn)}')
+        else:
+            migrate(conn, delete_duplicates=args.delete_duplicates)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
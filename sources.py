@@ -0,0 +1,215 @@
+"""
+Source plugins: everything that differs between regulators
+- Listing strategy: how to find candidate issuances (e.g. the WordPress REST API)
+- Classifier: which listed posts are regulatory issuances
+- Extractor: raw HTML -> text
+- Metadata mapping: agency / country and the document.Document built from a post
+- Summarizer: extractive summary of the text (see summarizer.py)
+Sources are registered by name; Fetcher and scheduler.py take a Source instead of hard-coded URLs.
+"""
+import logging
+from datetime import datetime
+from urllib.parse import urlsplit
+from config import FDA_WP_POSTS_URL, PH_GUIDANCE_URL
+from classifier import IssuanceClassifier
+from document import Document
+from metadata import MetadataExtractor
+from summarizer import Summarizer
+
+logging.basicConfig(level=logging.INFO)
+
+# Post fields the listing needs; the API otherwise returns every post's full rendered content
+LISTING_FIELDS = ('id', 'link', 'title', 'date', 'date_gmt', 'modified', 'modified_gmt')
+
+
+def target_years(now=None):
+    """Years the pipeline ingests: the current and the previous one"""
+    year = (now or datetime.now()).year
+    return [str(year), str(year - 1)]
+
+
+def clean_html(html):
+    """Extract the visible text of a page as a single whitespace-normalized string"""
+    from bs4 import BeautifulSoup  # not needed for listing-only commands (plan, status)
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    text_content = soup.get_text()
+
+    lines = (line.strip() for line in text_content.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def build_document(post, meta, agency='FDA Philippines', country='Philippines'):
+    """document.Document for an extracted post and its IssuanceMetadata"""
+    return Document.from_post(post, meta, agency=agency, country=country)
+
+
+class Source:
+    """
+    Base class for a document source. Subclasses implement list_documents(); the other
+    hooks default to the FDA Philippines behaviour and can be overridden per regulator.
+    """
+    name = None
+    agency = None
+    country = None
+    hosts = ()          # hosts this source fetches from
+    rate_limit = None   # requests per second per host (None: config default)
+    processed_urls_file = None
+
+    def __init__(self, classifier=None, metadata=None, summarizer=None):
+        self.classifier = classifier or IssuanceClassifier()
+        self.metadata = metadata or MetadataExtractor()
+        self.summarizer = summarizer or Summarizer()
+
+    def list_documents(self, client, processed_urls, target_years):
+        """Listing docs ({'title', 'url', 'date', 'doc_type', 'doc_number'}) not yet processed"""
+        raise NotImplementedError
+
+    def extract_text(self, html):
+        return clean_html(html)
+
+    def build_document(self, post, meta):
+        return build_document(post, meta, agency=self.agency, country=self.country)
+
+    def owns(self, url):
+        return urlsplit(url).hostname in self.hosts
+
+
+class WordPressSource(Source):
+    """Regulator publishing issuances as WordPress posts, listed through the REST API"""
+
+    def __init__(self, name, agency, country, api_url, listing_url=None, max_pages=10, per_page=100,
+                 params=None, rate_limit=None, classifier=None, metadata=None, summarizer=None,
+                 processed_urls_file=None):
+        super().__init__(classifier, metadata, summarizer)
+        self.name = name
+        self.agency = agency
+        self.country = country
+        self.api_url = api_url
+        self.listing_url = listing_url or api_url
+        self.max_pages = max_pages
+        self.per_page = per_page
+        self.params = params or {}
+        self.rate_limit = rate_limit
+        self.hosts = (urlsplit(api_url).hostname,)
+        self.processed_urls_file = processed_urls_file or f'processed_urls_{name}.txt'
+
+    def list_documents(self, client, processed_urls, target_years):
+        """Fetch documents from the WordPress REST API (target years only)"""
+        docs = []
+
+        try:
+            page = 1
+            total_docs = 0
+
+            while page <= self.max_pages:
+                params = dict(self.params, per_page=self.per_page, page=page, orderby='date', order='desc',
+                              _fields=','.join(LISTING_FIELDS))
+
+                logging.info(f"📄 Fetching {self.agency} listing page {page} via WordPress API...")
+
+                resp = client.get(self.api_url, url_class='listing', params=params)
+                if resp.status_code != 200:
+                    logging.warning(f"API request failed for page {page}: {resp.status_code}")
+                    break
+
+                posts_data = resp.json()
+                if not posts_data:
+                    break
+
+                if page == 1:
+                    total_posts = resp.headers.get('X-WP-Total', 'Unknown')
+                    total_pages = resp.headers.get('X-WP-TotalPages', 'Unknown')
+                    logging.info(f"📋 WordPress API: {total_posts} total posts across {total_pages} pages")
+                    logging.info(f"🎯 Filtering for documents from years: {', '.join(target_years)}")
+
+                page_regulatory_docs = 0
+                found_older_docs = False
+                classifications = self.classifier.classify_posts(posts_data)
+
+                for post, classification in zip(posts_data, classifications):
+                    title = post.get('title', {}).get('rendered', '')
+                    link = post.get('link', '')
+                    date = post.get('date', '')
+
+                    year = date[:4] if date else '0000'
+
+                    if year not in target_years:
+                        if year < min(target_years):
+                            found_older_docs = True
+                        continue
+
+                    if link in processed_urls:
+                        continue
+
+                    if classification.is_regulatory:
+                        docs.append({
+                            'title': title,
+                            'url': link,
+                            'date': date[:10],
+                            'published': post.get('date_gmt'),  # UTC, for time-to-ingest
+                            'modified': post.get('modified_gmt') or post.get('modified'),
+                            'doc_type': classification.doc_type,
+                            'doc_number': classification.number
+                        })
+                        page_regulatory_docs += 1
+                        total_docs += 1
+
+                logging.info(f"📋 Page {page}: Found {page_regulatory_docs} regulatory documents from {'/'.join(target_years)}")
+
+                if found_older_docs:
+                    logging.info(f"🔍 Reached documents older than {min(target_years)}, stopping search")
+                    break
+
+                page += 1
+
+            logging.info(f"📄 Total regulatory documents found from {'/'.join(target_years)}: {total_docs}")
+
+        except Exception as e:
+            logging.error(f"Error fetching from WordPress API: {e}")
+
+        unique_docs = []
+        seen_urls = set()
+        for doc in docs:
+            if doc['url'] not in seen_urls:
+                unique_docs.append(doc)
+                seen_urls.add(doc['url'])
+
+        return unique_docs
+
+
+SOURCES = {}
+
+
+def register(source):
+    SOURCES[source.name] = source
+    return source
+
+
+def get_source(name):
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown source '{name}' (available: {', '.join(sorted(SOURCES))})") from None
+
+
+def source_for_url(url, default=None):
+    """The registered source that fetches `url`"""
+    for source in SOURCES.values():
+        if source.owns(url):
+            return source
+    return default
+
+
+FDA_PHILIPPINES = register(WordPressSource(
+    name='fda_ph',
+    agency='FDA Philippines',
+    country='Philippines',
+    api_url=FDA_WP_POSTS_URL,
+    listing_url=PH_GUIDANCE_URL,
+    processed_urls_file='processed_urls.txt',
+))
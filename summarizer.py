@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Extractive summaries for the summary column, instead of the first N characters of the page text
+- Skips the site chrome: the body starts at the memo header ("TO:", "SUBJECT:") or the title, and
+  sentences repeated across documents (navigation, footer, share links) are dropped as boilerplate
+- Keeps the "TO:" / "SUBJECT:" lines (one per line), then the first substantive sentence and the
+  highest-scoring sentences, in document order
+- Sentences end at . ! ? but not after abbreviations common in issuances (No., Sec., R.A., ...);
+  a summary never ends mid-sentence unless a single sentence is longer than the whole budget
+- Scores: TF-IDF over the whole batch (one vocabulary and one IDF pass per batch) plus a lead bonus
+- summarize_batch() is the pipeline stage; summarize() reuses the boilerplate seen in earlier batches
+- body_text() is the same chrome stripping for other consumers (near-duplicate shingles, see dedup.py)
+
+Usage: python3 summarizer.py --url <url>          # summary of one archived page
+       python3 summarizer.py --limit 20           # the latest archived pages
+       python3 benchmarks.py summarize            # cost per document
+"""
+import argparse
+import html
+import logging
+import math
+import re
+import threading
+from collections import Counter
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+
+SUMMARY_CHARS = 500
+HEADER_CHARS = 200          # longest "SUBJECT:" value kept
+HEADER_WINDOW = 1500        # memo header fields are looked for at the start of the body only
+MIN_WORDS = 5               # shorter sentences are headings or chrome, not substance
+MAX_SENTENCE_CHARS = 600    # longer "sentences" are unpunctuated menus or tables
+BOILERPLATE_DOCS = 3        # a sentence seen in this many documents is site chrome
+BOILERPLATE_SHARE = 0.3     # ... or in this share of a batch
+MAX_TRACKED = 50000         # sentence fingerprints remembered across batches
+LEAD_SENTENCES = 3
+LEAD_BONUS = 0.5
+
+_WORD = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+_HEADER = re.compile(r'\b(?P<label>TO|To|SUBJECT|Subject|RE|Re)\s*:\s*')
+# The next memo field, or the first numbered section heading ("I. RATIONALE", "1. BACKGROUND")
+_NEXT_FIELD = re.compile(r'\s(?:TO|To|FROM|From|SUBJECT|Subject|RE|DATE|Date|CC|THRU|Thru)\s*:'
+                         r'|\s(?:[IVX]{1,4}|\d{1,2}|[A-H])\.\s+(?=[A-Z]{3,}\b)')
+_CHROME = re.compile(r'copyright|all rights reserved|skip to (?:main )?content|click here|share (?:this|on)'
+                     r'|read more|related posts|follow us|subscribe', re.IGNORECASE)
+
+_ABBREVIATIONS = frozenset([
+    'no', 'nos', 'sec', 'secs', 'art', 'arts', 'par', 'para', 'vol', 'ch', 'p', 'pp', 'fig',
+    'dr', 'mr', 'mrs', 'ms', 'atty', 'engr', 'hon', 'rep', 'sen', 'gov', 'gen', 'usec', 'asec',
+    'inc', 'co', 'corp', 'ltd', 'jr', 'sr', 'st', 'dept', 'rev', 'approx', 'vs', 'etc', 'viz',
+    'e.g', 'i.e', 'r.a', 'a.o', 'p.d', 'e.o', 'm.c', 'd.o', 'jan', 'feb', 'mar', 'apr', 'jun',
+    'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+])
+_STOPWORDS = frozenset('''
+    a an and are as at be been by for from has have in is it its of on or that the this to was were
+    will with shall all any such these those which who whom under upon into their there other than
+    not no may be being also our we you your he she they them his her
+'''.split())
+
+
+def split_sentences(text):
+    """Sentences of whitespace-normalized text, not split after abbreviations or initials"""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.start() + 1
+        space = text.rfind(' ', start, end)
+        word = text[max(space, start):end].strip().rstrip('.!?"\')]').lower().lstrip('("\'[')
+        # Not after "No.", initials ("J.") or a list number that opens the sentence ("1. Background")
+        if text[match.start()] == '.' and (word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+                                           or (word.isdigit() and len(word) <= 2 and space < start)):
+            continue
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def body_text(text, title=None):
+    """Whitespace-normalized page text from the memo header / title on, without site-chrome sentences"""
+    text = ' '.join((text or '').split())
+    body = text[Summarizer._body_start(text, title):]
+    return ' '.join(sentence for sentence in split_sentences(body) if not _CHROME.search(sentence))
+
+
+def _clip(text, limit):
+    """`text` cut at a word boundary to fit `limit` characters, with '...' when cut"""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 3].rsplit(' ', 1)[0].rstrip(',;:')
+    return cut + '...'
+
+
+class _Parsed:
+    __slots__ = ('headers', 'sentences', 'tokens', 'fingerprints')
+
+    def __init__(self, headers, sentences):
+        self.headers = headers
+        self.sentences = sentences
+        self.tokens = [[word for word in _WORD.findall(s.lower()) if word not in _STOPWORDS] for s in sentences]
+        # Case and punctuation do not make a repeated footer line a different sentence
+        self.fingerprints = [hash(tuple(tokens)) for tokens in self.tokens]
+
+
+class Summarizer:
+    def __init__(self, max_chars=SUMMARY_CHARS):
+        self.max_chars = max_chars
+        self._seen = {}  # sentence fingerprint -> documents (URL or title) it appeared in, up to BOILERPLATE_DOCS
+        self._lock = threading.Lock()
+
+    # ---- parsing ---------------------------------------------------------
+
+    @staticmethod
+    def _body_start(text, title):
+        """Offset of the memo header, else of the last mention of the title in the first half of the page"""
+        header = _HEADER.search(text)
+        if header:
+            return header.start()
+        lowered = text.lower()
+        best = 0
+        for part in html.unescape(title or '').split('||'):
+            head = ' '.join(part.lower().split()[:6])
+            if len(head) < 8:
+                continue
+            found = lowered.rfind(head, 0, len(text) // 2 + len(head))
+            if found > best:
+                best = found
+        return best
+
+    @staticmethod
+    def _headers(body):
+        """('TO: ...' / 'SUBJECT: ...' lines of a memo in order, offset where the memo text starts)"""
+        headers = []
+        seen = set()
+        end = 0
+        for match in _HEADER.finditer(body, 0, HEADER_WINDOW):
+            label = match.group('label').upper()
+            label = 'SUBJECT' if label == 'RE' else label
+            following = _NEXT_FIELD.search(body, match.end())
+            segment = body[match.end():following.start() if following else len(body)]
+            sentences = split_sentences(segment)
+            if label in seen or not sentences:
+                continue
+            seen.add(label)
+            headers.append(f"{label}: {_clip(sentences[0], HEADER_CHARS)}")
+            end = match.end() + segment.find(sentences[0]) + len(sentences[0])
+        return headers, end
+
+    def _parse(self, text, title):
+        text = ' '.join((text or '').split())
+        body = text[self._body_start(text, title):]
+        # Header values are kept verbatim; sentences start after the last header field
+        headers, end = self._headers(body)
+        return _Parsed(headers, split_sentences(body[end:]))
+
+    # ---- scoring ---------------------------------------------------------
+
+    def _boilerplate(self, parsed_docs, keys):
+        """Fingerprints of sentences that repeat across documents (this batch plus earlier ones)"""
+        batch = {}
+        for parsed, key in zip(parsed_docs, keys):
+            for fp in set(parsed.fingerprints):
+                batch.setdefault(fp, set()).add(key)
+        threshold = max(2, min(BOILERPLATE_DOCS, math.ceil(BOILERPLATE_SHARE * len(parsed_docs))))
+        boilerplate = set()
+        with self._lock:
+            seen = self._seen
+            for fp, docs in batch.items():
+                known = seen.setdefault(fp, set())
+                if len(known) < BOILERPLATE_DOCS:
+                    # A page summarized again (refresh, re-extraction) does not count twice
+                    known.update(list(docs)[:BOILERPLATE_DOCS - len(known)])
+                if len(docs) >= threshold or len(known) >= BOILERPLATE_DOCS:
+                    boilerplate.add(fp)
+            if len(seen) > MAX_TRACKED:
+                # Forget sentences seen in one document only; chrome is kept
+                self._seen = {fp: docs for fp, docs in seen.items() if len(docs) > 1}
+        return boilerplate
+
+    def _select(self, parsed, idf, boilerplate):
+        candidates = []
+        for i, (sentence, tokens, fp) in enumerate(zip(parsed.sentences, parsed.tokens, parsed.fingerprints)):
+            if (fp in boilerplate or len(tokens) < MIN_WORDS or len(sentence) > MAX_SENTENCE_CHARS
+                    or _CHROME.search(sentence)):
+                continue
+            candidates.append(i)
+
+        tf = Counter()
+        for i in candidates:
+            tf.update(parsed.tokens[i])
+        weights = {term: count * idf.get(term, 1.0) for term, count in tf.items()}
+
+        scores = {}
+        for rank, i in enumerate(candidates):
+            terms = set(parsed.tokens[i])
+            score = sum(weights[term] for term in terms) / math.sqrt(len(parsed.tokens[i]))
+            if rank < LEAD_SENTENCES:
+                score *= 1 + LEAD_BONUS / (rank + 1)
+            scores[i] = score
+
+        budget = self.max_chars
+        parts = []
+        for header in parsed.headers:
+            if len(header) + 1 <= budget:
+                parts.append(header)
+                budget -= len(header) + 1
+        chosen = []
+        # The first substantive sentence always leads; the rest by score
+        order = candidates[:1] + sorted(candidates[1:], key=lambda i: -scores[i])
+        for i in order:
+            length = len(parsed.sentences[i]) + 1
+            if length <= budget:
+                chosen.append(i)
+                budget -= length
+        if chosen:
+            parts.append(' '.join(parsed.sentences[i] for i in sorted(chosen)))
+        if not parts:
+            fallback = parsed.sentences[candidates[0]] if candidates else ' '.join(parsed.sentences)
+            return _clip(fallback, self.max_chars)
+        # One line per header field, then the selected sentences as a paragraph
+        return '\n'.join(parts)
+
+    # ---- stage -----------------------------------------------------------
+
+    def summarize_batch(self, documents):
+        """Summaries of a batch of {'title', 'content', 'url'} dicts, in the same order"""
+        parsed_docs = [self._parse(doc.get('content'), doc.get('title')) for doc in documents]
+        keys = [hash(doc.get('url') or doc.get('title') or i) for i, doc in enumerate(documents)]
+        boilerplate = self._boilerplate(parsed_docs, keys)
+
+        df = Counter()
+        for parsed in parsed_docs:
+            terms = set()
+            for tokens in parsed.tokens:
+                terms.update(tokens)
+            df.update(terms)
+        n = len(parsed_docs)
+        idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        return [self._select(parsed, idf, boilerplate) for parsed in parsed_docs]
+
+    def summarize(self, text, title=None, url=None):
+        return self.summarize_batch([{'title': title, 'content': text, 'url': url}])[0]
+
+
+def main():
+    from archive import Archive, read_index
+    from config import ARCHIVE_DIR
+
+    parser = argparse.ArgumentParser(description='Preview extractive summaries of archived pages')
+    parser.add_argument('--url', help='a single archived page')
+    parser.add_argument('--limit', type=int, default=10, help='latest archived pages to summarize')
+    parser.add_argument('--chars', type=int, default=SUMMARY_CHARS)
+    args = parser.parse_args()
+
+    index = read_index(ARCHIVE_DIR)
+    entries = [index[args.url]] if args.url else sorted(index.values(), key=lambda e: e.fetched_at)[-args.limit:]
+    if not entries:
+        logging.info("🗄️ No archived pages")
+        return
+    archive = Archive(ARCHIVE_DIR)
+    try:
+        pages = [archive.read_entry(entry) for entry in entries]
+    finally:
+        archive.close()
+    summaries = Summarizer(args.chars).summarize_batch([{'title': p.title, 'content': p.text} for p in pages])
+    for page, summary in zip(pages, summaries):
+        print(f"📄 {page.title or page.url}")
+        print(f"   {summary}\n")
+
+
+if __name__ == '__main__':
+    main()
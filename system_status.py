@@ -3,8 +3,7 @@
 FDA Philippines Automation System - Summary & Status Check
 """
 
-import psycopg2
-from config import DB_CONFIG, TABLE_NAME
+from db import Database
 import os
 
 def print_system_status():
@@ -30,31 +29,25 @@ def print_system_status():
     # Check database connection and content
     print("\n🗄️ DATABASE STATUS:")
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-        
-        # Total documents
-        cur.execute(f'SELECT COUNT(*) FROM {TABLE_NAME}')
-        total_docs = cur.fetchone()[0]
-        
-        # FDA Philippines documents
-        cur.execute(f'SELECT COUNT(*) FROM {TABLE_NAME} WHERE agency = %s', ('FDA Philippines',))
-        fda_ph_docs = cur.fetchone()[0]
-        
-        # Recent activity
-        cur.execute(f'SELECT COUNT(*) FROM {TABLE_NAME} WHERE created_at >= CURRENT_DATE')
-        today_docs = cur.fetchone()[0]
-        
+        db = Database()
+        snapshot = db.stats_snapshot()
+        db.close()
+
+        fda_ph = snapshot['agencies'].get('FDA Philippines', {})
+
         print(f"   ✅ Database connection: WORKING")
-        print(f"   📊 Total documents: {total_docs}")
-        print(f"   🇵🇭 FDA Philippines documents: {fda_ph_docs}")
-        print(f"   📅 Documents added today: {today_docs}")
-        
-        cur.close()
-        conn.close()
+        print(f"   📊 Total documents: {snapshot['total_documents']}")
+        print(f"   🇵🇭 FDA Philippines documents: {fda_ph.get('documents', 0)}")
+        print(f"   📝 Average content length: {fda_ph.get('avg_length', 0)} characters")
+        print(f"   📅 Documents added today: {snapshot['added_today']}")
+        print(f"   🕒 Last ingest: {snapshot['last_ingest_at'] or 'never'}")
+        if fda_ph.get('years'):
+            years = ', '.join(f"{year or 'unknown'}: {count}" for year, count in sorted(fda_ph['years'].items(), key=lambda item: item[0] or ''))
+            print(f"   📆 FDA Philippines by year: {years}")
         
     except Exception as e:
         print(f"   ❌ Database connection: FAILED - {e}")
+        print(f"   💡 Stats tables are created by: python3 schema.py")
     
     # Check processed URLs
     print("\n📝 PROCESSED URLs STATUS:")
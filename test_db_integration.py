@@ -100,16 +100,15 @@ def test_database_integration():
     cur.execute(f'SELECT COUNT(*) FROM {TABLE_NAME} WHERE agency = %s', ('FDA Philippines',))
     fda_count = cur.fetchone()[0]
     
-    # Get the stored documents
-    cur.execute(f'SELECT title, agency, country FROM {TABLE_NAME} WHERE agency = %s', ('FDA Philippines',))
-    stored_docs = cur.fetchall()
+    # Stream the stored documents (server-side cursor, only the columns shown)
+    stored_docs = db.iter_rows(['title', 'agency', 'country'], where='agency = %s', params=('FDA Philippines',))
     
     print(f"📊 Database verification results:")
     print(f"   Documents processed: {processed_count}")
     print(f"   Documents in database: {fda_count}")
     print(f"   ✅ Database integration: {'SUCCESS' if fda_count >= processed_count else 'FAILED'}")
     
-    if stored_docs:
+    if fda_count:
         print(f"\n📋 Stored documents:")
         for i, (title, agency, country) in enumerate(stored_docs, 1):
             print(f"   {i}. {title[:70]}...")
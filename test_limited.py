@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 Limited test script to process only first 10 FDA documents
+Downloads and stores real documents; to preview a run without fetching any pages use `python3 cli.py plan`
 """
 import logging
 import time
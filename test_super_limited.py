@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 Super limited test - only fetch first 10 documents from API
+Downloads and stores real documents; to preview a run without fetching any pages use `python3 cli.py plan`
 """
 import logging
 import time